@@ -169,6 +169,8 @@ setup(
     # projects.
     extras_require={  # Optional
         #    'tests': ['coverage'],
+        'speedups': ['orjson', 'cbor2'],
+        'msgpack': ['msgpack'],
     },
 
     # If there are data files included in your packages that need to be
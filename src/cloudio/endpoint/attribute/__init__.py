@@ -3,3 +3,4 @@
 from .attribute import CloudioAttribute
 from .constraint import CloudioAttributeConstraint
 from .type import CloudioAttributeType
+from .descriptor import CloudioAttributeDescriptor, Measure, Parameter, SetPoint, Status
@@ -14,8 +14,14 @@ from cloudio.endpoint.topicuuid import TopicUuid
 
 class CloudioAttribute(CloudioUniqueIdentifiable):
     """The leaf information in the cloud.io data model
+
+    Attributes use __slots__ and share their type and constraint objects (see get_instance()), as
+    endpoints can contain hundreds of thousands of them.
     """
 
+    __slots__ = ('_name', '_parent', '_topic_uuid', '_constraint', '_type', '_timestamp', '_value', '_listeners',
+                 '_update_templates', '_decimals', '_float32')
+
     log = logging.getLogger(__name__)
 
     def __init__(self):
@@ -27,6 +33,9 @@ class CloudioAttribute(CloudioUniqueIdentifiable):
         self._timestamp = None
         self._value = None  # type: bool or int or float or str or None
         self._listeners = None  # type: list[CloudioAttributeListener] or None
+        self._update_templates = None  # type: dict or None # Pre-encoded @update message parts per message format
+        self._decimals = None  # type: int or None # Fixed-point decimals of lean @update messages
+        self._float32 = False  # Number sent as 32 bit float in lean @update messages
 
     def add_listener(self, listener):
         """Adds the given listener to the list of listeners that will get informed about a change of the attribute.
@@ -55,8 +64,11 @@ class CloudioAttribute(CloudioUniqueIdentifiable):
     # CloudioUniqueIdentifiable implementation
     #
     def get_uuid(self):
-        if not self._topic_uuid:
-            self._topic_uuid = TopicUuid(self)
+        if self._topic_uuid is None:
+            topic_uuid = TopicUuid(self)
+            if not topic_uuid.is_attached():
+                return topic_uuid  # Topic not final until the attribute is part of an endpoint
+            self._topic_uuid = topic_uuid
 
         return self._topic_uuid
 
@@ -185,18 +197,18 @@ class CloudioAttribute(CloudioUniqueIdentifiable):
             self._value = the_type()
 
             # Init to invalid
-            self._type = AttributeType(AttributeType.Invalid)
+            self._type = AttributeType.get_instance(AttributeType.Invalid)
 
             # Set cloudio attribute type accordingly
             if the_type in (bool,):
-                self._type = AttributeType(AttributeType.Boolean)
+                self._type = AttributeType.get_instance(AttributeType.Boolean)
             elif the_type in (int,):
-                self._type = AttributeType(AttributeType.Integer)
+                self._type = AttributeType.get_instance(AttributeType.Integer)
             elif the_type in (float,):
-                self._type = AttributeType(AttributeType.Number)
+                self._type = AttributeType.get_instance(AttributeType.Number)
             else:
                 assert the_type in (bytes, str), 'Seems we got a new type!'
-                self._type = AttributeType(AttributeType.String)
+                self._type = AttributeType.get_instance(AttributeType.String)
         else:
             raise InvalidCloudioAttributeException(the_type)
 
@@ -221,6 +233,24 @@ class CloudioAttribute(CloudioUniqueIdentifiable):
 
         self._set_value_with_type_check(value)
 
+    def set_precision(self, decimals=None, float32=False):
+        """Declares the precision needed by the values of a Number attribute.
+
+        Only used by the lean @update profile, where the value is sent as fixed-point integer with the given
+        number of decimals or as 32 bit float (binary message formats only).
+
+        :param decimals: Number of decimals to keep. Values are sent as round(value * 10^decimals)
+        :type decimals: int or None
+        :param float32: Send the value as 32 bit float
+        """
+        assert decimals is None or decimals >= 0, 'Decimals must be positive'
+        self._decimals = decimals
+        self._float32 = float32
+
+    def get_precision(self):
+        """Returns the precision declared using set_precision() as (decimals, float32) tuple."""
+        return self._decimals, self._float32
+
     def get_parent(self):
         return self._parent
 
@@ -248,7 +278,7 @@ class CloudioAttribute(CloudioUniqueIdentifiable):
 
         # Convert to AttributeConstraint if 'constraint' parameter is a string
         if isinstance(constraint, str):
-            constraint = AttributeConstraint(constraint)
+            constraint = AttributeConstraint.get_instance(constraint)
 
         assert isinstance(constraint, AttributeConstraint), 'Wrong type'
 
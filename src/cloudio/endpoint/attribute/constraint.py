@@ -26,7 +26,12 @@ class CloudioAttributeConstraint(object):
     # If unknown or not set.
     Invalid = -1
 
+    __slots__ = ('_value',)
+
+    _instances = {}  # key: Constraint value or name, value: Shared instance. See get_instance()
+
     def __init__(self, value):
+        self._value = self.Invalid
 
         if isinstance(value, str):
             if value.lower() == 'static':
@@ -46,6 +51,22 @@ class CloudioAttributeConstraint(object):
         else:
             self._value = self.Invalid
 
+    @classmethod
+    def get_instance(cls, value):
+        """Returns the shared (immutable) instance for the given constraint.
+
+        :param value: Constraint value (ex. CloudioAttributeConstraint.Measure) or name (ex. 'measure')
+        :type value: int or str
+        :rtype: CloudioAttributeConstraint
+        """
+        instance = cls._instances.get(value)
+        if instance is None:
+            # Share one instance per constraint value, whatever the name's case is
+            constraint = cls(value)
+            instance = cls._instances.setdefault(constraint.get_value(), constraint)
+            cls._instances[value] = instance
+        return instance
+
     def get_value(self):
         return self._value
 
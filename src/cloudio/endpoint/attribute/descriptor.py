@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+import cloudio.common.utils.timestamp_helpers as TimeStampProvider
+from cloudio.endpoint.attribute.attribute import CloudioAttribute
+from cloudio.endpoint.attribute.constraint import CloudioAttributeConstraint
+from cloudio.endpoint.exception.invalid_cloudio_attribute_exception import InvalidCloudioAttributeException
+
+
+def _to_string(value):
+    if not isinstance(value, str):
+        raise TypeError('Expected a str, got %s' % type(value).__name__)
+    return value
+
+
+# Conversion (and validation) of the assigned values per attribute type
+_CONVERTERS = {bool: bool, int: int, float: float, str: _to_string}
+
+
+class CloudioAttributeDescriptor(object):
+    """Declares an attribute of a CloudioObject subclass.
+
+    Example:
+
+        class Room(CloudioObject):
+            temperature = Measure(float)
+            set_point = SetPoint(float, initial_value=21.0)
+
+    Every instance of the class gets its own CloudioAttribute for each descriptor. Reading the
+    field returns the value of the attribute, assigning the field converts the value to the
+    attribute's type, timestamps it and reports the change, so the value is sent to the cloud.
+    """
+
+    constraint = None  # type: str or None # Constraint of the declared attributes. Set by the subclasses
+
+    def __init__(self, atype, initial_value=None):
+        """
+        :param atype: Type of the attribute (bool, int, float or str)
+        :param initial_value: Value of the attribute when the object is created
+        """
+        super(CloudioAttributeDescriptor, self).__init__()
+        if atype not in _CONVERTERS:
+            raise InvalidCloudioAttributeException(atype)
+        self.type = atype
+        self.initial_value = initial_value
+        self.name = None  # type: str or None # Set when the class is created
+        self._convert = _CONVERTERS[atype]
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return instance._internal._attributes[self.name].get_value()
+
+    def __set__(self, instance, value):
+        # Same as CloudioAttribute.set_value(), without the type dispatch
+        attribute = instance._internal._attributes[self.name]
+        attribute._value = self._convert(value)
+        attribute._timestamp = TimeStampProvider.get_time_in_milliseconds()
+        parent = attribute._parent
+        if parent is not None:
+            parent.attribute_has_changed_by_endpoint(attribute)
+
+    def get_attribute(self, instance) -> CloudioAttribute:
+        """Returns the attribute of the given object declared by this descriptor."""
+        return instance._internal._attributes[self.name]
+
+    def create_attribute(self, parent) -> CloudioAttribute:
+        """Creates the attribute declared by this descriptor.
+
+        :param parent: Attribute container of the object
+        :type parent: CloudioAttributeContainer
+        """
+        attribute = CloudioAttribute()
+        attribute.set_parent(parent)
+        attribute.set_name(self.name)
+        attribute.set_type(self.type)
+        attribute.set_constraint(CloudioAttributeConstraint.get_instance(self.constraint))
+        if self.initial_value is not None:
+            attribute.set_value(self.initial_value)
+        return attribute
+
+
+class Parameter(CloudioAttributeDescriptor):
+    """Attribute that can be configured from the cloud."""
+    constraint = 'parameter'
+
+
+class Status(CloudioAttributeDescriptor):
+    """Status attribute."""
+    constraint = 'status'
+
+
+class SetPoint(CloudioAttributeDescriptor):
+    """Attribute that can be changed from the cloud."""
+    constraint = 'setpoint'
+
+
+class Measure(CloudioAttributeDescriptor):
+    """Measure of any kind, changing at any time."""
+    constraint = 'measure'
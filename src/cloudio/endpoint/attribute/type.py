@@ -2,6 +2,9 @@
 
 from cloudio.endpoint.exception.invalid_cloudio_attribute_type_exception import InvalidCloudioAttributeTypeException
 
+# key: Python type, value: Type name. Fast path of from_raw_type_to_string(), subclasses are looked up with isinstance()
+_TYPE_NAMES = {bool: 'Boolean', int: 'Integer', float: 'Number', str: 'String', bytes: 'String'}
+
 
 class CloudioAttributeType(object):
     """Identifies the different data types of attributes currently supported by cloud.io.
@@ -12,6 +15,10 @@ class CloudioAttributeType(object):
     Number = 3  # The attribute's value is of type float or double
     String = 4  # The attribute's value is of type String
 
+    __slots__ = ('_type',)
+
+    _instances = {}  # key: cloud.iO type, value: Shared instance. See get_instance()
+
     def __init__(self, cloudio_attribute_type):
         super(CloudioAttributeType, self).__init__()
         # Check if parameter is valid and yell otherwise
@@ -20,6 +27,17 @@ class CloudioAttributeType(object):
         else:
             raise InvalidCloudioAttributeTypeException(cloudio_attribute_type)
 
+    @classmethod
+    def get_instance(cls, cloudio_attribute_type):
+        """Returns the shared (immutable) instance for the given cloud.iO type.
+
+        :rtype: CloudioAttributeType
+        """
+        instance = cls._instances.get(cloudio_attribute_type)
+        if instance is None:
+            instance = cls._instances[cloudio_attribute_type] = cls(cloudio_attribute_type)
+        return instance
+
     @classmethod
     def from_raw_type(cls, raw_type) -> int:
         """Converts a standard type to its cloud.iO type representation.
@@ -43,6 +61,10 @@ class CloudioAttributeType(object):
         :raw_type The standard type to convert from.
         :return The type represented as a string.
         """
+        type_name = _TYPE_NAMES.get(type(raw_type))
+        if type_name is not None:
+            return type_name
+
         if isinstance(raw_type, bool):
             return 'Boolean'
         elif isinstance(raw_type, int):
@@ -1,13 +1,16 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import binascii
 import logging
 import os
 from dataclasses import dataclass
+from functools import partial
 
 import cloudio.common.mqtt as mqtt
 import cloudio.common.utils.timestamp_helpers as TimeStampProvider
 import time
+from threading import Lock
 
 from cloudio.common.core.threaded import Threaded
 from cloudio.common.utils import path_helpers
@@ -16,9 +19,16 @@ from cloudio.endpoint.exception.cloudio_modification_exception import CloudioMod
 from cloudio.endpoint.exception.invalid_property_exception import InvalidPropertyException
 from cloudio.endpoint.interface.message_format import CloudioMessageFormat
 from cloudio.endpoint.interface.node_container import CloudioNodeContainer
-from cloudio.endpoint.message_format.cbor_format import CborMessageFormat
+from cloudio.endpoint.message_format.compressed_format import CompressedMessageFormat
 from cloudio.endpoint.message_format.factory import MessageFormatFactory
+from cloudio.endpoint.message_format.structure_cache import StructureCache
+from cloudio.endpoint.persistence import AtomicFilePersistence, MessageJournal, PersistenceWriter
+from cloudio.endpoint.persistence import WriteBehindPersistence
+from cloudio.endpoint.persistence import PersistenceCompactor, CompactionPolicy
+from cloudio.endpoint.persistence import pending_update_from_payload, payload_from_pending_update
 from cloudio.endpoint.properties_endpoint_configuration import PropertiesEndpointConfiguration
+from cloudio.endpoint.registry import ModelRegistry
+from cloudio.endpoint.series import SeriesBuffer
 from cloudio.endpoint.topicuuid import TopicUuid
 from typing import List
 
@@ -46,6 +56,7 @@ class MqttMessage:
     timestamp: int = 0  # Time in milliseconds
     qos: int = 1
     retain: bool = False
+    journal_id: int = 0  # Id of the message in the journal. 0 if not journaled
 
 
 class CloudioEndpoint(Threaded, CloudioNodeContainer):
@@ -56,12 +67,41 @@ class CloudioEndpoint(Threaded, CloudioNodeContainer):
 
     # Constants ######################################################################################
     MQTT_HOST_URI_PROPERTY = 'ch.hevs.cloudio.endpoint.hostUri'
+    # Format of the messages sent by the endpoint: 'CBOR', 'JSON' or 'MSGPACK'
+    MESSAGE_FORMAT_PROPERTY = 'ch.hevs.cloudio.endpoint.messageFormat'
+    MESSAGE_FORMAT_DEFAULT = 'CBOR'
+    # Messages of at least this size in bytes are sent zlib compressed. Compression is disabled if not set
+    MESSAGE_COMPRESSION_THRESHOLD_PROPERTY = 'ch.hevs.cloudio.endpoint.compressionThreshold'
+    # Encoding of the @update messages: 'standard' or 'lean' (no type and constraint, timestamp in milliseconds)
+    UPDATE_PROFILE_PROPERTY = 'ch.hevs.cloudio.endpoint.updateProfile'
+    UPDATE_PROFILE_STANDARD = 'standard'
+    UPDATE_PROFILE_LEAN = 'lean'
+    # Maximum size in bytes of the @online message. Larger models are announced node by node. No limit if not set
+    MESSAGE_MAX_SIZE_PROPERTY = 'ch.hevs.cloudio.endpoint.maxMessageSize'
     MQTT_PERSISTENCE_MEMORY = 'memory'
     MQTT_PERSISTENCE_FILE = 'file'
     MQTT_PERSISTENCE_NONE = 'none'
+    MQTT_PERSISTENCE_HYBRID = 'hybrid'  # Memory buffer in front of file persistence
     MQTT_PERSISTENCE_PROPERTY = 'ch.hevs.cloudio.endpoint.persistence'
     MQTT_PERSISTENCE_DEFAULT = MQTT_PERSISTENCE_FILE
     MQTT_PERSISTENCE_LOCATION = 'ch.hevs.cloudio.endpoint.persistenceLocation'
+    # Compaction policy per constraint. Ex: 'ch.hevs.cloudio.endpoint.persistence.compaction.measure=downsample:10'
+    MQTT_PERSISTENCE_COMPACTION_PROPERTY = 'ch.hevs.cloudio.endpoint.persistence.compaction.'
+    MQTT_PERSISTENCE_COMPACTION_INTERVAL = 'ch.hevs.cloudio.endpoint.persistence.compactionInterval'  # seconds
+    MQTT_PERSISTENCE_COMPACTION_INTERVAL_DEFAULT = 60
+    # Durability of the pending updates written by the persistence writer thread: 'batch', 'interval' or 'none'
+    MQTT_PERSISTENCE_DURABILITY_PROPERTY = 'ch.hevs.cloudio.endpoint.persistence.durability'
+    MQTT_PERSISTENCE_DURABILITY_DEFAULT = PersistenceWriter.DURABILITY_NONE
+    MQTT_PERSISTENCE_SYNC_INTERVAL = 'ch.hevs.cloudio.endpoint.persistence.syncInterval'  # seconds
+    # Time pending updates stay in memory before being written to disk with 'hybrid' persistence
+    MQTT_PERSISTENCE_WRITE_BEHIND_DELAY = 'ch.hevs.cloudio.endpoint.persistence.writeBehindDelay'  # seconds
+    # Size of the memory buffer above which the buffered pending updates are written to disk
+    MQTT_PERSISTENCE_WRITE_BEHIND_BUFFER_SIZE = 'ch.hevs.cloudio.endpoint.persistence.writeBehindBufferSize'  # bytes
+    MQTT_JOURNAL_FILE = 'file'
+    MQTT_JOURNAL_NONE = 'none'
+    MQTT_JOURNAL_PROPERTY = 'ch.hevs.cloudio.endpoint.journal'
+    MQTT_JOURNAL_DEFAULT = MQTT_JOURNAL_NONE
+    MQTT_JOURNAL_LOCATION = 'ch.hevs.cloudio.endpoint.journalLocation'
 
     CERT_AUTHORITY_FILE_PROPERTY = 'ch.hevs.cloudio.endpoint.ssl.authorityCert'  # pem file
 
@@ -72,6 +112,11 @@ class CloudioEndpoint(Threaded, CloudioNodeContainer):
 
     ENDPOINT_UUID = "ch.hevs.cloudio.endpoint.uuid"
 
+    JOURNALED_ACTIONS = ('@update/', '@nodeAdded/', '@series/')  # Actions of the messages written to the journal
+    # Key prefix of the messages stored in the persistence per action
+    PENDING_DATA_PREFIXES = {'@update': 'PendingUpdate-', '@nodeAdded': 'PendingNodeAdded-',
+                             '@series': 'PendingSeries-'}
+
 
     log = logging.getLogger(__name__)
 
@@ -81,13 +126,25 @@ class CloudioEndpoint(Threaded, CloudioNodeContainer):
         from cloudio.endpoint.node import CloudioNode
 
         self._end_point_is_ready = False  # Set to true after connection and subscription
+        self._connected = False  # Connection state as seen by the endpoint thread. Set to true on connection
+        self._connection_lock = Lock()  # Guards _connected, set by the MQTT thread and cleared by the endpoint thread
 
         self.uuid = uuid  # type: str
+        self._topic_uuid = None  # type: TopicUuid or None
         self.nodes = {}  # type: dict[CloudioNode]
+        self._registry = ModelRegistry(self)
         self.clean_session = True
         self.message_format = None  # type: CloudioMessageFormat
+        self._structure_cache = None  # type: StructureCache
+        self._max_message_size = 0  # Maximum size of the @online message in bytes, 0 for no limit
         self.persistence = None  # type: MqttClientPersistence
+        self._journal = None  # type: MessageJournal or None
+        self._compactor = None  # type: PersistenceCompactor or None
+        self._persistence_writer = None  # type: PersistenceWriter or None
+        self._last_compaction_time = 0.0
+        self._compaction_interval = self.MQTT_PERSISTENCE_COMPACTION_INTERVAL_DEFAULT
         self._publish_message = list()  # type: list[MqttMessage]
+        self._series = dict()  # type: dict[CloudioAttribute, SeriesBuffer] # Attributes sent as time series
         self._received_message = list()  # type: list[mqtt.MQTTMessage]
 
         # Used for debug/testing purpose only
@@ -118,7 +175,34 @@ class CloudioEndpoint(Threaded, CloudioNodeContainer):
                 exit(message)
 
         self._retry_interval = 10  # Connect retry interval in seconds
-        self.message_format = CborMessageFormat()
+
+        # Create the format used to encode outgoing messages
+        message_format_name = configuration.get_property(self.MESSAGE_FORMAT_PROPERTY, self.MESSAGE_FORMAT_DEFAULT)
+        update_profile = configuration.get_property(self.UPDATE_PROFILE_PROPERTY, self.UPDATE_PROFILE_STANDARD)
+        if update_profile == self.UPDATE_PROFILE_LEAN:
+            try:
+                self.message_format = MessageFormatFactory.newMessageFormat(message_format_name, lean=True)
+            except TypeError:
+                raise InvalidPropertyException('Message format does not support the lean update profile ' +
+                                               '(ch.hevs.cloudio.endpoint.updateProfile): ' +
+                                               '\'' + message_format_name + '\'')
+        elif update_profile == self.UPDATE_PROFILE_STANDARD:
+            self.message_format = MessageFormatFactory.messageFormatByName(message_format_name)
+        else:
+            raise InvalidPropertyException('Unknown update profile (ch.hevs.cloudio.endpoint.updateProfile): ' +
+                                           '\'' + update_profile + '\'')
+        if self.message_format is None:
+            raise InvalidPropertyException('Unknown or not installed message format ' +
+                                           '(ch.hevs.cloudio.endpoint.messageFormat): ' +
+                                           '\'' + message_format_name + '\'')
+        compression_threshold = configuration.get_property(self.MESSAGE_COMPRESSION_THRESHOLD_PROPERTY, '')
+        if compression_threshold:
+            self.message_format = CompressedMessageFormat(self.message_format, threshold=int(compression_threshold))
+        # Formats the cloud side may not decode (compression, MessagePack) are only announced if used
+        used_formats = [message_format_name.upper()] + (['ZLIB'] if compression_threshold else [])
+        self._supported_formats = MessageFormatFactory.supported_formats(used_formats)
+        self._structure_cache = StructureCache(self.message_format)
+        self._max_message_size = int(configuration.get_property(self.MESSAGE_MAX_SIZE_PROPERTY, '0') or 0)
 
         # Use the uuid defined in the properties file if exists
         self.uuid = configuration.get_property(self.ENDPOINT_UUID, self.uuid)
@@ -135,7 +219,15 @@ class CloudioEndpoint(Threaded, CloudioNodeContainer):
             self.persistence = mqtt.MqttMemoryPersistence()
         elif persistence_type == self.MQTT_PERSISTENCE_FILE:
             persistenceLocation = configuration.get_property(self.MQTT_PERSISTENCE_LOCATION)
-            self.persistence = mqtt.MqttDefaultFilePersistence(directory=persistenceLocation)
+            self.persistence = AtomicFilePersistence(directory=persistenceLocation)
+        elif persistence_type == self.MQTT_PERSISTENCE_HYBRID:
+            persistenceLocation = configuration.get_property(self.MQTT_PERSISTENCE_LOCATION)
+            self.persistence = WriteBehindPersistence(
+                AtomicFilePersistence(directory=persistenceLocation),
+                flush_delay=float(configuration.get_property(self.MQTT_PERSISTENCE_WRITE_BEHIND_DELAY,
+                                                             WriteBehindPersistence.DEFAULT_FLUSH_DELAY)),
+                max_buffer_size=int(configuration.get_property(self.MQTT_PERSISTENCE_WRITE_BEHIND_BUFFER_SIZE,
+                                                               WriteBehindPersistence.DEFAULT_MAX_BUFFER_SIZE)))
         elif persistence_type == self.MQTT_PERSISTENCE_NONE:
             self.persistence = None
         else:
@@ -146,6 +238,50 @@ class CloudioEndpoint(Threaded, CloudioNodeContainer):
         if self.persistence:
             self.persistence.open(client_id=self.uuid, server_uri=host)
 
+        # Create the thread writing the pending updates to the persistence
+        if self.persistence:
+            durability = configuration.get_property(self.MQTT_PERSISTENCE_DURABILITY_PROPERTY,
+                                                    self.MQTT_PERSISTENCE_DURABILITY_DEFAULT)
+            sync_interval = float(configuration.get_property(self.MQTT_PERSISTENCE_SYNC_INTERVAL, 1.0))
+            try:
+                self._persistence_writer = PersistenceWriter(self.persistence, durability=durability,
+                                                             sync_interval=sync_interval)
+            except ValueError:
+                raise InvalidPropertyException('Unknown persistence durability ' +
+                                               '(ch.hevs.cloudio.endpoint.persistence.durability): ' +
+                                               '\'' + durability + '\'')
+            self._persistence_writer.start()
+
+        # Create compactor applying the compaction policies to the pending updates
+        if self.persistence:
+            policies = {}
+            for constraint in ('static', 'parameter', 'status', 'setpoint', 'measure'):
+                policies[constraint] = CompactionPolicy.from_string(
+                    configuration.get_property(self.MQTT_PERSISTENCE_COMPACTION_PROPERTY + constraint, 'none'))
+            self._compactor = PersistenceCompactor(self.persistence, policies)
+            if not self._compactor.has_policies():
+                self._compactor = None
+            self._compaction_interval = float(configuration.get_property(
+                self.MQTT_PERSISTENCE_COMPACTION_INTERVAL, self.MQTT_PERSISTENCE_COMPACTION_INTERVAL_DEFAULT))
+
+        # Create journal for queued and in-flight messages
+        journal_type = configuration.get_property(self.MQTT_JOURNAL_PROPERTY, self.MQTT_JOURNAL_DEFAULT)
+        if journal_type == self.MQTT_JOURNAL_FILE:
+            journal_location = configuration.get_property(self.MQTT_JOURNAL_LOCATION)
+            self._journal = MessageJournal(directory=journal_location)
+        elif journal_type == self.MQTT_JOURNAL_NONE:
+            self._journal = None
+        else:
+            raise InvalidPropertyException('Unknown journal implementation ' +
+                                           '(ch.hevs.cloudio.endpoint.journal): ' +
+                                           '\'' + journal_type + '\'')
+        # Open journal and queue messages not sent during the last run
+        if self._journal:
+            for (journal_id, topic, payload, timestamp, qos, retain) in self._journal.open(client_id=self.uuid,
+                                                                                          server_uri=host):
+                self._publish_message.append(MqttMessage(topic, payload, timestamp=timestamp, qos=qos,
+                                                         retain=retain, journal_id=journal_id))
+
         self.options = mqtt.MqttConnectOptions()
 
         # Last will is a message with the UUID of the endpoint and no payload.
@@ -187,27 +323,50 @@ class CloudioEndpoint(Threaded, CloudioNodeContainer):
         while self._thread_should_run:
 
             self._process_received_messages()
+            self._process_series()
             self._process_publish_messages()
 
             self._check_published_not_acknowledged_container()
             self._check_presistent_data_store()
 
-            # Wait until next interval begins
+            # Make journal records of this iteration durable (group-commit)
+            if self._journal:
+                self._journal.commit()
+
+            # Wait until next interval begins or the next time series is due
             if self._thread_should_run:
-                self._thread_sleep_interval()
+                self._thread_sleep_interval(self._series_sleep_interval())
 
         self._thread_left_run_loop = True
 
     def close(self):
+        # Queue the values collected for time series. Journaled if the journal is enabled
+        for series in list(self._series.values()):
+            self._publish_series(series)
+
         # Stop Mqtt client
         self._client.stop()
 
-    def _publish(self, topic, payload, timestamp=0, qos=1, retain=False):
+        # Write the pending updates still queued
+        if self._persistence_writer:
+            self._persistence_writer.close()
+
+        # Write pending journal records. Messages not acknowledged get recovered on next start
+        if self._journal:
+            self._journal.close()
+
+    def _publish(self, topic, payload, timestamp=0, qos=1, retain=False, journal=True):
 
         if timestamp == 0:
             timestamp = TimeStampProvider.get_time_in_milliseconds()
 
         msg = MqttMessage(topic, payload, timestamp=timestamp, qos=qos, retain=retain)
+
+        # Journal messages that would get lost on shutdown or crash. Birth messages are
+        # not journaled as they are regenerated on every connect
+        if journal and self._journal and topic.startswith(self.JOURNALED_ACTIONS):
+            msg.journal_id = self._journal.append(topic, payload, timestamp, qos, retain)
+
         self._publish_message.append(msg)
 
         # Wake up endpoint _thread. It will publish the queued message. See _process_publish_messages()
@@ -219,6 +378,18 @@ class CloudioEndpoint(Threaded, CloudioNodeContainer):
         In case the MQTT broker is not available, the messages are stored in the
         persistent data store.
         """
+        with self._connection_lock:
+            # Checked and cleared under the lock, so a reconnect in between (see _on_connected()) is not overwritten
+            if self._connected and not self._client.is_connected():
+                self.log.info('Connection lost. Storing messages in persistent data store')
+                self._connected = False
+            connected = self._connected
+
+        if not connected:
+            # Known to be offline. Do not try to publish the messages
+            self._store_publish_messages()
+            return
+
         while len(self._publish_message):
             # Get next message
             msg = self._publish_message.pop(0)
@@ -230,8 +401,27 @@ class CloudioEndpoint(Threaded, CloudioNodeContainer):
                 # Add message to published (but not acknowledged) messages
                 self._published_not_acknowledged_message[message_info.mid] = msg
             else:
-                # Could not transmit. Add it to data store
-                self._put_persistent_data_store(msg.topic, msg.payload, msg.timestamp)
+                # Could not transmit. Add it to data store. The message is discarded from
+                # the journal as soon as the persistence writer has stored it
+                self._put_persistent_data_store(msg.topic, msg.payload, msg.timestamp,
+                                                partial(self._discard_from_journal, msg) if msg.journal_id else None)
+
+    def _store_publish_messages(self):
+        """Hands over all queued messages to the persistence writer in one batch.
+        """
+        messages = self._publish_message[:]
+        del self._publish_message[:len(messages)]
+
+        if self.persistence:
+            entries = []
+            for msg in messages:
+                try:
+                    entries.append(self._persistent_data_store_entry(msg.topic, msg.payload, msg.timestamp,
+                                                                     partial(self._discard_from_journal, msg)
+                                                                     if msg.journal_id else None))
+                except Exception as exception:
+                    self.log.error(exception, exc_info=True)
+            self._persistence_writer.put_many(entries)
 
     def _check_published_not_acknowledged_container(self):
         msg_count = len(self._published_not_acknowledged_message)
@@ -242,6 +432,10 @@ class CloudioEndpoint(Threaded, CloudioNodeContainer):
             #     print('Not published messages: {} (max: {})'.format(msg_count,
             #                                                        self._published_not_acknowledged_high_water_mark))
 
+    def _discard_from_journal(self, msg):
+        if self._journal and msg.journal_id:
+            self._journal.discard(msg.journal_id)
+
     def _onMessageArrived(self, client, userdata, msg):
         # Called by the MQTT client _thread!
 
@@ -261,7 +455,7 @@ class CloudioEndpoint(Threaded, CloudioNodeContainer):
             # First determine the message format (first byte identifies the message format).
             message_format = MessageFormatFactory.messageFormat(bytearray(msg.payload)[0])
             if message_format == None:
-                self.log.error('Message-format ' + bytearray(msg.payload)[0] + " not supported!")
+                self.log.error('Message-format ' + str(bytearray(msg.payload)[0]) + " not supported!")
                 return
 
             topic_levels = self.get_topic_levels(msg.topic)
@@ -288,7 +482,7 @@ class CloudioEndpoint(Threaded, CloudioNodeContainer):
 
         # Remove the sent message from the list
         if mid in self._published_not_acknowledged_message:
-            del self._published_not_acknowledged_message[mid]
+            self._discard_from_journal(self._published_not_acknowledged_message.pop(mid))
         else:
             # print('Warning: #{} not in published msgs!'.format(mid))
             pass
@@ -327,8 +521,8 @@ class CloudioEndpoint(Threaded, CloudioNodeContainer):
 
                 # If the endpoint is online, send node add message
                 if self.is_online():
-                    data = self.message_format.serialize_node(node)
-                    self._publish('@nodeAdded/' + node.get_uuid().to_string(), data)
+                    data = self._structure_cache.serialize_node(node)
+                    self._publish(node.get_uuid().get_action_topic('@nodeAdded'), data)
                 else:
                     self.log.info('Not sending \'@nodeAdded\' message. No connection to broker!')
 
@@ -339,6 +533,32 @@ class CloudioEndpoint(Threaded, CloudioNodeContainer):
         """
         return self.nodes.get(node_name, None)
 
+    def get_registry(self):
+        """Returns the registry indexing the nodes, objects and attributes of the endpoint by path.
+
+        :rtype: ModelRegistry
+        """
+        return self._registry
+
+    def get_supported_formats(self):
+        """Returns the names of the message formats announced in the @online message of this endpoint.
+
+        :rtype: list[str]
+        """
+        return self._supported_formats
+
+    def iter_attributes(self, prefix='', constraint=None):
+        """Yields the (path, attribute) tuples of the attributes inside the given path.
+
+        The attributes are yielded one by one, sorted by path, without building a list of the whole model.
+
+        :param prefix: Path of the subtree, ex. 'VacuumCleaner/Parameters'. All attributes if empty
+        :type prefix: str
+        :param constraint: Only attributes with this constraint (ex. 'measure') if given
+        :type constraint: str or None
+        """
+        return self._registry.iter_attributes(prefix, constraint)
+
     def _set(self, topic, location, message_format, data):
         """Assigns a new value to a cloud.iO attribute.
 
@@ -372,7 +592,9 @@ class CloudioEndpoint(Threaded, CloudioNodeContainer):
     # Interface implementations
     #
     def get_uuid(self):
-        return TopicUuid(self)
+        if self._topic_uuid is None or self._topic_uuid.topic != self.uuid:
+            self._topic_uuid = TopicUuid(self)
+        return self._topic_uuid
 
     def get_name(self):
         return self.uuid
@@ -387,14 +609,74 @@ class CloudioEndpoint(Threaded, CloudioNodeContainer):
         """
 
         try:
+            series = self._series.get(attribute)
+            if series is not None:
+                # Collect the value, the samples are sent later in one @series message
+                was_empty = not len(series)
+                if series.append(attribute.get_timestamp(), attribute.get_value()):
+                    self._publish_series(series)
+                elif was_empty:
+                    # Let the thread wake up in time if the interval is shorter than the control interval
+                    self.wakeup_thread()
+                return
+
             # Create the MQTT message using the given message format.
-            topic = '@update/' + attribute.get_uuid().to_string()
+            topic = attribute.get_uuid().get_action_topic('@update')
             payload = self.message_format.serialize_attribute(attribute)
 
             self._publish(topic, payload, timestamp=attribute.get_timestamp())
         except Exception as exception:
             self.log.error(exception, exc_info=True)
 
+    def enable_series(self, attribute, interval=1.0, max_samples=1000):
+        """Sends the values of the attribute as compressed time series instead of one @update message per value.
+
+        The values are collected and sent in a @series message every 'interval' seconds or as soon as
+        'max_samples' values are collected. Only attributes of type Number are supported.
+
+        :param attribute: Attribute to send as time series
+        :type attribute: CloudioAttribute
+        :param interval: Maximum time in seconds a value is kept before being sent
+        :param max_samples: Maximum number of values per @series message
+        """
+        from cloudio.endpoint.attribute.type import CloudioAttributeType as AttributeType
+
+        if attribute.get_type() != AttributeType.Number:
+            raise ValueError('Only attributes of type Number can be sent as time series')
+        self._series[attribute] = SeriesBuffer(attribute, interval=interval, max_samples=max_samples)
+
+    def disable_series(self, attribute):
+        """Sends the values of the attribute again using @update messages. Values collected are sent first.
+        """
+        series = self._series.pop(attribute, None)
+        if series is not None:
+            self._publish_series(series)
+
+    def _process_series(self):
+        for series in list(self._series.values()):
+            if series.is_due():
+                self._publish_series(series)
+
+    def _series_sleep_interval(self):
+        """Returns the time in seconds until the next time series is due, limited to the control interval.
+        """
+        sleep_interval = self._control_interval_in_seconds
+        for series in list(self._series.values()):
+            time_until_due = series.time_until_due()
+            if time_until_due is not None and time_until_due < sleep_interval:
+                sleep_interval = time_until_due
+        return sleep_interval
+
+    def _publish_series(self, series):
+        samples = series.take()
+        if samples:
+            try:
+                topic = series.attribute.get_uuid().get_action_topic('@series')
+                payload = self.message_format.serialize_series(series.attribute, samples)
+                self._publish(topic, payload, timestamp=samples[-1][0])
+            except Exception as exception:
+                self.log.error(exception, exc_info=True)
+
     def attribute_has_changed_by_cloud(self, attribute):
         """Informs the endpoint that an underlying attribute has changed (initiated from the cloud).
 
@@ -407,6 +689,10 @@ class CloudioEndpoint(Threaded, CloudioNodeContainer):
     def _on_connected(self):
         """This callback is called after the MQTT client has successfully connected to cloud.iO.
         """
+        # Publish messages again instead of storing them
+        with self._connection_lock:
+            self._connected = True
+
         # Announce our presence to the broker
         self.announce()
         # It is too early here because the endpoint model
@@ -435,8 +721,15 @@ class CloudioEndpoint(Threaded, CloudioNodeContainer):
     def announce(self):
         # Send birth message
         self.log.info('Sending birth message...')
-        str_message = self.message_format.serialize_endpoint(self)
-        self._publish('@online/' + self.uuid, str_message, retain=True)
+        for node, message in self._structure_cache.iter_announcement(self, self._max_message_size):
+            if node is None:
+                self._publish('@online/' + self.uuid, message, retain=True)
+            else:
+                if len(message) > self._max_message_size:
+                    self.log.warning('Node \'%s\' exceeds the maximum message size (%d > %d bytes)' %
+                                     (node.get_name(), len(message), self._max_message_size))
+                # Regenerated on every connect, no need to journal
+                self._publish(node.get_uuid().get_action_topic('@nodeAdded'), message, journal=False)
 
     @staticmethod
     def get_action(topic: str) -> str:
@@ -463,42 +756,66 @@ class CloudioEndpoint(Threaded, CloudioNodeContainer):
         if self.is_online() and self.persistence and len(self.persistence.keys()) > 0:
             # Try to send stored messages to cloud.iO
             self._purgePersistentDataStore()
+        elif self._compactor and time.time() - self._last_compaction_time >= self._compaction_interval:
+            # Reduce the stored messages while offline
+            self._compact_persistent_data_store()
 
-    def _put_persistent_data_store(self, topic, payload, timestamp):
+    def _compact_persistent_data_store(self):
+        if self._compactor:
+            try:
+                self._compactor.compact()
+            except Exception as exception:
+                self.log.error(exception, exc_info=True)
+            self._last_compaction_time = time.time()
+
+    def _put_persistent_data_store(self, topic, payload, timestamp, callback=None) -> bool:
         # If the message could not be send for any reason, add the message to the pending
         # updates persistence if available.
+        # The message is handed over to the persistence writer thread. The optional callback
+        # gets called by the writer thread as soon as the message is stored.
+        # Returns true if the message was handed over.
         if self.persistence:
-            if timestamp == 0:
-                timestamp = TimeStampProvider.get_time_in_milliseconds()
-
-            action = self.get_action(topic)
-            topic_levels = self.get_topic_levels(topic)
-            topic_levels.pop(0)  # Remove action
-
             try:
-                if action == '@update':
-                    msg_id = 'PendingUpdate-' + ';'.join(topic_levels) + '-' + str(int(timestamp))
-                    self.persistence.put(msg_id, mqtt.PendingUpdate(payload))
-                elif action == '@nodeAdded':
-                    msg_id = 'PendingNodeAdded-' + ';'.join(topic_levels) + '-' + str(int(timestamp))
-                    self.persistence.put(msg_id, mqtt.PendingUpdate(payload))
-                else:
-                    raise Exception('Unknown action type!')
+                self._persistence_writer.put(*self._persistent_data_store_entry(topic, payload, timestamp, callback))
+                return True
             except Exception as exception:
                     self.log.error(exception, exc_info=True)
+        return False
+
+    def _persistent_data_store_entry(self, topic, payload, timestamp, callback=None):
+        """Returns the (key, persistable, callback) entry used to store a message in the persistence.
+
+        Ex. topic '@update/CrazyFrogEndpoint/CrazyFrog/properties/_sinus' gets stored using
+        key 'PendingUpdate-CrazyFrogEndpoint;CrazyFrog;properties;_sinus-<timestamp>'
+        """
+        if timestamp == 0:
+            timestamp = TimeStampProvider.get_time_in_milliseconds()
+
+        action, _, uuid = topic.partition('/')
+        prefix = self.PENDING_DATA_PREFIXES.get(action)
+        if prefix is None:
+            raise Exception('Unknown action type!')
+
+        return prefix + uuid.replace('/', ';') + '-' + str(int(timestamp)), pending_update_from_payload(payload), \
+            callback
 
     def _purgePersistentDataStore(self):
         """Tries to send stored messages to cloud.iO.
         """
         if self.persistence:
+            # Reduce the messages to send
+            self._compact_persistent_data_store()
+
             print(str(len(self.persistence.keys())) + ' in persistence')
 
-            action_map = {
-                'PendingUpdate-': '@update',
-                'PendingNodeAdded-': '@nodeAdded'}
+            action_map = {prefix: action for action, prefix in self.PENDING_DATA_PREFIXES.items()}
 
             for key in self.persistence.keys():
                 if self.is_online():
+                    # Leave the entries still queued to (or being written by) the persistence writer alone
+                    if self._persistence_writer and self._persistence_writer.is_pending(key):
+                        continue
+
                     for pending_data_type, action in action_map.items():
                         # Check pending data type
                         if key.startswith(pending_data_type):
@@ -508,12 +825,18 @@ class CloudioEndpoint(Threaded, CloudioNodeContainer):
                             if pending_update is not None:
                                 print('Copy pers: ' + key + ': ' + pending_update.get_data())
 
+                                try:
+                                    payload = payload_from_pending_update(pending_update)
+                                except (ValueError, binascii.Error) as exception:
+                                    self.log.error('Skipping unreadable pending data \'%s\': %s' % (key, exception))
+                                    break
+
                                 # Get the uuid of the endpoint
                                 uuid = pending_update.get_uuid_from_persistence_key(key)
 
                                 # Try to send the update to the broker and remove it from the storage
                                 topic = action + '/' + uuid
-                                self._publish(topic, pending_update.get_data())
+                                self._publish(topic, payload)
 
                                 # Remove key from store
                                 self.persistence.remove(key)
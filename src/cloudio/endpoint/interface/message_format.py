@@ -60,3 +60,27 @@ class CloudioMessageFormat(object):
         :type attribute: CloudioAttribute
         """
         pass
+
+    @abstractmethod
+    def serialize_series(self, attribute, samples):
+        """A CloudioMessageFormat implementation should return the encoded payload of the @series message
+           containing the given samples of the attribute.
+
+        :param attribute: Attribute the samples belong to.
+        :type attribute: CloudioAttribute
+        :param samples: Samples as (timestamp in milliseconds, value) tuples, ordered by time.
+        :type samples: list[(int, float)]
+        :return: Raw data representation of the series.
+        """
+        pass
+
+    @abstractmethod
+    def deserialize_series(self, data):
+        """A CloudioMessageFormat implementation should parse the data payload of a @series message and
+           return the samples it contains.
+
+        :param data: Data received in the MQTT message.
+        :return: Samples as (timestamp in milliseconds, value) tuples.
+        :rtype: list[(int, float)]
+        """
+        pass
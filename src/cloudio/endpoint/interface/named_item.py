@@ -6,6 +6,8 @@ from abc import ABCMeta, abstractmethod
 class CloudioNamedItem(object):
     """An object owning a name.
     """
+    __slots__ = ()
+
     __metaclass__ = ABCMeta
 
     @abstractmethod
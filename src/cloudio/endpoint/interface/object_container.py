@@ -25,6 +25,14 @@ class CloudioObjectContainer(CloudioUniqueIdentifiable):
         """
         pass
 
+    @abstractmethod
+    def structure_has_changed(self, element=None):
+        """Informs the container that its structure (or the structure of one of its child objects) has changed.
+
+        :param element: The object or attribute added if the change is an addition
+        """
+        pass
+
     @abstractmethod
     def is_node_registered_within_endpoint(self):
         """Returns true if the node the attribute is part of is registered within an endpoint, false otherwise.
@@ -6,6 +6,7 @@ from .named_item import CloudioNamedItem
 
 
 class CloudioUniqueIdentifiable(CloudioNamedItem):
+    __slots__ = ()
     __metaclass__ = ABCMeta
 
     @abstractmethod
@@ -16,6 +16,8 @@ class CloudioUuid(object):
     see CloudioUniqueIdentifiable
     """
 
+    __slots__ = ()
+
     __metaclass__ = ABCMeta
 
     @abstractmethod
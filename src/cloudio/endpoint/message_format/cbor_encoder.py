@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+
+import struct
+
+import cbor
+
+from cloudio.endpoint.attribute.type import CloudioAttributeType as AttributeType
+from cloudio.endpoint.message_format.generic_format import GenericMessageFormat
+from cloudio.endpoint.message_format.generic_format import is_runtime_node, internal_runtime_object
+from cloudio.endpoint.message_format.generic_format import is_runtime_attribute, attribute_update_template
+from cloudio.endpoint.message_format.generic_format import supported_formats, lean_attribute_update
+
+# CBOR major types
+_CBOR_UINT = 0x00
+_CBOR_NEGINT = 0x20
+_CBOR_TEXT = 0x60
+_CBOR_ARRAY = 0x80
+_CBOR_MAP = 0xA0
+
+_CBOR_FALSE = b'\xf4'
+_CBOR_TRUE = b'\xf5'
+_CBOR_NULL = b'\xf6'
+
+_FLOAT32 = struct.Struct('>Bf')
+_FLOAT64 = struct.Struct('>Bd')
+_UINT16 = struct.Struct('>BH')
+_UINT32 = struct.Struct('>BI')
+_UINT64 = struct.Struct('>BQ')
+
+# Pre-encoded text used by every message
+_TEXT_CACHE = {text: cbor.dumps(text) for text in (
+    'nodes', 'version', 'messageFormatVersion', 'supportedFormats', 'objects', 'implements',
+    'conforms', 'attributes', 'type', 'value', 'constraint', 't', 'v', 'd',
+    'Invalid', 'Boolean', 'Integer', 'Number', 'String',
+    'Static', 'Parameter', 'Status', 'SetPoint', 'Measure')}
+
+# Start of the attribute map per attribute type, up to the value
+_ATTRIBUTE_PREFIXES = {attribute_type: (b'\xa3' + _TEXT_CACHE['type'] + _TEXT_CACHE[attribute_type] +
+                                        _TEXT_CACHE['value'])
+                       for attribute_type in ('Invalid', 'Boolean', 'Integer', 'Number', 'String')}
+_KEY_CONSTRAINT = _TEXT_CACHE['constraint']
+_KEY_VALUE = _TEXT_CACHE['value']
+
+
+def _write_head(buffer: bytearray, major_type: int, value: int):
+    """Writes the initial byte(s) of a CBOR data item.
+    """
+    if value < 24:
+        buffer.append(major_type | value)
+    elif value < 0x100:
+        buffer.append(major_type | 24)
+        buffer.append(value)
+    elif value < 0x10000:
+        buffer += _UINT16.pack(major_type | 25, value)
+    elif value < 0x100000000:
+        buffer += _UINT32.pack(major_type | 26, value)
+    else:
+        buffer += _UINT64.pack(major_type | 27, value)
+
+
+def _write_text(buffer: bytearray, text: str):
+    encoded = _TEXT_CACHE.get(text)
+    if encoded is not None:
+        buffer += encoded
+    else:
+        data = text.encode('utf-8')
+        _write_head(buffer, _CBOR_TEXT, len(data))
+        buffer += data
+
+
+def _write_value(buffer: bytearray, value):
+    value_type = type(value)
+    if value_type is str:
+        _write_text(buffer, value)
+    elif value_type is float:
+        buffer += _FLOAT64.pack(0xfb, value)
+    elif value_type is bool:
+        buffer += _CBOR_TRUE if value else _CBOR_FALSE
+    elif value is None:
+        buffer += _CBOR_NULL
+    elif value_type is int and 0 <= value <= 0x7fffffffffffffff:
+        _write_head(buffer, _CBOR_UINT, value)
+    elif value_type is int and -0x8000000000000000 <= value < 0:
+        _write_head(buffer, _CBOR_NEGINT, -1 - value)
+    else:
+        # Integers not fitting into 64 bits (cbor module encodes them as bignum), bytes, etc.
+        buffer += cbor.dumps(value)
+
+
+def _build_update_template(type_string, constraint_string):
+    """Returns the start of the @update message maps, with and without timestamp.
+    """
+    static_part = bytearray()
+    for key, value in (('type', type_string), ('constraint', constraint_string)):
+        _write_text(static_part, key)
+        _write_value(static_part, value)
+    timestamp_key = bytearray()
+    _write_text(timestamp_key, 'timestamp')
+    return b'\xa4' + static_part + timestamp_key, b'\xa3' + static_part
+
+
+def encode_attribute_update(attribute) -> bytes:
+    """Encodes the @update message of the attribute.
+
+    Only the timestamp and the value are encoded, the rest of the message is taken from the
+    template stored in the attribute. The output is identical to the CBOR encoding of the dict
+    returned by GenericMessageFormat.serialize_attribute().
+    """
+    with_timestamp, without_timestamp = attribute_update_template(attribute, 'cbor', _build_update_template)
+
+    value = attribute.get_value()
+    if type(value) is float:
+        encoded_value = _FLOAT64.pack(0xfb, value)  # Most common case
+    else:
+        encoded_value = bytearray()
+        _write_value(encoded_value, value)
+
+    timestamp = attribute.get_timestamp()
+    if timestamp:
+        return b''.join((with_timestamp, _FLOAT64.pack(0xfb, timestamp / 1000.0), _KEY_VALUE, encoded_value))
+    return b''.join((without_timestamp, _KEY_VALUE, encoded_value))
+
+
+def encode_attribute_update_lean(attribute) -> bytes:
+    """Encodes the lean @update message of the attribute (see lean_attribute_update()).
+
+    The timestamp and fixed-point values use the compact CBOR integer encoding. Numbers of
+    attributes declared as float32 are encoded as single precision floats.
+    """
+    data = lean_attribute_update(attribute)
+
+    buffer = bytearray()
+    _write_head(buffer, _CBOR_MAP, len(data))
+    for key, value in data.items():
+        _write_text(buffer, key)
+        if key == 'v' and attribute._float32 and type(value) is float:
+            try:
+                buffer += _FLOAT32.pack(0xfa, value)
+                continue
+            except OverflowError:
+                pass  # Out of float32 range
+        _write_value(buffer, value)
+    return bytes(buffer)
+
+
+class CborModelEncoder(object):
+    """Encodes the endpoint model straight into CBOR.
+
+    The model is walked once and written into a single buffer, without building the python
+    dict representation of the model first. The output is identical to the CBOR encoding of
+    the dict returned by GenericMessageFormat.
+
+    Classes without explicit serializer (see GenericMessageFormat) are converted to a dict and
+    encoded using the cbor module.
+    """
+
+    def __init__(self, generic_format=None):
+        """
+        :param generic_format: Used for the model classes that need to be reflected
+        :type generic_format: GenericMessageFormat or None
+        """
+        super(CborModelEncoder, self).__init__()
+        self._generic_format = generic_format if generic_format else GenericMessageFormat()
+
+    def encode_endpoint(self, endpoint) -> bytes:
+        buffer = bytearray()
+        _write_head(buffer, _CBOR_MAP, 4)
+
+        _write_text(buffer, 'nodes')
+        _write_head(buffer, _CBOR_MAP, len(endpoint.nodes))
+        for node in endpoint.nodes.values():
+            _write_value(buffer, node.get_name())
+            self._write_node(buffer, node)
+
+        _write_text(buffer, 'version')
+        _write_text(buffer, 'v0.2')
+        _write_text(buffer, 'messageFormatVersion')
+        _write_value(buffer, 2)
+        _write_text(buffer, 'supportedFormats')
+        formats = supported_formats(endpoint)
+        _write_head(buffer, _CBOR_ARRAY, len(formats))
+        for name in formats:
+            _write_text(buffer, name)
+        return bytes(buffer)
+
+    def encode_node(self, node) -> bytes:
+        buffer = bytearray()
+        self._write_node(buffer, node)
+        return bytes(buffer)
+
+    def _write_node(self, buffer: bytearray, node):
+        if not is_runtime_node(node):
+            buffer += cbor.dumps(self._generic_format.serialize_node(node))
+            return
+
+        if len(node.objects) > 0:
+            _write_head(buffer, _CBOR_MAP, 2)
+            _write_text(buffer, 'objects')
+            self._write_objects(buffer, node.objects)
+        else:
+            _write_head(buffer, _CBOR_MAP, 1)
+
+        _write_text(buffer, 'implements')
+        _write_head(buffer, _CBOR_ARRAY, len(node.interfaces))
+        for interface in node.interfaces:
+            _write_value(buffer, interface)
+
+    def _write_objects(self, buffer: bytearray, objects: dict):
+        _write_head(buffer, _CBOR_MAP, len(objects))
+        for name, obj in objects.items():
+            _write_value(buffer, name)
+
+            internal = internal_runtime_object(obj)
+            if internal is None:
+                buffer += cbor.dumps(self._generic_format._object_to_dict(obj))
+                continue
+
+            _write_head(buffer, _CBOR_MAP, 3)
+            _write_text(buffer, 'conforms')
+            _write_value(buffer, internal.conforms)
+            _write_text(buffer, 'objects')
+            self._write_objects(buffer, internal.objects)
+            _write_text(buffer, 'attributes')
+            _write_head(buffer, _CBOR_MAP, len(internal._attributes))
+            for attribute_name, attribute in internal._attributes.items():
+                _write_value(buffer, attribute_name)
+                self._write_attribute(buffer, attribute)
+
+    def _write_attribute(self, buffer: bytearray, attribute):
+        if not is_runtime_attribute(attribute):
+            buffer += cbor.dumps(self._generic_format._attribute_to_dict(attribute))
+            return
+
+        value = attribute.get_value()
+        constraint = attribute.get_constraint()
+
+        # {'type': <type>, 'value': <value>, 'constraint': <constraint>}
+        buffer += _ATTRIBUTE_PREFIXES[AttributeType.from_raw_type_to_string(value)]
+        _write_value(buffer, value)
+        buffer += _KEY_CONSTRAINT
+        _write_value(buffer, constraint.to_string() if constraint is not None else None)
@@ -1,6 +1,7 @@
-import cbor
-
 from cloudio.endpoint.interface import CloudioMessageFormat
+from cloudio.endpoint.message_format.cbor_encoder import CborModelEncoder, encode_attribute_update
+from cloudio.endpoint.message_format.cbor_encoder import encode_attribute_update_lean
+from cloudio.endpoint.message_format.codec import CBOR_CODECS, create_codec
 from cloudio.endpoint.message_format.generic_format import GenericMessageFormat
 
 
@@ -9,18 +10,41 @@ class CborMessageFormat(CloudioMessageFormat):
 
     All messages have to start with the identifier for this format 0b101.
     """
-    def __init__(self):
+    def __init__(self, codec=None, lean=False):
+        """
+        :param codec: Codec used to decode messages. The fastest installed codec if None
+        :type codec: Codec or None
+        :param lean: Send lean @update messages (see lean_attribute_update())
+        """
+        self._codec = codec if codec else create_codec(CBOR_CODECS)
+        self._lean = lean
         self._genericFormat = GenericMessageFormat()
-        pass
+        self._modelEncoder = CborModelEncoder(self._genericFormat)
 
     def serialize_endpoint(self, endpoint):
-        return cbor.dumps(self._genericFormat.serialize_endpoint(endpoint))
+        return self._modelEncoder.encode_endpoint(endpoint)
 
     def serialize_node(self, node):
-        return cbor.dumps(self._genericFormat.serialize_node(node))
+        return self._modelEncoder.encode_node(node)
 
     def serialize_attribute(self, attribute):
-        return cbor.dumps(self._genericFormat.serialize_attribute(attribute))
+        if self._lean:
+            return encode_attribute_update_lean(attribute)
+        return encode_attribute_update(attribute)
 
     def deserialize_attribute(self, data, attribute):
-        self._genericFormat.deserialize_attribute(cbor.loads(data), attribute)
\ No newline at end of file
+        self._genericFormat.deserialize_attribute(self._codec.loads(data), attribute)
+
+    def serialize_series(self, attribute, samples):
+        return self._codec.dumps(self._genericFormat.serialize_series(attribute, samples))
+
+    def deserialize_series(self, data):
+        return self._genericFormat.deserialize_series(self._codec.loads(data))
+
+    def dumps(self, data):
+        """Encodes the given python dict."""
+        return self._codec.dumps(data)
+
+    def loads(self, data):
+        """Decodes the given payload into a python dict."""
+        return self._codec.loads(data)
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+
+import json
+import logging
+import math
+import types
+
+import cbor
+
+log = logging.getLogger(__name__)
+
+# Same output as json.dumps(), but raising ValueError on NaN and infinite floats
+_STRICT_JSON_ENCODER = json.JSONEncoder(allow_nan=False)
+
+
+def _replace_non_finite(data):
+    """Returns a copy of the data with NaN and infinite floats replaced by None."""
+    if isinstance(data, float):
+        return data if math.isfinite(data) else None
+    if isinstance(data, dict):
+        return {key: _replace_non_finite(value) for key, value in data.items()}
+    if isinstance(data, (list, tuple)):
+        return [_replace_non_finite(value) for value in data]
+    return data
+
+
+def dumps_json(data) -> str:
+    """Encodes the data using the 'json' module, with NaN and infinite floats encoded as null.
+
+    The 'json' module writes non-standard NaN/Infinity tokens, which most parsers reject.
+    """
+    try:
+        return _STRICT_JSON_ENCODER.encode(data)
+    except ValueError:
+        return _STRICT_JSON_ENCODER.encode(_replace_non_finite(data))
+
+
+class Codec(object):
+    """Encodes python data (dict, list, str, int, float, bool, None) to a payload and back.
+    """
+
+    name = None  # type: str
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """Returns True if the library needed by the codec is installed."""
+        return True
+
+    @classmethod
+    def is_accelerated(cls) -> bool:
+        """Returns True if the library is implemented in C (or another compiled language)."""
+        return False
+
+    def dumps(self, data):
+        raise NotImplementedError
+
+    def loads(self, data):
+        raise NotImplementedError
+
+
+class CborCodec(Codec):
+    """CBOR codec using the 'cbor' package (the reference implementation of the CBOR message format).
+    """
+
+    name = 'cbor'
+
+    @classmethod
+    def is_accelerated(cls) -> bool:
+        # The 'cbor' package falls back to a pure python implementation if its C extension is not built
+        return isinstance(cbor.dumps, types.BuiltinFunctionType)
+
+    def dumps(self, data) -> bytes:
+        return cbor.dumps(data)
+
+    def loads(self, data):
+        return cbor.loads(data)
+
+
+class Cbor2Codec(Codec):
+    """CBOR codec using the 'cbor2' package.
+
+    Differs from 'cbor' only for integers between 2^63 and 2^64 - 1, which are encoded as 64 bit
+    unsigned integers instead of bignums. Both decode to the same value.
+    """
+
+    name = 'cbor2'
+
+    def __init__(self):
+        super(Cbor2Codec, self).__init__()
+        import cbor2
+        self._cbor2 = cbor2
+
+    @classmethod
+    def is_available(cls) -> bool:
+        try:
+            import cbor2  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    @classmethod
+    def is_accelerated(cls) -> bool:
+        import cbor2
+        return isinstance(cbor2.dumps, types.BuiltinFunctionType)
+
+    def dumps(self, data) -> bytes:
+        return self._cbor2.dumps(data)
+
+    def loads(self, data):
+        return self._cbor2.loads(data)
+
+
+class JsonCodec(Codec):
+    """JSON codec using the 'json' module of the standard library (the reference implementation).
+
+    NaN and infinite floats are encoded as null, as done by all JSON codecs.
+    """
+
+    name = 'json'
+
+    def dumps(self, data) -> str:
+        return dumps_json(data)
+
+    def loads(self, data):
+        return json.loads(data)
+
+
+class OrjsonCodec(Codec):
+    """JSON codec using the 'orjson' package.
+
+    The output is compact (no whitespace) and not ASCII escaped, which makes no difference to
+    JSON parsers. Differences to the 'json' module:
+     - Integers exceeding 64 bits and payloads orjson can not decode are handed over to the 'json' module
+    """
+
+    name = 'orjson'
+
+    def __init__(self):
+        super(OrjsonCodec, self).__init__()
+        import orjson
+        self._orjson = orjson
+
+    @classmethod
+    def is_available(cls) -> bool:
+        try:
+            import orjson  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    @classmethod
+    def is_accelerated(cls) -> bool:
+        return True
+
+    def dumps(self, data) -> str:
+        try:
+            return self._orjson.dumps(data).decode('utf-8')
+        except TypeError:
+            return dumps_json(data)
+
+    def loads(self, data):
+        try:
+            return self._orjson.loads(data)
+        except self._orjson.JSONDecodeError:
+            return json.loads(data)
+
+
+# Codecs per format. Reference implementation first
+CBOR_CODECS = (CborCodec, Cbor2Codec)
+JSON_CODECS = (JsonCodec, OrjsonCodec)
+
+
+def available_codecs(codecs) -> list:
+    """Returns the names of the installed codecs.
+
+    :param codecs: CBOR_CODECS or JSON_CODECS
+    """
+    return [codec.name for codec in codecs if codec.is_available()]
+
+
+def create_codec(codecs, name=None) -> Codec:
+    """Creates the codec with the given name or the best available codec.
+
+    The first accelerated codec is chosen, the reference implementation if none is.
+
+    :param codecs: CBOR_CODECS or JSON_CODECS
+    :param name: Name of the codec to create or None to select it automatically
+    """
+    if name:
+        for codec in codecs:
+            if codec.name == name:
+                if not codec.is_available():
+                    raise ImportError('Codec \'%s\' is not installed' % name)
+                return codec()
+        raise ValueError('Unknown codec \'%s\'' % name)
+
+    for codec in codecs:
+        if codec.is_available() and codec.is_accelerated():
+            log.debug('Using codec \'%s\'' % codec.name)
+            return codec()
+    return codecs[0]()
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+
+import zlib
+
+from cloudio.endpoint.interface import CloudioMessageFormat
+
+
+class CompressedMessageFormat(CloudioMessageFormat):
+    """Wraps the messages of another format (CBOR, JSON, ...) into a zlib envelope.
+
+    Only messages of at least 'threshold' bytes are compressed, smaller messages are sent as
+    encoded by the wrapped format. Received messages are inflated if needed and handed over to
+    the format identified by the first byte of the inflated payload.
+
+    All compressed messages start with the zlib header byte 0x78.
+    """
+
+    IDENTIFIER = 0x78
+    DEFAULT_THRESHOLD = 1024  # bytes
+    MAX_INFLATED_SIZE = 16 * 1024 * 1024  # Protects against decompression bombs
+
+    def __init__(self, message_format=None, threshold=DEFAULT_THRESHOLD, level=zlib.Z_DEFAULT_COMPRESSION):
+        """
+        :param message_format: Format of the wrapped messages. Only used to send messages, CBOR if None
+        :type message_format: CloudioMessageFormat or None
+        :param threshold: Minimum size in bytes of the messages to compress
+        :param level: zlib compression level (0-9, -1 for default)
+        """
+        self._format = message_format
+        self._threshold = threshold
+        self._level = level
+
+    def get_wrapped_format(self):
+        if self._format is None:
+            from cloudio.endpoint.message_format.factory import MessageFormatFactory
+            self._format = MessageFormatFactory.messageFormatByName('CBOR')
+        return self._format
+
+    def serialize_endpoint(self, endpoint):
+        return self.compress(self.get_wrapped_format().serialize_endpoint(endpoint))
+
+    def serialize_node(self, node):
+        return self.compress(self.get_wrapped_format().serialize_node(node))
+
+    def serialize_attribute(self, attribute):
+        return self.compress(self.get_wrapped_format().serialize_attribute(attribute))
+
+    def deserialize_attribute(self, data, attribute):
+        data = self.inflate(data)
+        self._format_of(data).deserialize_attribute(data, attribute)
+
+    def serialize_series(self, attribute, samples):
+        return self.compress(self.get_wrapped_format().serialize_series(attribute, samples))
+
+    def deserialize_series(self, data):
+        data = self.inflate(data)
+        return self._format_of(data).deserialize_series(data)
+
+    def dumps(self, data):
+        """Encodes the given python dict."""
+        return self.compress(self.get_wrapped_format().dumps(data))
+
+    def loads(self, data):
+        """Decodes the given payload into a python dict."""
+        data = self.inflate(data)
+        return self._format_of(data).loads(data)
+
+    @classmethod
+    def inflate(cls, data):
+        """Returns the payload contained in the envelope or the data as is if it is not compressed.
+        """
+        if isinstance(data, str) or not data or data[0] != cls.IDENTIFIER:
+            return data
+
+        decompressor = zlib.decompressobj()
+        inflated = decompressor.decompress(data, cls.MAX_INFLATED_SIZE)
+        if decompressor.unconsumed_tail:
+            raise IOError('Compressed message exceeds %d bytes' % cls.MAX_INFLATED_SIZE)
+        return inflated
+
+    def compress(self, payload):
+        """Returns the payload in a zlib envelope or as is if it is smaller than the threshold.
+        """
+        if len(payload) < self._threshold:
+            return payload
+
+        data = payload.encode('utf-8') if isinstance(payload, str) else payload
+        compressed = zlib.compress(data, self._level)
+        # Keep the original payload if it does not shrink
+        return compressed if len(compressed) < len(data) else payload
+
+    def _format_of(self, data):
+        from cloudio.endpoint.message_format.factory import MessageFormatFactory
+
+        message_format = MessageFormatFactory.messageFormat(ord(data[0]) if isinstance(data, str) else data[0])
+        if message_format is None or isinstance(message_format, CompressedMessageFormat):
+            raise IOError('Unsupported message format in compressed message')
+        return message_format
@@ -1,17 +1,56 @@
 # -*- coding: utf-8 -*-
 from .cbor_format import CborMessageFormat
+from .compressed_format import CompressedMessageFormat
 from .json_format import JsonMessageFormat
+from .msgpack_format import MessagePackMessageFormat
 
 
 class MessageFormatFactory():
     """Provides the necessary MessageFormat converter in order to serialize/deserialize a message.
 
+    Message formats are registered with a name and the first bytes identifying their messages.
     Currently supported message formats are:
-    - '{': json format
-    - '0b101': cbor json format
+    - 'JSON': '{'
+    - 'CBOR': '0b101' (CBOR map)
+    - 'MSGPACK': 0x80-0x8F, 0xDE, 0xDF (MessagePack map). Only if the 'msgpack' package is installed
+    - 'ZLIB': 0x78 (zlib envelope around one of the formats above)
+
+    All formats are decoded when received, but only the advertised ones are announced in the
+    'supportedFormats' of the @online message. 'MSGPACK' and 'ZLIB' are not advertised by default, as the
+    cloud side may not be able to decode them. An endpoint announces them only if it uses them itself
+    (see supported_formats()).
     """
 
     formats = {}  # key: int, values: CloudioMessageFormat
+    registry = {}  # key: int (first byte), value: format name
+    format_classes = {}  # key: format name, value: CloudioMessageFormat class. In registration order
+    _instances = {}  # key: format name, value: CloudioMessageFormat
+    _advertised = set()  # Names of the formats announced in 'supportedFormats' by default
+
+    @classmethod
+    def register(cls, name, format_class, identifiers, advertised=True):
+        """Registers a message format.
+
+        :param name: Name of the format as announced in the 'supportedFormats' of the @online message
+        :type name: str
+        :param format_class: Class implementing the CloudioMessageFormat interface
+        :param identifiers: First bytes identifying messages of this format
+        :type identifiers: list[int]
+        :param advertised: Announce the format in 'supportedFormats' by default
+        """
+        for identifier in identifiers:
+            if cls.registry.get(identifier, name) != name:
+                raise ValueError('Message format identifier %d already used by \'%s\'' %
+                                 (identifier, cls.registry[identifier]))
+        cls.format_classes[name] = format_class
+        cls._instances.pop(name, None)
+        cls.formats.clear()
+        for identifier in identifiers:
+            cls.registry[identifier] = name
+        if advertised:
+            cls._advertised.add(name)
+        else:
+            cls._advertised.discard(name)
 
     @classmethod
     def messageFormat(cls, messageFormatId):
@@ -22,11 +61,54 @@ class MessageFormatFactory():
             return cls.formats[messageFormatId]
         else:
             newFormat = None
-            #123 = "{"
-            if messageFormatId == 123:
-                newFormat = JsonMessageFormat()
-                cls.formats[messageFormatId] = newFormat
-            elif (messageFormatId & 0b11100000) == 0b10100000:
-                newFormat = CborMessageFormat()
+            name = cls.registry.get(messageFormatId)
+            if name:
+                newFormat = cls.messageFormatByName(name)
+            if newFormat:
                 cls.formats[messageFormatId] = newFormat
             return newFormat
+
+    @classmethod
+    def messageFormatByName(cls, name):
+        """Returns the MessageFormat with the given name (case insensitive) or None if not available.
+        """
+        for format_name, format_class in cls.format_classes.items():
+            if format_name.lower() == name.lower():
+                if format_name not in cls._instances:
+                    if not cls._is_available(format_class):
+                        return None
+                    cls._instances[format_name] = format_class()
+                return cls._instances[format_name]
+        return None
+
+    @classmethod
+    def newMessageFormat(cls, name, **options):
+        """Returns a new MessageFormat with the given name (case insensitive) and options or None if not available.
+
+        :param options: Passed to the constructor of the format. Ex: lean=True
+        """
+        for format_name, format_class in cls.format_classes.items():
+            if format_name.lower() == name.lower():
+                return format_class(**options) if cls._is_available(format_class) else None
+        return None
+
+    @classmethod
+    def supported_formats(cls, used_formats=()):
+        """Returns the names of the available message formats to announce in 'supportedFormats'.
+
+        :param used_formats: Names of the formats used by the endpoint, announced even if not advertised by default
+        :rtype: list[str]
+        """
+        return [name for name, format_class in cls.format_classes.items()
+                if (name in cls._advertised or name in used_formats) and cls._is_available(format_class)]
+
+    @staticmethod
+    def _is_available(format_class):
+        return format_class.is_available() if hasattr(format_class, 'is_available') else True
+
+
+MessageFormatFactory.register('JSON', JsonMessageFormat, (123,))  # 123 = "{"
+MessageFormatFactory.register('CBOR', CborMessageFormat, range(0b10100000, 0b11000000))
+MessageFormatFactory.register('MSGPACK', MessagePackMessageFormat, MessagePackMessageFormat.IDENTIFIERS,
+                              advertised=False)
+MessageFormatFactory.register('ZLIB', CompressedMessageFormat, (CompressedMessageFormat.IDENTIFIER,), advertised=False)
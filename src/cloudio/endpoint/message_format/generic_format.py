@@ -1,18 +1,106 @@
 # -*- coding: utf-8 -*-
 
+import base64
 import inspect
 import json
+from math import isfinite
 
 from cloudio.common.utils import timestamp_helpers as timestamp_helpers
+from cloudio.endpoint.attribute import CloudioAttribute
 from cloudio.endpoint.attribute.type import CloudioAttributeType as AttributeType
 from cloudio.endpoint.interface.message_format import CloudioMessageFormat
+from cloudio.endpoint.message_format.series import SERIES_ENCODING, encode_series, decode_series
+from cloudio.endpoint.object.object import _InternalObject
+from cloudio.endpoint.runtime import CloudioRuntimeNode, CloudioRuntimeObject
 
 
 # Links:
 # - http://stackoverflow.com/questions/3768895/how-to-make-a-class-json-serializable
 
+
+def supported_formats(endpoint=None):
+    """Returns the names of the message formats announced in the @online message of the endpoint.
+
+    Endpoints providing get_supported_formats() decide themselves, the others announce the formats
+    advertised by default in the MessageFormatFactory.
+    """
+    if endpoint is not None and hasattr(endpoint, 'get_supported_formats'):
+        return endpoint.get_supported_formats()
+    from cloudio.endpoint.message_format.factory import MessageFormatFactory
+    return MessageFormatFactory.supported_formats()
+
+
+def is_runtime_node(node) -> bool:
+    """Returns True if the node can be serialized without reflection (not overriding to_json()).
+    """
+    return getattr(type(node), 'to_json', None) is CloudioRuntimeNode.to_json
+
+
+def internal_runtime_object(obj):
+    """Returns the internal object to serialize or None if the object needs to be reflected.
+
+    :rtype: _InternalObject or None
+    """
+    if getattr(type(obj), 'to_json', None) is CloudioRuntimeObject.to_json:
+        obj = obj._internal  # Runtime objects delegate to their internal object
+    return obj if getattr(type(obj), 'to_json', None) is _InternalObject.to_json else None
+
+
+def is_runtime_attribute(attribute) -> bool:
+    """Returns True if the attribute can be serialized without reflection (not overriding to_json()).
+    """
+    return getattr(type(attribute), 'to_json', None) is CloudioAttribute.to_json
+
+
+def attribute_update_template(attribute, format_name, build_template):
+    """Returns the pre-encoded static part (type and constraint) of the attribute's @update messages.
+
+    The template is built on first use by calling build_template(type_string, constraint_string)
+    and stored in the attribute. It is built again if the type of the attribute changes.
+
+    :param format_name: Name of the message format the template is used by
+    :param build_template: Function returning the template for the given type and constraint strings
+    """
+    templates = attribute._update_templates
+    if templates is None:
+        templates = attribute._update_templates = {}
+
+    entry = templates.get(format_name)
+    if entry is None or entry[0] is not attribute._type:
+        entry = (attribute._type, build_template(attribute.get_type_as_string(),
+                                                 attribute.get_constraint().to_string()))
+        templates[format_name] = entry
+    return entry[1]
+
+
+def lean_attribute_update(attribute) -> dict:
+    """Returns the lean @update message of the attribute.
+
+    The type and constraint, already known from the @online message, are left out and the keys are
+    shortened to one letter: 't' (timestamp as integer milliseconds), 'v' (value) and 'd' (decimals).
+    Numbers with declared decimals (see CloudioAttribute.set_precision()) are sent as fixed-point
+    integer together with the number of decimals.
+    """
+    data = {}
+    timestamp = attribute.get_timestamp()
+    if timestamp:
+        data['t'] = int(timestamp)
+
+    value = attribute.get_value()
+    decimals = attribute._decimals
+    if decimals is not None and type(value) is float and isfinite(value):
+        data['v'] = int(round(value * 10 ** decimals))
+        data['d'] = decimals
+    else:
+        data['v'] = value
+    return data
+
+
 class GenericMessageFormat(CloudioMessageFormat):
     """Returns the endpoint element in python dict format
+
+    Runtime nodes, objects and attributes are walked directly. Other (user defined) classes
+    are reflected using the generic JSON encoder.
     """
 
     def __init__(self):
@@ -24,25 +112,18 @@ class GenericMessageFormat(CloudioMessageFormat):
         nodes = {}
 
         for key, node in endpoint.nodes.items():
-            nodes[node.get_name()] = node
+            nodes[node.get_name()] = self._node_to_dict(node)
 
         data['nodes'] = nodes
 
         data['version'] = "v0.2"
         data['messageFormatVersion'] = 2
-        data['supportedFormats'] = ["JSON", "CBOR"]
+        data['supportedFormats'] = supported_formats(endpoint)
 
-        message = ''
-        # Encode data to json formatted byte array
-        message += self._encoder.encode(data)
-        return json.loads(message)
+        return data
 
     def serialize_node(self, node):
-        message = ''
-
-        # Encode data to json formatted byte array
-        message += self._encoder.encode(node)
-        return json.loads(message)
+        return self._node_to_dict(node)
 
     def serialize_attribute(self, attribute):
         data = {}
@@ -65,6 +146,15 @@ class GenericMessageFormat(CloudioMessageFormat):
         data_dict = data
         """:type: dict"""
 
+        # Lean @update messages: timestamp in milliseconds, fixed-point value
+        if isinstance(data_dict, dict) and 'v' in data_dict:
+            if 't' in data_dict:
+                data_dict['timestamp'] = data_dict['t'] / 1000.0
+            value = data_dict['v']
+            if data_dict.get('d') is not None and value is not None:
+                value = value / 10 ** data_dict['d']
+            data_dict['value'] = value
+
         # In case there is no timestamp present, create one using
         # the current time
         if not 'timestamp' in data_dict:
@@ -98,6 +188,71 @@ class GenericMessageFormat(CloudioMessageFormat):
                 else:
                     raise IOError('Attribute type not supported!')
 
+    def serialize_series(self, attribute, samples):
+        data = {}
+        data['type'] = attribute.get_type_as_string()
+        data['constraint'] = attribute.get_constraint().to_string()
+        data['encoding'] = SERIES_ENCODING
+        data['data'] = encode_series(samples)
+        return data
+
+    def deserialize_series(self, data):
+        """Returns the samples of the series. The encoded samples may be given as bytes or base64 string.
+        """
+        if data.get('encoding') != SERIES_ENCODING:
+            raise IOError('Series encoding not supported!')
+
+        encoded = data['data']
+        if isinstance(encoded, str):
+            encoded = base64.b64decode(encoded)
+        return decode_series(encoded)
+
+    def _node_to_dict(self, node):
+        if not is_runtime_node(node):
+            return self._reflect(node)
+
+        data = {}
+        if len(node.objects) > 0:
+            data['objects'] = {name: self._object_to_dict(obj) for name, obj in node.objects.items()}
+        data['implements'] = list(node.interfaces)
+        return data
+
+    def _object_to_dict(self, obj):
+        internal = internal_runtime_object(obj)
+        if internal is None:
+            return self._reflect(obj)
+        obj = internal
+
+        return {
+            'conforms': obj.conforms,
+            'objects': {name: self._object_to_dict(child) for name, child in obj.objects.items()},
+            'attributes': {name: self._attribute_to_dict(attribute) for name, attribute in obj._attributes.items()}
+        }
+
+    def _attribute_to_dict(self, attribute):
+        if not is_runtime_attribute(attribute):
+            return self._reflect(attribute)
+
+        value = attribute.get_value()
+        constraint = attribute.get_constraint()
+        return {
+            'type': AttributeType.from_raw_type_to_string(value),
+            'value': value,
+            'constraint': constraint.to_string() if constraint is not None else None
+        }
+
+    def _reflect(self, item):
+        """Converts the given item to a python dict using the generic (reflection based) JSON encoder.
+        """
+        return json.loads(self._encoder.encode(item))
+
+
+# Members of the model classes never published: References causing circular references and bookkeeping
+_EXCLUDED_MEMBERS = frozenset(('parent', '_parent', '_externalObject', 'log',
+                               '_static_attribute_names', '_attribute_descriptors',  # CloudioObject
+                               '_object_field_names', '_structure_version', '_structure_changes',  # CloudioNode
+                               '_topic_uuid'))
+
 
 class _GenericMessageEncoder(json.JSONEncoder):
     def __init__(self):
@@ -113,8 +268,7 @@ class _GenericMessageEncoder(json.JSONEncoder):
                      for key, value in inspect.getmembers(obj)
                      if not key.startswith("__") and
                      not key.startswith("_abc_") and
-                     not key in ('parent', '_parent', '_externalObject') and
-                     not key in ('log',) and
+                     key not in _EXCLUDED_MEMBERS and
                      not inspect.isabstract(value) and
                      not inspect.isbuiltin(value) and
                      not inspect.isfunction(value) and
@@ -1,7 +1,34 @@
+import base64
 import json
+from json.encoder import encode_basestring_ascii
+from math import isfinite
 
 from cloudio.endpoint.interface import CloudioMessageFormat
-from cloudio.endpoint.message_format.generic_format import GenericMessageFormat
+from cloudio.endpoint.message_format.codec import JSON_CODECS, create_codec, dumps_json
+from cloudio.endpoint.message_format.generic_format import GenericMessageFormat, attribute_update_template
+from cloudio.endpoint.message_format.generic_format import lean_attribute_update
+
+
+def _build_update_template(type_string, constraint_string):
+    """Returns the start of the @update messages, with and without timestamp.
+    """
+    static_part = '{"type": %s, "constraint": %s' % (json.dumps(type_string), json.dumps(constraint_string))
+    return static_part + ', "timestamp": ', static_part + ', "value": '
+
+
+def _dumps_value(value):
+    """Encodes an attribute value the same way the JSON codecs do (NaN and infinite floats as null).
+    """
+    value_type = type(value)
+    if value_type is str:
+        return encode_basestring_ascii(value)
+    elif value_type is float:
+        return float.__repr__(value) if isfinite(value) else 'null'
+    elif value_type is bool:
+        return 'true' if value else 'false'
+    elif value_type is int:
+        return int.__repr__(value)
+    return dumps_json(value)
 
 
 class JsonMessageFormat(CloudioMessageFormat):
@@ -9,26 +36,52 @@ class JsonMessageFormat(CloudioMessageFormat):
 
     All messages have to start with the identifier for this format 0x7B ('{' character).
     """
-    def __init__(self):
+    def __init__(self, codec=None, lean=False):
+        """
+        :param codec: Codec used to encode the model and to decode messages. The fastest installed codec if None
+        :type codec: Codec or None
+        :param lean: Send lean @update messages (see lean_attribute_update()). JSON has no 32 bit floats
+        """
+        self._codec = codec if codec else create_codec(JSON_CODECS)
+        self._lean = lean
         self._genericFormat = GenericMessageFormat()
-        pass
+
     def serialize_endpoint(self, endpoint):
-        message = ''
-        # Encode data to json formatted byte array
-        message += json.dumps(self._genericFormat.serialize_endpoint(endpoint))
-        return message
+        # Encode data to json formatted string
+        return self._codec.dumps(self._genericFormat.serialize_endpoint(endpoint))
 
     def serialize_node(self, node):
-        message = ''
-        # Encode data to json formatted byte array
-        message += json.dumps(self._genericFormat.serialize_node(node))
-        return message
+        # Encode data to json formatted string
+        return self._codec.dumps(self._genericFormat.serialize_node(node))
 
     def serialize_attribute(self, attribute):
-        message = ''
-        # Encode data to json formatted byte array
-        message += json.dumps(self._genericFormat.serialize_attribute(attribute))
-        return message
+        if self._lean:
+            return self._codec.dumps(lean_attribute_update(attribute))
+
+        # Only the timestamp and the value are encoded, the rest is taken from the attribute's template
+        with_timestamp, without_timestamp = attribute_update_template(attribute, 'json', _build_update_template)
+
+        timestamp = attribute.get_timestamp()
+        if timestamp:
+            return ''.join((with_timestamp, _dumps_value(timestamp / 1000.0), ', "value": ',
+                            _dumps_value(attribute.get_value()), '}'))
+        return ''.join((without_timestamp, _dumps_value(attribute.get_value()), '}'))
 
     def deserialize_attribute(self, data, attribute):
-        self._genericFormat.deserialize_attribute(json.loads(data), attribute)
\ No newline at end of file
+        self._genericFormat.deserialize_attribute(self._codec.loads(data), attribute)
+
+    def serialize_series(self, attribute, samples):
+        data = self._genericFormat.serialize_series(attribute, samples)
+        data['data'] = base64.b64encode(data['data']).decode('ascii')  # JSON has no binary type
+        return self._codec.dumps(data)
+
+    def deserialize_series(self, data):
+        return self._genericFormat.deserialize_series(self._codec.loads(data))
+
+    def dumps(self, data):
+        """Encodes the given python dict."""
+        return self._codec.dumps(data)
+
+    def loads(self, data):
+        """Decodes the given payload into a python dict."""
+        return self._codec.loads(data)
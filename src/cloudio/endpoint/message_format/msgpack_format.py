@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+from cloudio.endpoint.interface import CloudioMessageFormat
+from cloudio.endpoint.message_format.generic_format import GenericMessageFormat, lean_attribute_update
+
+try:
+    import msgpack
+except ImportError:  # Optional dependency
+    msgpack = None
+
+
+class MessagePackMessageFormat(CloudioMessageFormat):
+    """Encodes messages using MessagePack.
+
+    Messages are maps, so they start with one of the map identifiers of this format: 0x80-0x8F
+    (fixmap), 0xDE (map 16) or 0xDF (map 32).
+
+    Needs the 'msgpack' package to be installed.
+    """
+
+    # First bytes identifying this format
+    IDENTIFIERS = tuple(range(0x80, 0x90)) + (0xDE, 0xDF)
+
+    def __init__(self, lean=False):
+        """
+        :param lean: Send lean @update messages (see lean_attribute_update())
+        """
+        if msgpack is None:
+            raise ImportError('MessagePack message format needs the \'msgpack\' package')
+        self._genericFormat = GenericMessageFormat()
+        self._lean = lean
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return msgpack is not None
+
+    def serialize_endpoint(self, endpoint):
+        return msgpack.packb(self._genericFormat.serialize_endpoint(endpoint), use_bin_type=True)
+
+    def serialize_node(self, node):
+        return msgpack.packb(self._genericFormat.serialize_node(node), use_bin_type=True)
+
+    def serialize_attribute(self, attribute):
+        if self._lean:
+            return msgpack.packb(lean_attribute_update(attribute), use_bin_type=True,
+                                 use_single_float=attribute._float32)
+        return msgpack.packb(self._genericFormat.serialize_attribute(attribute), use_bin_type=True)
+
+    def deserialize_attribute(self, data, attribute):
+        self._genericFormat.deserialize_attribute(msgpack.unpackb(data, raw=False), attribute)
+
+    def serialize_series(self, attribute, samples):
+        return msgpack.packb(self._genericFormat.serialize_series(attribute, samples), use_bin_type=True)
+
+    def deserialize_series(self, data):
+        return self._genericFormat.deserialize_series(msgpack.unpackb(data, raw=False))
+
+    def dumps(self, data):
+        """Encodes the given python dict."""
+        return msgpack.packb(data, use_bin_type=True)
+
+    def loads(self, data):
+        """Decodes the given payload into a python dict."""
+        return msgpack.unpackb(data, raw=False)
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+
+import struct
+
+# Encoding of the @series messages. Samples are (timestamp, value) tuples with timestamps in milliseconds
+#
+# Timestamps and values are compressed as described in 'Gorilla: A Fast, Scalable, In-Memory Time Series
+# Database' (Pelkonen et al., 2015):
+# - Timestamps: The difference between two consecutive deltas (delta-of-delta) is stored using
+#   '0' (same delta), '10' + 7 bits, '110' + 9 bits, '1110' + 12 bits or '1111' + 64 bits
+# - Values: The value is XOR-ed with the previous one. '0' if identical, else '10' + the meaningful
+#   bits if they fit into the previous window, else '11' + 5 bits leading zeros + 6 bits length + meaningful bits
+#
+# The data starts with the number of samples (32 bits), the first timestamp (64 bits) and the first value (64 bits).
+SERIES_ENCODING = 'gorilla'
+
+_DOUBLE = struct.Struct('>d')
+_UINT64 = struct.Struct('>Q')
+
+# (prefix, prefix length, value bits) per delta-of-delta range
+_DOD_BUCKETS = ((0b10, 2, 7), (0b110, 3, 9), (0b1110, 4, 12))
+
+
+def _float_to_bits(value: float) -> int:
+    return _UINT64.unpack(_DOUBLE.pack(value))[0]
+
+
+def _bits_to_float(bits: int) -> float:
+    return _DOUBLE.unpack(_UINT64.pack(bits))[0]
+
+
+class _BitWriter(object):
+    def __init__(self):
+        self._buffer = bytearray()
+        self._bits = 0  # Bits not yet written to the buffer
+        self._count = 0  # Number of bits in _bits
+
+    def write(self, value: int, count: int):
+        self._bits = (self._bits << count) | (value & ((1 << count) - 1))
+        self._count += count
+        if self._count >= 64:
+            remaining = self._count & 7
+            self._buffer += (self._bits >> remaining).to_bytes(self._count >> 3, 'big')
+            self._bits &= (1 << remaining) - 1
+            self._count = remaining
+
+    def get_bytes(self) -> bytes:
+        padding = -self._count & 7
+        return bytes(self._buffer) + (self._bits << padding).to_bytes((self._count + padding) >> 3, 'big')
+
+
+class _BitReader(object):
+    def __init__(self, data: bytes):
+        self._data = data
+        self._position = 0  # Next byte to load
+        self._bits = 0
+        self._count = 0
+
+    def read(self, count: int) -> int:
+        while self._count < count:
+            if self._position >= len(self._data):
+                raise IOError('Truncated series data')
+            self._bits = (self._bits << 8) | self._data[self._position]
+            self._position += 1
+            self._count += 8
+        self._count -= count
+        value = self._bits >> self._count
+        self._bits &= (1 << self._count) - 1
+        return value
+
+
+def encode_series(samples) -> bytes:
+    """Encodes the samples into the compressed series representation.
+
+    :param samples: Samples ordered by time
+    :type samples: list[(int, float)]
+    """
+    writer = _BitWriter()
+    writer.write(len(samples), 32)
+    if not samples:
+        return writer.get_bytes()
+
+    timestamp, value = samples[0]
+    previous_timestamp = int(timestamp)
+    previous_bits = _float_to_bits(value)
+    writer.write(previous_timestamp, 64)
+    writer.write(previous_bits, 64)
+
+    previous_delta = 0
+    leading, trailing = -1, 0  # Window of the meaningful bits of the previous XOR. None yet
+
+    for timestamp, value in samples[1:]:
+        # Timestamp
+        timestamp = int(timestamp)
+        delta = timestamp - previous_timestamp
+        dod = delta - previous_delta
+        if dod == 0:
+            writer.write(0, 1)
+        else:
+            for prefix, prefix_length, value_bits in _DOD_BUCKETS:
+                if -(1 << (value_bits - 1)) < dod <= (1 << (value_bits - 1)):
+                    writer.write(prefix, prefix_length)
+                    writer.write(dod, value_bits)
+                    break
+            else:
+                writer.write(0b1111, 4)
+                writer.write(dod, 64)
+        previous_timestamp, previous_delta = timestamp, delta
+
+        # Value
+        bits = _float_to_bits(value)
+        xor = bits ^ previous_bits
+        previous_bits = bits
+        if xor == 0:
+            writer.write(0, 1)
+            continue
+
+        xor_leading = min(64 - xor.bit_length(), 31)
+        xor_trailing = (xor & -xor).bit_length() - 1
+        if leading >= 0 and xor_leading >= leading and xor_trailing >= trailing:
+            writer.write(0b10, 2)
+            writer.write(xor >> trailing, 64 - leading - trailing)
+        else:
+            leading, trailing = xor_leading, xor_trailing
+            length = 64 - leading - trailing
+            writer.write(0b11, 2)
+            writer.write(leading, 5)
+            writer.write(length, 6)  # 64 is written as 0
+            writer.write(xor >> trailing, length)
+
+    return writer.get_bytes()
+
+
+def decode_series(data: bytes):
+    """Decodes the compressed series representation.
+
+    :return: Samples as (timestamp, value) tuples with timestamps in milliseconds
+    :rtype: list[(int, float)]
+    """
+    reader = _BitReader(data)
+    count = reader.read(32)
+    if count == 0:
+        return []
+
+    timestamp = reader.read(64)
+    if timestamp & (1 << 63):
+        timestamp -= 1 << 64
+    bits = reader.read(64)
+    samples = [(timestamp, _bits_to_float(bits))]
+
+    delta = 0
+    leading, trailing = 0, 0
+    for _ in range(count - 1):
+        # Timestamp
+        if reader.read(1):
+            value_bits = 64
+            for bucket_bits in (7, 9, 12):
+                if not reader.read(1):
+                    value_bits = bucket_bits
+                    break
+            dod = reader.read(value_bits)
+            if dod > (1 << (value_bits - 1)):
+                dod -= 1 << value_bits
+            delta += dod
+        timestamp += delta
+
+        # Value
+        if reader.read(1):
+            if reader.read(1):
+                leading = reader.read(5)
+                length = reader.read(6) or 64
+                trailing = 64 - leading - length
+            bits ^= reader.read(64 - leading - trailing) << trailing
+        samples.append((timestamp, _bits_to_float(bits)))
+
+    return samples
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+
+from cloudio.endpoint.attribute.type import CloudioAttributeType as AttributeType
+from cloudio.endpoint.message_format.compressed_format import CompressedMessageFormat
+from cloudio.endpoint.message_format.generic_format import GenericMessageFormat
+from cloudio.endpoint.message_format.generic_format import is_runtime_node, internal_runtime_object
+from cloudio.endpoint.message_format.generic_format import is_runtime_attribute, supported_formats
+
+# Stands for the attribute values (and the nodes in the @online message) while building templates
+PLACEHOLDER = '\x00cloudio-placeholder\x00'
+
+
+class _EmptyEndpoint(object):
+    """Stands for an endpoint without its nodes while building the @online template.
+    """
+    nodes = {}
+
+    def __init__(self, supported_formats):
+        self._supported_formats = supported_formats
+
+    def get_supported_formats(self):
+        return self._supported_formats
+
+
+class _NodeTemplate(object):
+    """Encoded node description split at the attribute values.
+    """
+    def __init__(self, structure_version, fragments, attributes, types):
+        self.structure_version = structure_version
+        self.fragments = fragments  # Encoded parts between the attribute values
+        self.attributes = attributes  # Attributes in the order of their values
+        self.types = types  # Type strings of the attributes used when building the template
+
+
+class StructureCache(object):
+    """Caches the encoded @online and @nodeAdded messages of one message format.
+
+    The structure of a node (objects, attributes, types, constraints, interfaces) is encoded once.
+    The resulting template keeps the encoded parts between the attribute values, so that only the
+    current values need to be encoded when a message is built. A template is built again as soon
+    as the node reports a change of its structure or an attribute changes its type.
+
+    Nodes using static models (classes serialized by reflection) are not cached.
+    """
+
+    def __init__(self, message_format):
+        """
+        :param message_format: The format to cache the messages for
+        :type message_format: CloudioMessageFormat
+        """
+        super(StructureCache, self).__init__()
+
+        # Templates are built using the format inside the zlib envelope, compression is applied on the whole message
+        self._envelope = message_format if isinstance(message_format, CompressedMessageFormat) else None
+        self._format = self._envelope.get_wrapped_format() if self._envelope else message_format
+
+        self._generic_format = GenericMessageFormat()
+        self._placeholder = self._format.dumps(PLACEHOLDER)
+        self._empty = self._placeholder[:0]  # Empty str or bytes, depending on the format
+        self._node_templates = {}  # key: CloudioNode, value: _NodeTemplate or None if not cacheable
+        self._endpoint_template = None  # tuple: (node names, fragments)
+
+        self.hits = 0
+        self.misses = 0
+
+    def serialize_endpoint(self, endpoint):
+        """Returns the encoded @online message of the endpoint.
+        """
+        nodes = list(endpoint.nodes.values())
+        return self._compress(self._join_endpoint(endpoint, nodes, [self._encode_node(node) for node in nodes]))
+
+    def iter_announcement(self, endpoint, max_size=0):
+        """Yields the messages announcing the endpoint as tuples (node, payload).
+
+        The first message is the @online message (node is None). If the @online message would exceed
+        max_size bytes, it is sent without nodes and each node follows in its own @nodeAdded message.
+        Nodes are encoded one after the other, so at most max_size bytes plus one node are kept in memory.
+
+        :param max_size: Maximum size in bytes of the @online message (before compression). No limit if 0
+        """
+        nodes = list(endpoint.nodes.values())
+        if not max_size:
+            yield None, self.serialize_endpoint(endpoint)
+            return
+
+        payloads = []
+        size = 0
+        for node in nodes:
+            payload = self._encode_node(node)
+            size += len(payload)
+            payloads.append(payload)
+            if size > max_size:
+                break
+        else:
+            message = self._join_endpoint(endpoint, nodes, payloads)
+            if len(message) <= max_size:
+                yield None, self._compress(message)
+                return
+
+        # Too large for a single message, send the nodes separately
+        yield None, self._compress(self._join_endpoint(endpoint, (), ()))
+        for index, node in enumerate(nodes):
+            if index < len(payloads):
+                payload, payloads[index] = payloads[index], None  # Release the payload once sent
+            else:
+                payload = self._encode_node(node)
+            yield node, self._compress(payload)
+
+    def serialize_node(self, node):
+        """Returns the encoded @nodeAdded message of the node.
+        """
+        return self._compress(self._encode_node(node))
+
+    def clear(self):
+        """Drops all templates."""
+        self._node_templates.clear()
+        self._endpoint_template = None
+
+    def _join_endpoint(self, endpoint, nodes, payloads):
+        """Returns the @online message of the endpoint containing the given encoded nodes.
+        """
+        formats = list(supported_formats(endpoint))
+        empty_endpoint = _EmptyEndpoint(formats)
+        names = tuple(node.get_name() for node in nodes)
+        key = (names, tuple(formats))
+        if self._endpoint_template is None or self._endpoint_template[0] != key:
+            data = self._generic_format.serialize_endpoint(empty_endpoint)
+            data['nodes'] = {name: PLACEHOLDER for name in names}
+            self._endpoint_template = (key, self._split(self._format.dumps(data), len(names)))
+
+        fragments = self._endpoint_template[1]
+        if fragments is None:
+            # Node name containing the placeholder
+            data = self._generic_format.serialize_endpoint(empty_endpoint)
+            data['nodes'] = {name: self._format.loads(payload) for name, payload in zip(names, payloads)}
+            return self._format.dumps(data)
+
+        parts = [fragments[0]]
+        for payload, fragment in zip(payloads, fragments[1:]):
+            parts.append(payload)
+            parts.append(fragment)
+        return self._empty.join(parts)
+
+    def _encode_node(self, node):
+        template = self._node_templates.get(node)
+        if template is not None and template.structure_version == node.get_structure_version():
+            payload = self._render(template)
+            if payload is not None:
+                self.hits += 1
+                return payload
+
+        self.misses += 1
+        template = self._build(node)
+        self._node_templates[node] = template
+        if template is not None:
+            payload = self._render(template)
+            if payload is not None:
+                return payload
+        return self._format.serialize_node(node)
+
+    def _build(self, node):
+        """Builds the template of the node or returns None if the node can not be cached.
+        """
+        if not is_runtime_node(node):
+            return None
+
+        structure_version = node.get_structure_version()
+        attributes = []
+        data = self._node_to_dict(node, attributes)
+        if data is None:
+            return None
+
+        fragments = self._split(self._format.dumps(data), len(attributes))
+        if fragments is None:
+            return None
+
+        types = [AttributeType.from_raw_type_to_string(attribute.get_value()) for attribute in attributes]
+        return _NodeTemplate(structure_version, fragments, attributes, types)
+
+    def _render(self, template):
+        """Returns the encoded node using the current attribute values or None if the template is outdated.
+        """
+        dumps = self._format.dumps
+        from_raw_type_to_string = AttributeType.from_raw_type_to_string
+        fragments = template.fragments
+
+        parts = [fragments[0]]
+        for index, attribute in enumerate(template.attributes):
+            value = attribute.get_value()
+            if from_raw_type_to_string(value) != template.types[index]:
+                return None
+            parts.append(dumps(value))
+            parts.append(fragments[index + 1])
+        return self._empty.join(parts)
+
+    def _split(self, payload, count):
+        """Splits the payload at the placeholders. Returns None if the placeholder count does not match.
+        """
+        fragments = payload.split(self._placeholder)
+        return fragments if len(fragments) == count + 1 else None
+
+    def _compress(self, payload):
+        return self._envelope.compress(payload) if self._envelope else payload
+
+    # Same structure as GenericMessageFormat, with attribute values replaced by the placeholder
+    def _node_to_dict(self, node, attributes):
+        data = {}
+        if len(node.objects) > 0:
+            objects = self._objects_to_dict(node.objects, attributes)
+            if objects is None:
+                return None
+            data['objects'] = objects
+        data['implements'] = list(node.interfaces)
+        return data
+
+    def _objects_to_dict(self, objects, attributes):
+        data = {}
+        for name, obj in objects.items():
+            internal = internal_runtime_object(obj)
+            if internal is None:
+                return None
+
+            child_objects = self._objects_to_dict(internal.objects, attributes)
+            if child_objects is None:
+                return None
+
+            object_attributes = {}
+            for attribute_name, attribute in internal._attributes.items():
+                if not is_runtime_attribute(attribute):
+                    return None
+                constraint = attribute.get_constraint()
+                object_attributes[attribute_name] = {
+                    'type': AttributeType.from_raw_type_to_string(attribute.get_value()),
+                    'value': PLACEHOLDER,
+                    'constraint': constraint.to_string() if constraint is not None else None
+                }
+                attributes.append(attribute)
+
+            data[name] = {'conforms': internal.conforms, 'objects': child_objects, 'attributes': object_attributes}
+        return data
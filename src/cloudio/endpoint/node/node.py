@@ -1,36 +1,54 @@
 # -*- coding: utf-8 -*-
 
+from collections import deque
+
 from cloudio.endpoint.interface.object_container import CloudioObjectContainer
 from cloudio.endpoint.exception.cloudio_modification_exception import CloudioModificationException
 from cloudio.endpoint.topicuuid import TopicUuid
 from cloudio.endpoint.object import CloudioObject
 
+_STRUCTURE_CHANGES_KEPT = 64  # Number of the latest structure changes kept (see get_elements_added())
+
 
 class CloudioNode(CloudioObjectContainer):
+    _object_field_names = ()  # Names of the class members being cloud.iO objects
+
+    def __init_subclass__(cls, **kwargs):
+        super(CloudioNode, cls).__init_subclass__(**kwargs)
+        # Look the objects declared in the class up once per class, not for every instance
+        cls._object_field_names = tuple(field for field in dir(cls)
+                                        if isinstance(getattr(cls, field, None), CloudioObject))
+
     def __init__(self):
         super(CloudioNode, self).__init__()
         self.parent = None
         self.name = None
         self.interfaces = []
         self.objects = {}           # type: dict[CloudioObject]
+        self._structure_version = 0  # Incremented on every change of the node's structure
+        # Latest structure changes: (structure version, object or attribute added or None for other changes)
+        self._structure_changes = deque(maxlen=_STRUCTURE_CHANGES_KEPT)
+        self._topic_uuid = None  # type: TopicUuid or None # Set as soon as the node is part of an endpoint
 
         self._update_cloudio_objects()
 
     def _update_cloudio_objects(self):
-        # Check each field of the actual node
-        for field in dir(self):
-            # Check if it is an attribute and ...
-            attr = getattr(self, field)
-            if attr:
-                if isinstance(attr, CloudioObject):
-                    print('Node: Got an attribute based on an CloudioObject class')
+        # Check each object field of the actual node
+        for field in self._object_field_names:
+            if isinstance(getattr(self, field), CloudioObject):
+                print('Node: Got an attribute based on an CloudioObject class')
 
 
     ######################################################################
     # Interface implementations
     #
     def get_uuid(self):
-        return TopicUuid(self)
+        if self._topic_uuid is None:
+            topic_uuid = TopicUuid(self)
+            if not topic_uuid.is_attached():
+                return topic_uuid
+            self._topic_uuid = topic_uuid
+        return self._topic_uuid
 
     def get_name(self):
         return self.name
@@ -74,6 +92,34 @@ class CloudioNode(CloudioObjectContainer):
         if self.parent:
             self.parent.attribute_has_changed_by_cloud(attribute)
 
+    def structure_has_changed(self, element=None):
+        self._structure_version += 1
+        self._structure_changes.append((self._structure_version, element))
+
+    def get_structure_version(self):
+        """Returns a number changing each time the structure of the node changes."""
+        return self._structure_version
+
+    def get_elements_added(self, structure_version):
+        """Returns the objects and attributes added since the given structure version, oldest first.
+
+        Returns None if the node changed otherwise since then or if the changes are not known anymore.
+
+        :rtype: list or None
+        """
+        if structure_version == self._structure_version:
+            return []
+        if not self._structure_changes or self._structure_changes[0][0] > structure_version + 1:
+            return None
+
+        elements = []
+        for version, element in self._structure_changes:
+            if version > structure_version:
+                if element is None:
+                    return None
+                elements.append(element)
+        return elements
+
     def is_node_registered_within_endpoint(self):
         return self.parent and self.parent.is_node_registered_within_endpoint()
 
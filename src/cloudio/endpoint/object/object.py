@@ -1,14 +1,46 @@
 # -*- coding: utf-8 -*-
 
-import types
-
 from cloudio.endpoint.attribute import CloudioAttribute
+from cloudio.endpoint.attribute.descriptor import CloudioAttributeDescriptor
 from cloudio.endpoint.exception.cloudio_modification_exception import CloudioModificationException
-from cloudio.endpoint.exception.invalid_cloudio_attribute_exception import InvalidCloudioAttributeException
 from cloudio.endpoint.interface.attribute_container import CloudioAttributeContainer
 from cloudio.endpoint.interface.object_container import CloudioObjectContainer
 from cloudio.endpoint.topicuuid import TopicUuid
 
+# Types of the fields published as static attributes
+_STATIC_TYPES = (bool, int, float, bytes, str)
+
+
+def _compile_static_attribute_names(cls):
+    """Returns the names of the class members of the given class that are static attributes."""
+    names = []
+    for field in dir(cls):
+        if field.startswith('__') and field.endswith('__'):
+            continue
+        if isinstance(getattr(cls, field, None), _STATIC_TYPES):
+            names.append(field)
+    return tuple(names)
+
+
+def _compile_attribute_descriptors(cls):
+    """Returns the attribute descriptors (ex. 'temperature = Measure(float)') of the given class."""
+    return tuple(descriptor for descriptor in (getattr(cls, field, None) for field in dir(cls))
+                 if isinstance(descriptor, CloudioAttributeDescriptor))
+
+
+def _descriptor_object_to_json(self, encoder):
+    """Serializer of the classes declaring attribute descriptors (see CloudioObject.__init_subclass__()).
+
+    Only the class (conforms), the child objects and the attributes (static ones included) are published,
+    like runtime objects. The fields of the instance and of the class (descriptors included) are not reflected.
+    """
+    internal = self._internal
+    return encoder.default({
+        'conforms': internal.conforms,
+        'objects': internal.objects,
+        'attributes': internal.get_attributes()
+    })
+
 
 class CloudioObject(object):
     """Base class for all cloud.iO objects.
@@ -20,12 +52,32 @@ class CloudioObject(object):
     a scheme what attributes and child objects an object has to have. An object is conform to such a scheme if it
     matches exactly the structure of the class. It can not contain more attributes or child objects, then it would be
     not anymore conform to that class.
+
+    Attributes changing at runtime are declared with descriptors, ex. 'temperature = Measure(float)'
+    (see CloudioAttributeDescriptor).
+
+    The static attributes and the descriptors declared in the class are looked up once per class
+    (see __init_subclass__()), not for every instance. Classes declaring descriptors are serialized
+    explicitly (conforms, objects and attributes), the others are reflected.
     """
 
+    _static_attribute_names = ()  # Names of the class members being static attributes
+    _attribute_descriptors = ()  # type: tuple[CloudioAttributeDescriptor]
+
+    def __init_subclass__(cls, **kwargs):
+        super(CloudioObject, cls).__init_subclass__(**kwargs)
+        cls._static_attribute_names = _compile_static_attribute_names(cls)
+        cls._attribute_descriptors = _compile_attribute_descriptors(cls)
+        if cls._attribute_descriptors and not hasattr(cls, 'to_json'):
+            cls.to_json = _descriptor_object_to_json
+
     def __init__(self):
         super(CloudioObject, self).__init__()
         self._internal = _InternalObject(self)
 
+        for descriptor in self._attribute_descriptors:
+            self._internal._attributes[descriptor.name] = descriptor.create_attribute(self._internal)
+
     def get_name(self):
         return self._internal.get_name()
 
@@ -47,12 +99,18 @@ class CloudioObject(object):
     def attribute_has_changed_by_cloud(self, attribute):
         self._internal.attribute_has_changed_by_cloud(attribute)
 
+    def structure_has_changed(self, element=None):
+        self._internal.structure_has_changed(element)
+
     def is_node_registered_within_endpoint(self):
         return self._internal.is_node_registered_within_endpoint()
 
     def get_parent_object_container(self):
         return self._internal.get_parent_object_container()
 
+    def get_uuid(self):
+        return self._internal.get_uuid()
+
 
 class _InternalObject(CloudioObjectContainer, CloudioAttributeContainer):
 
@@ -65,6 +123,7 @@ class _InternalObject(CloudioObjectContainer, CloudioAttributeContainer):
         self.objects = {}
         self._attributes = {}
         self._staticAttributesAdded = False
+        self._topic_uuid = None  # type: TopicUuid or None # Set as soon as the object is part of an endpoint
 
         # Check each field of the actual CloudioObject object.
 
@@ -86,8 +145,12 @@ class _InternalObject(CloudioObjectContainer, CloudioAttributeContainer):
     # Interface implementations
     #
     def get_uuid(self):
-        # TODO Store topic uuid as attribute
-        return TopicUuid(self)
+        if self._topic_uuid is None:
+            topic_uuid = TopicUuid(self)
+            if not topic_uuid.is_attached():
+                return topic_uuid
+            self._topic_uuid = topic_uuid
+        return self._topic_uuid
 
     def get_name(self):
         return self.name
@@ -109,6 +172,10 @@ class _InternalObject(CloudioObjectContainer, CloudioAttributeContainer):
         if self.parent:
             self.parent.attribute_has_changed_by_cloud(attribute)
 
+    def structure_has_changed(self, element=None):
+        if self.parent:
+            self.parent.structure_has_changed(element)
+
     def is_node_registered_within_endpoint(self):
         return self.parent and self.parent.is_node_registered_within_endpoint()
 
@@ -182,42 +249,38 @@ class _InternalObject(CloudioObjectContainer, CloudioAttributeContainer):
         # If it is the first call, get all attributes of the CloudioObject
         # and put it into the 'attributes' attribute
         if not self._staticAttributesAdded:
-            # Check each field of the actual CloudioObject object.
-            for field in dir(self._externalObject):
-                # Check if it is an attribute and go get it
-                attr = getattr(self._externalObject, field)
-                if attr:
-                    # Check if it is a static value (means an attribute
-                    # with a standard type)
-                    #
-                    # Check if it is a bool, int, float, string
-                    if isinstance(attr, bool) or \
-                            isinstance(attr, int) or \
-                            isinstance(attr, float) or \
-                            isinstance(attr, bytes) or \
-                            isinstance(attr, str):
-
-                        if field not in ('__module__', '__doc__'):  # Some excludes:
-                            attribute = CloudioAttribute()
-                            attribute.set_constraint('static')
-                            attribute.set_name(field)
-                            attribute.set_parent(self)
-                            attribute.set_static_value(attr)
-
-                            topicUuid = attribute.get_uuid().to_string()
-                            if topicUuid and topicUuid not in self._attributes:
-                                self._attributes[topicUuid] = attribute
-                            else:
-                                raise CloudioModificationException('Duplicate name for fields')
-
-                    elif isinstance(attr, types.MethodType) or \
-                            type(attr) or \
-                            isinstance(attr, _InternalObject):
-                        pass
+            attribute_count = len(self._attributes)
+            external_object = self._externalObject
+
+            # Static attributes declared in the class plus the ones assigned to the instance
+            fields = set(type(external_object)._static_attribute_names)
+            keyed_by_name = bool(type(external_object)._attribute_descriptors)
+            fields.update(field for field, value in vars(external_object).items()
+                          if isinstance(value, _STATIC_TYPES))
+
+            for field in sorted(fields):
+                attr = getattr(external_object, field)
+                # Fields without value (False, 0, '') are not published
+                if attr and isinstance(attr, _STATIC_TYPES):
+                    attribute = CloudioAttribute()
+                    attribute.set_constraint('static')
+                    attribute.set_name(field)
+                    attribute.set_parent(self)
+                    if not isinstance(attr, bytes):
+                        attribute.set_type(type(attr))
+                    attribute.set_static_value(attr)
+
+                    # Keyed by topic as published in the @online message, by name for classes serialized
+                    # explicitly (see _descriptor_object_to_json())
+                    key = field if keyed_by_name else attribute.get_uuid().to_string()
+                    if key not in self._attributes:
+                        self._attributes[key] = attribute
                     else:
-                        raise InvalidCloudioAttributeException(type(attr))
+                        raise CloudioModificationException('Duplicate name for fields')
 
             self._staticAttributesAdded = True
+            if len(self._attributes) != attribute_count:
+                self.structure_has_changed()
 
         return self._attributes
 
@@ -240,3 +303,4 @@ class _InternalObject(CloudioObjectContainer, CloudioAttributeContainer):
 
     def set_conforms(self, data_class: str):
         self.conforms = data_class
+        self.structure_has_changed()
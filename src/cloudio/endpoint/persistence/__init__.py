@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+
+from .atomic_file import AtomicFilePersistence
+from .journal import MessageJournal
+from .compaction import CompactionPolicy, KeepLastPolicy, DownsamplePolicy, AggregatePolicy, PersistenceCompactor
+from .pending_data import pending_update_from_payload, payload_from_pending_update
+from .writer import PersistenceWriter
+from .write_behind import WriteBehindPersistence
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+from cloudio.common.mqtt import MqttDefaultFilePersistence, PendingUpdate
+
+
+class AtomicFilePersistence(MqttDefaultFilePersistence):
+    """File based persistence writing every entry atomically.
+
+    An entry is written to a hidden temporary file which then replaces the entry's file, so readers
+    running on another thread (ex. the endpoint purging the persistence while the persistence writer
+    stores new entries) see either no file or the complete one, never a partially written file.
+
+    With fsync enabled (see set_fsync()), each temporary file is synced to disk before being renamed and
+    sync() syncs the directory once for all the entries renamed since the last sync.
+    """
+
+    TEMP_FILE_PREFIX = '.'  # Temporary files are hidden and not reported as keys
+
+    def __init__(self, directory=None):
+        super(AtomicFilePersistence, self).__init__(directory=directory)
+        self._fsync = False
+        self._directory_synced = True  # False as soon as an entry was renamed since the last sync
+
+    def set_fsync(self, fsync):
+        """Enables syncing the written entries to disk (temporary files when written, directory on sync()).
+        """
+        self._fsync = fsync
+
+    def put(self, key, persistable):
+        """
+        :param key: Key of the entry
+        :param persistable: Data to store
+        :type persistable: str or PendingUpdate
+        """
+        if isinstance(persistable, str):
+            persistable = PendingUpdate(persistable)
+
+        key_file_name = self._key_file_name(key)
+        temp_file_name = os.path.join(os.path.dirname(key_file_name), self.TEMP_FILE_PREFIX + key + '.tmp')
+        with open(temp_file_name, mode='w') as temp_file:
+            temp_file.write(persistable.get_data())
+            if self._fsync:
+                temp_file.flush()
+                os.fsync(temp_file.fileno())
+        os.replace(temp_file_name, key_file_name)
+        self._directory_synced = False
+
+    def sync(self):
+        """Syncs the directory, so that the entries renamed since the last sync are durable.
+        """
+        if not self._fsync or self._directory_synced:
+            return
+        self._directory_synced = True
+        if hasattr(os, 'O_DIRECTORY'):  # Directories can not be opened on Windows, renames are durable there
+            directory = os.open(self._storage_directory(), os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(directory)
+            finally:
+                os.close(directory)
+
+    def keys(self):
+        return [key for key in super(AtomicFilePersistence, self).keys()
+                if not key.startswith(self.TEMP_FILE_PREFIX)]
@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+
+import logging
+
+from cloudio.endpoint.persistence.pending_data import pending_update_from_payload, payload_from_pending_update
+
+
+class CompactionPolicy(object):
+    """Base class of the policies reducing the pending updates of one attribute stored in the persistence.
+    """
+
+    def compact(self, samples):
+        """Returns the samples to keep.
+
+        :param samples: Pending updates of one attribute as (timestamp, data) tuples sorted by timestamp.
+                        'timestamp' is given in milliseconds, 'data' is the decoded @update message.
+        :type samples: list
+        :return: The samples to keep as (timestamp, data) tuples. Kept samples should be returned
+                 unchanged (same tuple) in order to be left untouched in the persistence.
+        :rtype: list
+        """
+        raise NotImplementedError
+
+    @classmethod
+    def from_string(cls, text: str):
+        """Creates a policy from its textual representation.
+
+        Supported representations:
+         - 'none': No compaction
+         - 'keep-last': Keep only the last value
+         - 'downsample:<seconds>': Keep one sample per window of the given length
+         - 'aggregate:<seconds>': Aggregate windows of the given length into min/max/mean/count
+
+        :return: The policy or None for 'none'
+        :rtype: CompactionPolicy or None
+        """
+        name, _, argument = text.strip().lower().partition(':')
+
+        if name in ('', 'none'):
+            return None
+        elif name == 'keep-last':
+            return KeepLastPolicy()
+        elif name == 'downsample':
+            return DownsamplePolicy(float(argument))
+        elif name == 'aggregate':
+            return AggregatePolicy(float(argument))
+        raise ValueError('Unknown compaction policy \'%s\'' % text)
+
+
+class KeepLastPolicy(CompactionPolicy):
+    """Keeps only the last value of an attribute.
+    """
+
+    def compact(self, samples):
+        return samples[-1:]
+
+
+class DownsamplePolicy(CompactionPolicy):
+    """Keeps the last sample of every window of 'interval' seconds.
+    """
+
+    def __init__(self, interval):
+        super(DownsamplePolicy, self).__init__()
+        assert interval > 0, 'Interval must be positive'
+        self._interval = int(interval * 1000)
+
+    def compact(self, samples):
+        kept = []
+        current_window = None
+        for sample in samples:
+            window = sample[0] // self._interval
+            if window == current_window:
+                kept[-1] = sample
+            else:
+                kept.append(sample)
+                current_window = window
+        return kept
+
+
+class AggregatePolicy(CompactionPolicy):
+    """Replaces the samples of every window of 'interval' seconds with one aggregated sample.
+
+    The aggregated sample carries the mean as value (rounded for integer attributes) and the
+    timestamp of the last sample of the window. Minimum, maximum, mean and sample count are
+    added in the 'aggregate' field of the message.
+
+    Windows of non numeric attributes keep their last sample.
+    """
+
+    def __init__(self, interval):
+        super(AggregatePolicy, self).__init__()
+        assert interval > 0, 'Interval must be positive'
+        self._interval = int(interval * 1000)
+
+    def compact(self, samples):
+        kept = []
+        window_samples = []
+        for sample in samples:
+            if window_samples and sample[0] // self._interval != window_samples[0][0] // self._interval:
+                kept.append(self._aggregate(window_samples))
+                window_samples = []
+            window_samples.append(sample)
+        if window_samples:
+            kept.append(self._aggregate(window_samples))
+        return kept
+
+    @staticmethod
+    def _aggregate(samples):
+        timestamp, last_data = samples[-1]
+
+        if len(samples) == 1 or last_data.get('type') not in ('Number', 'Integer'):
+            return samples[-1]
+
+        values = [data['value'] for _, data in samples]
+        mean = sum(values) / len(values)
+
+        data = dict(last_data)
+        data['value'] = int(round(mean)) if last_data['type'] == 'Integer' else mean
+        data['aggregate'] = {'min': min(values), 'max': max(values), 'mean': mean, 'count': len(values)}
+        return timestamp, data
+
+
+class PersistenceCompactor(object):
+    """Applies compaction policies to the pending updates stored in a MQTT client persistence.
+
+    The policy is chosen per attribute constraint (taken from the stored @update messages).
+    """
+
+    PENDING_UPDATE_PREFIX = 'PendingUpdate-'
+
+    log = logging.getLogger(__name__)
+
+    def __init__(self, persistence, policies):
+        """
+        :param persistence: Persistence holding the pending updates
+        :type persistence: MqttClientPersistence
+        :param policies: Compaction policy per constraint. Key: constraint in lower case (ex. 'measure')
+        :type policies: dict
+        """
+        super(PersistenceCompactor, self).__init__()
+        self._persistence = persistence
+        self._policies = {constraint.lower(): policy for constraint, policy in policies.items() if policy}
+
+    def has_policies(self):
+        return len(self._policies) > 0
+
+    def compact(self):
+        """Compacts the pending updates in the persistence.
+
+        :return: Number of pending updates before and after the compaction
+        :rtype: tuple
+        """
+        from cloudio.endpoint.message_format.factory import MessageFormatFactory
+
+        if not self._policies:
+            return 0, 0
+
+        # Group pending updates per attribute. Key: attribute uuid, value: list of (timestamp, key)
+        attributes = {}
+        for key in self._persistence.keys():
+            if key.startswith(self.PENDING_UPDATE_PREFIX):
+                uuid, _, timestamp = key[len(self.PENDING_UPDATE_PREFIX):].rpartition('-')
+                attributes.setdefault(uuid, []).append((int(timestamp), key))
+
+        before = after = 0
+        for uuid, entries in attributes.items():
+            before += len(entries)
+            if len(entries) == 1:
+                after += 1
+                continue
+
+            entries.sort()
+
+            # Decode the stored messages
+            samples = []
+            message_format = None
+            for timestamp, key in entries:
+                pending_update = self._persistence.get(key)
+                if pending_update is not None:
+                    payload = payload_from_pending_update(pending_update)
+                    # First byte identifies the message format
+                    message_format = MessageFormatFactory.messageFormat(ord(payload[0]) if isinstance(payload, str)
+                                                                        else payload[0])
+                    samples.append((timestamp, message_format.loads(payload)))
+
+            policy = self._policies.get(str(samples[-1][1].get('constraint')).lower()) if samples else None
+            if policy is None:
+                after += len(entries)
+                continue
+
+            kept = policy.compact(samples)
+            after += len(kept)
+
+            # Write the new samples, then remove the samples not kept
+            original_samples = set(id(sample) for sample in samples)
+            kept_keys = set()
+            for sample in kept:
+                timestamp, data = sample
+                key = self.PENDING_UPDATE_PREFIX + uuid + '-' + str(timestamp)
+                kept_keys.add(key)
+                if id(sample) not in original_samples:
+                    self._persistence.put(key, pending_update_from_payload(message_format.dumps(data)))
+            for timestamp, key in entries:
+                if key not in kept_keys:
+                    self._persistence.remove(key)
+
+        if before != after:
+            self.log.info('Compacted pending updates from %d to %d' % (before, after))
+        return before, after
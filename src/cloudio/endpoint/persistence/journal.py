@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import os
+import struct
+import zlib
+from threading import RLock
+
+from cloudio.common.utils import path_helpers
+
+
+class MessageJournal(object):
+    """Append-only journal of the messages queued and in-flight in the endpoint.
+
+    Every message handed to the endpoint gets an 'append' record. As soon as the message
+    is acknowledged by the broker (or moved to the persistent data store) a 'discard' record
+    is added. On the next start, the messages appended but never discarded are recovered
+    and can be republished with their original timestamp.
+
+    Records are buffered in memory and written with a single write and fsync per call to
+    commit() (group-commit). The endpoint commits once per loop iteration, so the fsync
+    cost is shared by all messages processed during that iteration.
+    """
+
+    DEFAULT_DIRECTORY = '~/mqtt-journal'
+    JOURNAL_FILE_NAME = 'journal.bin'
+
+    # Journal size (in bytes) above which the journal gets rewritten with the pending records only
+    COMPACT_THRESHOLD = 4 * 1024 * 1024
+
+    _RECORD_APPEND = 1
+    _RECORD_DISCARD = 2
+
+    _HEADER = struct.Struct('<BII')  # kind, body length, crc32 of body
+    _APPEND = struct.Struct('<QqBBH')  # journal id, timestamp, qos, retain, topic length
+    _DISCARD = struct.Struct('<Q')  # journal id
+
+    log = logging.getLogger(__name__)
+
+    def __init__(self, directory=None, compact_threshold=COMPACT_THRESHOLD):
+        """
+        :param directory: Base directory where to store the journal
+        :param compact_threshold: Journal size in bytes triggering a rewrite of the journal
+        """
+        super(MessageJournal, self).__init__()
+
+        if directory is None or directory == '':
+            directory = self.DEFAULT_DIRECTORY
+
+        self._directory = path_helpers.prettify(directory)
+        self._compact_threshold = compact_threshold
+        self._file = None
+        self._file_name = None  # type: str or None
+        self._lock = RLock()  # Protects buffer and pending records. Accessed by endpoint and MQTT client threads
+        self._buffer = bytearray()  # Records not yet committed
+        self._pending = {}  # key: journal id, value: record tuple
+        self._next_id = 1
+
+    def open(self, client_id, server_uri):
+        """Opens the journal and returns the messages that were not discarded during the last run.
+
+        :param client_id: MQTT client id
+        :type client_id: str
+        :param server_uri: Connection name to the server
+        :type server_uri: str
+        :return: Recovered messages as (journal_id, topic, payload, timestamp, qos, retain) tuples in publish order
+        :rtype: list
+        """
+        storage_directory = client_id + '-' + server_uri
+        # Remove some unwanted characters in sub-directory name
+        for character in ('/', '\\', ':', ' '):
+            storage_directory = storage_directory.replace(character, '')
+        storage_directory = os.path.join(self._directory, storage_directory)
+
+        if not os.path.exists(storage_directory):
+            os.makedirs(storage_directory)
+
+        with self._lock:
+            self._file_name = os.path.join(storage_directory, self.JOURNAL_FILE_NAME)
+
+            if os.path.isfile(self._file_name):
+                with open(self._file_name, mode='rb') as journal_file:
+                    self._replay(journal_file.read())
+
+            # Rewrite journal with the pending records only
+            self._compact()
+
+            recovered = [self._pending[journal_id] for journal_id in sorted(self._pending)]
+
+        if recovered:
+            self.log.info('Recovered %d message(s) from journal' % len(recovered))
+        return recovered
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self.commit()
+                self._file.close()
+                self._file = None
+
+    def is_open(self):
+        return self._file is not None
+
+    def append(self, topic, payload, timestamp, qos, retain):
+        """Adds a message to the journal.
+
+        The record gets durable with the next call to commit().
+
+        :return: The journal id identifying the message
+        :rtype: int
+        """
+        with self._lock:
+            journal_id = self._next_id
+            self._next_id += 1
+
+            record = (journal_id, topic, payload, timestamp, qos, retain)
+            self._add_append_record(record)
+            self._pending[journal_id] = record
+        return journal_id
+
+    def discard(self, journal_id):
+        """Marks the message with the given journal id as done.
+        """
+        with self._lock:
+            if self._pending.pop(journal_id, None) is not None:
+                self._add_record(self._RECORD_DISCARD, self._DISCARD.pack(journal_id))
+
+    def commit(self):
+        """Writes all buffered records with one write and one fsync (group-commit).
+        """
+        with self._lock:
+            if not self._file or not self._buffer:
+                return
+
+            if not self._pending:
+                # Nothing left to recover. Start over with an empty journal
+                self._file.seek(0)
+                self._file.truncate()
+            else:
+                self._file.write(self._buffer)
+            self._buffer.clear()
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+            if self._file.tell() > self._compact_threshold:
+                self._compact()
+
+    def pending_count(self):
+        """Returns the number of messages appended but not yet discarded."""
+        return len(self._pending)
+
+    def _add_record(self, kind, body):
+        self._buffer += self._HEADER.pack(kind, len(body), zlib.crc32(body))
+        self._buffer += body
+
+    def _add_append_record(self, record):
+        (journal_id, topic, payload, timestamp, qos, retain) = record
+
+        topic_data = topic.encode('utf-8')
+        if isinstance(payload, str):
+            payload_data = b'\x01' + payload.encode('utf-8')
+        else:
+            payload_data = b'\x00' + bytes(payload)
+
+        body = self._APPEND.pack(journal_id, int(timestamp), qos, 1 if retain else 0, len(topic_data)) + \
+            topic_data + payload_data
+        self._add_record(self._RECORD_APPEND, body)
+
+    def _replay(self, data):
+        """Rebuilds the pending records from the journal's content.
+
+        Replay stops at the first incomplete or corrupt record (torn write).
+        """
+        offset = 0
+        while offset + self._HEADER.size <= len(data):
+            kind, length, crc = self._HEADER.unpack_from(data, offset)
+            body = data[offset + self._HEADER.size:offset + self._HEADER.size + length]
+            if len(body) != length or zlib.crc32(body) != crc:
+                self.log.warning('Journal truncated at offset %d' % offset)
+                break
+            offset += self._HEADER.size + length
+
+            if kind == self._RECORD_APPEND:
+                journal_id, timestamp, qos, retain, topic_length = self._APPEND.unpack_from(body)
+                topic_end = self._APPEND.size + topic_length
+                topic = body[self._APPEND.size:topic_end].decode('utf-8')
+                payload = body[topic_end + 1:]
+                if body[topic_end] == 1:
+                    payload = payload.decode('utf-8')
+                self._pending[journal_id] = (journal_id, topic, payload, timestamp, qos, bool(retain))
+                self._next_id = max(self._next_id, journal_id + 1)
+            elif kind == self._RECORD_DISCARD:
+                self._pending.pop(self._DISCARD.unpack(body)[0], None)
+            else:
+                self.log.warning('Unknown journal record type %d' % kind)
+                break
+
+    def _compact(self):
+        """Rewrites the journal so that it only contains the pending records.
+        """
+        self._buffer.clear()
+        for journal_id in sorted(self._pending):
+            self._add_append_record(self._pending[journal_id])
+
+        if self._file:
+            self._file.close()
+
+        temp_file_name = self._file_name + '.tmp'
+        with open(temp_file_name, mode='wb') as temp_file:
+            temp_file.write(self._buffer)
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+        os.replace(temp_file_name, self._file_name)
+        self._buffer.clear()
+
+        self._file = open(self._file_name, mode='ab')
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+
+import base64
+
+from cloudio.common.mqtt import PendingUpdate
+
+
+def pending_update_from_payload(payload) -> PendingUpdate:
+    """Wraps a message payload into a PendingUpdate that can be put into an MQTT client persistence.
+
+    The persistence implementations only store strings. JSON payloads are stored as they are,
+    binary payloads (CBOR, etc.) are stored base64 encoded. As JSON payloads always start
+    with '{', which is not part of the base64 alphabet, both can be told apart when reading back.
+
+    :param payload: The message payload
+    :type payload: str or bytes or bytearray
+    """
+    if isinstance(payload, str):
+        return PendingUpdate(payload)
+    return PendingUpdate(base64.b64encode(payload).decode('ascii'))
+
+
+def payload_from_pending_update(pending_update: PendingUpdate):
+    """Returns the message payload stored in the given PendingUpdate.
+
+    :return: The original payload
+    :rtype: str or bytes
+    """
+    data = pending_update.get_data()
+    if data.startswith('{'):
+        return data
+    return base64.b64decode(data)
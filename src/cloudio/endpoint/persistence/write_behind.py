@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import time
+from collections import OrderedDict
+from threading import RLock
+
+from cloudio.common.mqtt import MqttClientPersistence
+
+
+class WriteBehindPersistence(MqttClientPersistence):
+    """Persistence keeping recent entries in memory before writing them to a durable persistence.
+
+    Entries put into this persistence stay in a bounded memory buffer. They are written to the
+    durable backend only after 'flush_delay' seconds, or as soon as the buffer exceeds 'max_buffer_size'
+    bytes. Entries removed while still buffered (ex. short outages) never reach the backend, which
+    reduces the write amplification on flash storage (SD cards, eMMC).
+
+    Entries still buffered are lost in case of a crash. Use set_on_entries_written_callback() to
+    know when entries do not depend on the memory buffer anymore.
+
+    Counters:
+     - bytes_written/entries_written: Data written to the durable backend
+     - bytes_avoided/entries_avoided: Data removed before it had to be written
+     - write_failures: Writes to the backend that failed. The entries stay buffered and are retried by the next flush
+    """
+
+    DEFAULT_FLUSH_DELAY = 10.0  # seconds
+    DEFAULT_MAX_BUFFER_SIZE = 256 * 1024  # bytes
+
+    log = logging.getLogger(__name__)
+
+    def __init__(self, backend, flush_delay=DEFAULT_FLUSH_DELAY, max_buffer_size=DEFAULT_MAX_BUFFER_SIZE):
+        """
+        :param backend: The durable persistence
+        :type backend: MqttClientPersistence
+        :param flush_delay: Time in seconds an entry stays in memory before it gets written to the backend
+        :param max_buffer_size: Size in bytes of the buffered entries above which the buffer gets written
+        """
+        super(WriteBehindPersistence, self).__init__()
+        self._backend = backend
+        self._flush_delay = flush_delay
+        self._max_buffer_size = max_buffer_size
+        self._buffer = OrderedDict()  # key: str, value: (persistable, time put, size). Oldest first
+        self._buffer_size = 0
+        self._lock = RLock()  # Accessed by the endpoint and the persistence writer threads
+        self._on_entries_written = None  # Called with the keys of the entries leaving the buffer
+
+        self.bytes_written = 0
+        self.entries_written = 0
+        self.bytes_avoided = 0
+        self.entries_avoided = 0
+        self.write_failures = 0
+
+    def get_backend(self):
+        return self._backend
+
+    def set_on_entries_written_callback(self, callback):
+        """Sets the function called with the list of keys of the entries that left the memory buffer.
+
+        The entries were either written to the backend or removed before they had to be written.
+        The function is called by the thread writing or removing the entries.
+        """
+        self._on_entries_written = callback
+
+    def open(self, client_id, server_uri):
+        self._backend.open(client_id, server_uri)
+
+    def close(self):
+        self.flush()
+        self._backend.close()
+
+    def put(self, key, persistable):
+        size = self._size_of(persistable)
+        with self._lock:
+            previous = self._buffer.pop(key, None)
+            if previous:
+                self._buffer_size -= previous[2]
+            self._buffer[key] = (persistable, time.time(), size)
+            self._buffer_size += size
+
+            if self._buffer_size > self._max_buffer_size:
+                self.flush()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._buffer.get(key)
+            if entry:
+                return entry[0]
+        return self._backend.get(key)
+
+    def contains_key(self, key):
+        with self._lock:
+            if key in self._buffer:
+                return True
+        return self._backend.contains_key(key)
+
+    def keys(self):
+        with self._lock:
+            keys = list(self._buffer.keys())
+        buffered = set(keys)
+        keys.extend(key for key in self._backend.keys() if key not in buffered)
+        return keys
+
+    def remove(self, key):
+        with self._lock:
+            entry = self._buffer.pop(key, None)
+            if entry:
+                self._buffer_size -= entry[2]
+                self.bytes_avoided += entry[2]
+                self.entries_avoided += 1
+
+        # An entry put again under the same key may have an older copy in the backend
+        self._backend.remove(key)
+
+        if entry and self._on_entries_written:
+            self._on_entries_written([key])
+
+    def clear(self):
+        with self._lock:
+            self._buffer.clear()
+            self._buffer_size = 0
+        self._backend.clear()
+
+    def buffered_count(self):
+        """Returns the number of entries not yet written to the backend."""
+        return len(self._buffer)
+
+    def flush_expired(self) -> int:
+        """Writes the entries buffered for longer than the flush delay to the backend.
+
+        :return: Number of entries written
+        """
+        expiry_time = time.time() - self._flush_delay
+        with self._lock:
+            expired = []
+            for key, entry in self._buffer.items():
+                if entry[1] > expiry_time:
+                    break
+                expired.append(key)
+            return self._write(expired)
+
+    def flush(self) -> int:
+        """Writes all buffered entries to the backend.
+
+        :return: Number of entries written
+        """
+        with self._lock:
+            return self._write(list(self._buffer.keys()))
+
+    def _write(self, keys) -> int:
+        written = []
+        for key in keys:
+            persistable, _, size = self._buffer[key]
+            try:
+                self._backend.put(key, persistable)
+            except Exception as exception:
+                # Entry and the following ones stay buffered until the next flush
+                self.write_failures += 1
+                self.log.error(exception, exc_info=True)
+                break
+            del self._buffer[key]
+            self._buffer_size -= size
+            self.bytes_written += size
+            self.entries_written += 1
+            written.append(key)
+
+        if written and self._on_entries_written:
+            self._on_entries_written(written)
+        return len(written)
+
+    @staticmethod
+    def _size_of(persistable):
+        data = persistable if isinstance(persistable, str) else persistable.get_data()
+        return len(data)
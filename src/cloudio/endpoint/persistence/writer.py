@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import time
+from threading import Lock, RLock
+
+from cloudio.common.core.threaded import Threaded
+from cloudio.endpoint.persistence.atomic_file import AtomicFilePersistence
+from cloudio.endpoint.persistence.write_behind import WriteBehindPersistence
+
+
+class PersistenceWriter(Threaded):
+    """Writes pending updates to the persistence using a dedicated thread.
+
+    Entries handed over with put() are queued and written in batches by the writer thread,
+    so the caller (the endpoint thread) never waits on the storage.
+
+    Durability modes:
+     - 'batch': Data is synced to disk after every batch written (group-commit)
+     - 'interval': Data is synced to disk at most every 'sync_interval' seconds
+     - 'none': Data is never explicitly synced to disk
+
+    Only an AtomicFilePersistence is synced: The file of each entry is synced when written, the
+    directory holding the entries once per sync.
+
+    The optional callback given to put() is called (by the writer thread) as soon as the entry
+    is durable according to the durability mode.
+
+    With a WriteBehindPersistence, the writer thread also writes the entries buffered for longer
+    than the flush delay to the durable backend. The callback of an entry is then called once the
+    entry left the memory buffer (written to the backend and synced, or removed before).
+    """
+
+    DURABILITY_BATCH = 'batch'
+    DURABILITY_INTERVAL = 'interval'
+    DURABILITY_NONE = 'none'
+
+    log = logging.getLogger(__name__)
+
+    def __init__(self, persistence, durability=DURABILITY_NONE, sync_interval=1.0, max_batch_size=256):
+        """
+        :param persistence: The persistence to write to
+        :type persistence: MqttClientPersistence
+        :param durability: One of 'batch', 'interval' or 'none'
+        :param sync_interval: Interval in seconds between syncs in 'interval' mode
+        :param max_batch_size: Maximum number of entries written per batch
+        """
+        super(PersistenceWriter, self).__init__(control_interval_in_seconds=sync_interval)
+
+        if durability not in (self.DURABILITY_BATCH, self.DURABILITY_INTERVAL, self.DURABILITY_NONE):
+            raise ValueError('Unknown durability mode \'%s\'' % durability)
+
+        self._persistence = persistence
+        self._durability = durability
+        self._sync_interval = sync_interval
+        self._max_batch_size = max_batch_size
+        self._queue = list()  # type: list[tuple] # Entries not yet written: (key, persistable, callback)
+        self._queue_lock = Lock()
+        self._pending_keys = dict()  # key: Key queued or being written, value: Number of such entries
+        self._write_lock = RLock()  # Serializes batches written by writer thread and flush()
+        self._unsynced_callbacks = list()  # Callbacks of entries written but not yet synced
+        self._buffered_callbacks = dict()  # key: Key of an entry in the write-behind buffer, value: Callbacks
+        self._last_sync_time = time.time()
+        self._write_behind = persistence if isinstance(persistence, WriteBehindPersistence) else None
+        if self._write_behind:
+            self._write_behind.set_on_entries_written_callback(self._on_entries_written)
+        # Only file based persistence needs to be synced
+        durable_persistence = self._write_behind.get_backend() if self._write_behind else persistence
+        self._needs_sync = isinstance(durable_persistence, AtomicFilePersistence) and \
+            durability != self.DURABILITY_NONE
+        if self._needs_sync:
+            durable_persistence.set_fsync(True)
+        self._durable_persistence = durable_persistence
+
+    def start(self):
+        self.setup_thread(name='persistence-writer')
+        self.start_thread()
+
+    def close(self):
+        """Stops the writer thread and writes all queued entries.
+        """
+        if self._thread:
+            self._thread_should_run = False
+            self.wakeup_thread()
+            self.stop_thread()
+        self.flush()
+
+    def put(self, key, persistable, callback=None):
+        """Queues an entry to be written to the persistence.
+        """
+        with self._queue_lock:
+            self._queue.append((key, persistable, callback))
+            self._pending_keys[key] = self._pending_keys.get(key, 0) + 1
+        self.wakeup_thread()
+
+    def put_many(self, entries):
+        """Queues several entries given as (key, persistable, callback) tuples.
+        """
+        with self._queue_lock:
+            self._queue.extend(entries)
+            for key, _, _ in entries:
+                self._pending_keys[key] = self._pending_keys.get(key, 0) + 1
+        self.wakeup_thread()
+
+    def pending_count(self):
+        """Returns the number of entries queued but not yet written."""
+        return len(self._queue)
+
+    def is_pending(self, key) -> bool:
+        """Returns True if an entry with the given key is queued or being written.
+
+        Readers of the persistence must leave such keys alone, as the entry is about to be (re)written.
+        """
+        return key in self._pending_keys
+
+    def flush(self):
+        """Writes and syncs all queued entries using the calling thread.
+        """
+        while self._write_batch(force_sync=True):
+            pass
+        if self._write_behind:
+            self._write_behind.flush()
+        self._sync()
+
+    def _run(self):
+        while self._thread_should_run:
+
+            while self._write_batch():
+                pass
+
+            if self._write_behind:
+                self._write_behind.flush_expired()
+                # Entries written to the backend or removed from the buffer (see _on_entries_written())
+                if self._unsynced_callbacks and self._durability == self.DURABILITY_NONE:
+                    self._notify()
+                elif self._unsynced_callbacks and self._durability == self.DURABILITY_BATCH:
+                    self._sync()
+
+            if self._durability == self.DURABILITY_INTERVAL and self._unsynced_callbacks and \
+                    time.time() - self._last_sync_time >= self._sync_interval:
+                self._sync()
+
+            # Wait until new entries get queued
+            if self._thread_should_run:
+                self._thread_sleep_interval()
+
+        self._thread_left_run_loop = True
+
+    def _write_batch(self, force_sync=False) -> bool:
+        """Writes the next batch of queued entries.
+
+        :return: True if entries were written.
+        """
+        with self._write_lock:
+            with self._queue_lock:
+                batch = self._queue[:self._max_batch_size]
+                del self._queue[:self._max_batch_size]
+
+            if not batch:
+                return False
+
+            for key, persistable, callback in batch:
+                if callback and self._write_behind:
+                    # Registered before the put, which may flush the buffer
+                    with self._queue_lock:
+                        self._buffered_callbacks.setdefault(key, []).append(callback)
+                try:
+                    self._persistence.put(key, persistable)
+                    if callback and not self._write_behind:
+                        self._unsynced_callbacks.append(callback)
+                except Exception as exception:
+                    self.log.error(exception, exc_info=True)
+                    if callback and self._write_behind:
+                        with self._queue_lock:
+                            self._buffered_callbacks[key].remove(callback)
+
+            with self._queue_lock:
+                for key, _, _ in batch:
+                    count = self._pending_keys.pop(key) - 1
+                    if count:
+                        self._pending_keys[key] = count
+
+            if self._write_behind and not self._unsynced_callbacks:
+                pass  # Entries only reach the disk once flushed by the write-behind persistence
+            elif self._durability == self.DURABILITY_BATCH or force_sync:
+                self._sync()
+            elif self._durability == self.DURABILITY_NONE:
+                self._notify()
+        return True
+
+    def _sync(self):
+        """Syncs written data to disk and notifies the callbacks of the entries written.
+        """
+        with self._write_lock:
+            if self._needs_sync:
+                # One directory sync for all entries written since the last sync
+                try:
+                    self._durable_persistence.sync()
+                except OSError as exception:
+                    self.log.error(exception, exc_info=True)
+            self._last_sync_time = time.time()
+            self._notify()
+
+    def _on_entries_written(self, keys):
+        # Called by the write-behind persistence. The entries get synced by the next sync
+        with self._queue_lock:
+            for key in keys:
+                self._unsynced_callbacks.extend(self._buffered_callbacks.pop(key, ()))
+        self.wakeup_thread()
+
+    def _notify(self):
+        with self._queue_lock:
+            callbacks = self._unsynced_callbacks
+            self._unsynced_callbacks = list()
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as exception:
+                self.log.error(exception, exc_info=True)
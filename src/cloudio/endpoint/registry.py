@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+
+from bisect import bisect_left, insort
+
+from cloudio.endpoint.attribute import CloudioAttribute
+
+
+class _NodeIndex(object):
+    """Elements of one node sorted by path.
+    """
+    def __init__(self, node):
+        self.node = node
+        self.structure_version = None  # Structure version of the node the index is up to date with
+        self.paths = []  # Sorted paths of the node's elements
+        self.elements = {}  # key: path, value: CloudioNode, CloudioObject or CloudioAttribute
+
+    def add(self, path, element, sort=True):
+        """Adds the element and, for objects, the objects and attributes it contains.
+
+        :param sort: Insert the paths at their sorted position. Otherwise the paths need to be sorted afterwards
+        """
+        if path not in self.elements:
+            if sort:
+                insort(self.paths, path)
+            else:
+                self.paths.append(path)
+        self.elements[path] = element
+
+        if not isinstance(element, CloudioAttribute):
+            internal = getattr(element, '_internal', element)
+            for object_name, obj in internal.get_objects().items():
+                self.add(path + '/' + object_name, obj, sort)
+            for attribute in internal.get_attributes().values():
+                self.add(path + '/' + attribute.get_name(), attribute, sort)
+
+
+class ModelRegistry(object):
+    """Indexes the nodes, objects and attributes of an endpoint by path.
+
+    The path of an element is its topic without the endpoint. Ex: 'VacuumCleaner/Parameters/power'.
+    The index of a node is built on first use. Objects and attributes added later are inserted into the
+    index (see CloudioNode.get_elements_added()). The index is only built again if the structure of the
+    node changed otherwise.
+    """
+
+    def __init__(self, node_container):
+        """
+        :param node_container: Endpoint containing the nodes to index
+        :type node_container: CloudioEndpoint
+        """
+        super(ModelRegistry, self).__init__()
+        self._node_container = node_container
+        self._node_indexes = {}  # key: node name, value: _NodeIndex
+
+    def get(self, path):
+        """Returns the node, object or attribute with the given path or None if not found.
+        """
+        index = self._get_node_index(path.partition('/')[0])
+        return index.elements.get(path) if index else None
+
+    def iter_elements(self, prefix=''):
+        """Yields the (path, element) tuples of the nodes, objects and attributes inside the given path, sorted by path.
+
+        :param prefix: Path of the subtree to iterate. The whole model if empty
+        :type prefix: str
+        """
+        prefix = prefix.strip('/')
+        if not prefix:
+            for name in sorted(self._node_container.nodes):
+                index = self._get_node_index(name)
+                if index:
+                    for path in index.paths:
+                        yield path, index.elements[path]
+            return
+
+        index = self._get_node_index(prefix.partition('/')[0])
+        if index is None:
+            return
+
+        if prefix in index.elements:
+            yield prefix, index.elements[prefix]
+
+        # Paths inside the subtree are between 'prefix/' and 'prefix0' ('0' follows '/')
+        position = bisect_left(index.paths, prefix + '/')
+        end = bisect_left(index.paths, prefix + '0')
+        for path in index.paths[position:end]:
+            yield path, index.elements[path]
+
+    def iter_attributes(self, prefix='', constraint=None):
+        """Yields the (path, attribute) tuples of the attributes inside the given path, sorted by path.
+
+        :param prefix: Path of the subtree to iterate. The whole model if empty
+        :param constraint: Only attributes with this constraint (ex. 'measure') if given
+        :type constraint: str or None
+        """
+        constraint = constraint.lower() if constraint else None
+        for path, element in self.iter_elements(prefix):
+            if isinstance(element, CloudioAttribute):
+                if constraint is None or (element.get_constraint() is not None and
+                                          element.get_constraint().to_string().lower() == constraint):
+                    yield path, element
+
+    def count_attributes(self, prefix='', constraint=None) -> int:
+        """Returns the number of attributes inside the given path."""
+        return sum(1 for _ in self.iter_attributes(prefix, constraint))
+
+    def _get_node_index(self, name):
+        node = self._node_container.nodes.get(name)
+        if node is None:
+            self._node_indexes.pop(name, None)
+            return None
+
+        index = self._node_indexes.get(name)
+        if index is not None and index.node is node and index.structure_version != node.get_structure_version():
+            if not self._add_elements(name, index, node.get_elements_added(index.structure_version)):
+                index = None
+        if index is None or index.node is not node:
+            index = self._build_node_index(name, node)
+            self._node_indexes[name] = index
+        return index
+
+    @staticmethod
+    def _build_node_index(name, node):
+        index = _NodeIndex(node)
+        index.paths.append(name)
+        index.elements[name] = node
+        for object_name, obj in node.get_objects().items():
+            index.add(name + '/' + object_name, obj, sort=False)
+        index.paths.sort()
+        # Read once built, listing the attributes of static objects changes the structure version
+        index.structure_version = node.get_structure_version()
+        return index
+
+    @staticmethod
+    def _add_elements(name, index, elements) -> bool:
+        """Inserts the objects and attributes added to the node. Returns False if the index needs to be built again.
+        """
+        if elements is None:
+            return False
+
+        node = index.node
+        for element in elements:
+            # Path from the element up to the node
+            names = []
+            parent = element
+            while parent is not node:
+                if parent is None:
+                    return False
+                names.append(parent.get_name())
+                parent = parent.get_parent() if isinstance(parent, CloudioAttribute) else \
+                    parent.get_parent_object_container()
+            names.append(name)
+            index.add('/'.join(reversed(names)), element)
+
+        index.structure_version = node.get_structure_version()
+        return True
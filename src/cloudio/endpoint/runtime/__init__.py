@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
 
-from .node import CloudioRuntimeNode
-from .object import CloudioRuntimeObject
+from .node import CloudioRuntimeNode, CloudioRuntimeNodeBuilder
+from .object import CloudioRuntimeObject, CloudioRuntimeObjectBuilder, CloudioObjectTemplate
+from .loader import ModelLoader
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import logging
+import os
+import time
+
+import cloudio.common.utils.timestamp_helpers as TimeStampProvider
+from cloudio.endpoint.attribute import CloudioAttribute
+from cloudio.endpoint.attribute.constraint import CloudioAttributeConstraint
+from cloudio.endpoint.attribute.type import CloudioAttributeType
+from cloudio.endpoint.message_format.codec import CBOR_CODECS, create_codec
+from cloudio.endpoint.message_format.generic_format import GenericMessageFormat
+from cloudio.endpoint.runtime.loader import ModelLoader
+from cloudio.endpoint.runtime.node import CloudioRuntimeNode
+from cloudio.endpoint.runtime.object import CloudioRuntimeObject
+from cloudio.endpoint.version import __version__
+
+# Layout of the cache file: magic, format version (1 byte), key (sha256 digest), CBOR encoded nodes
+CACHE_MAGIC = b'CIOMC'
+CACHE_FORMAT_VERSION = 1
+_KEY_SIZE = hashlib.sha256().digest_size
+_HEADER_SIZE = len(CACHE_MAGIC) + 1 + _KEY_SIZE
+
+# key: Type name, value: Shared type instance
+_TYPES = {name: CloudioAttributeType.get_instance(getattr(CloudioAttributeType, name))
+          for name in ('Invalid', 'Boolean', 'Integer', 'Number', 'String')}
+
+
+class ModelCache(object):
+    """Loads models through a binary cache file.
+
+    The first load of a model file builds the nodes with the ModelLoader and stores them in the
+    cache file. Later loads of the same model file restore the nodes from the cache. The cache
+    is keyed by a hash of the model file and the package version, so it is built again as soon
+    as one of them changes.
+    """
+
+    log = logging.getLogger(__name__)
+
+    def __init__(self, cache_file=None):
+        """
+        :param cache_file: Path of the cache file. '<model file>.cache' if not given
+        :type cache_file: str or None
+        """
+        super(ModelCache, self).__init__()
+        self._cache_file = cache_file
+        self._codec = create_codec(CBOR_CODECS)
+        self.hit = False  # True if the last model was restored from the cache
+        self.load_time = 0.0  # Time in seconds needed to load the last model
+
+    def load(self, endpoint, model_file, model_format=None):
+        """Adds the nodes of the given model file to the endpoint.
+
+        :param endpoint: Endpoint to add the nodes to
+        :type endpoint: CloudioEndpoint
+        :param model_file: Path of the model file
+        :param model_format: 'xml' or 'json'. Taken from the file extension if not given
+        """
+        for node_name, node in self.load_nodes(model_file, model_format):
+            endpoint.add_node(node_name, node)
+
+    def load_nodes(self, model_file, model_format=None):
+        """Returns the (name, CloudioRuntimeNode) tuples of the nodes of the given model file.
+
+        :param model_file: Path of the model file
+        :param model_format: 'xml' or 'json'. Taken from the file extension if not given
+        :rtype: list[(str, CloudioRuntimeNode)]
+        """
+        start_time = time.perf_counter()
+        cache_file = self._cache_file or model_file + '.cache'
+        key = self.get_key(model_file)
+
+        nodes = self._read(cache_file, key)
+        self.hit = nodes is not None
+        if nodes is None:
+            nodes = list(ModelLoader().iter_nodes(model_file, model_format))
+            self._write(cache_file, key, nodes)
+
+        self.load_time = time.perf_counter() - start_time
+        self.log.info('Loaded model \'%s\' %s in %.1f ms' % (model_file, 'from cache' if self.hit else 'and cached it',
+                                                              self.load_time * 1000))
+        return nodes
+
+    @staticmethod
+    def get_key(model_file) -> bytes:
+        """Returns the key of the cache of the given model file."""
+        digest = hashlib.sha256(('%s/%d/' % (__version__, CACHE_FORMAT_VERSION)).encode('utf-8'))
+        with open(model_file, 'rb') as source:
+            for chunk in iter(lambda: source.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.digest()
+
+    def _read(self, cache_file, key):
+        try:
+            with open(cache_file, 'rb') as cache:
+                header = cache.read(_HEADER_SIZE)
+                if header != CACHE_MAGIC + bytes((CACHE_FORMAT_VERSION,)) + key:
+                    return None
+                data = cache.read()
+        except FileNotFoundError:
+            return None
+
+        try:
+            timestamp = TimeStampProvider.get_time_in_milliseconds()
+            return [(node_name, _restore_node(node_data, timestamp))
+                    for node_name, node_data in self._codec.loads(data)]
+        except Exception as exception:
+            self.log.warning('Ignoring invalid model cache \'%s\': %s' % (cache_file, exception))
+            return None
+
+    def _write(self, cache_file, key, nodes):
+        message_format = GenericMessageFormat()
+        data = self._codec.dumps([[node_name, message_format.serialize_node(node)] for node_name, node in nodes])
+
+        try:
+            temp_file_name = cache_file + '.tmp'
+            with open(temp_file_name, mode='wb') as temp_file:
+                temp_file.write(CACHE_MAGIC + bytes((CACHE_FORMAT_VERSION,)) + key)
+                temp_file.write(data)
+            os.replace(temp_file_name, cache_file)
+        except OSError as exception:
+            self.log.warning('Could not write model cache \'%s\': %s' % (cache_file, exception))
+
+
+# The cache is written from runtime nodes by this module, so the elements are restored directly,
+# without the checks and change notifications of the runtime builder API.
+def _restore_node(node_data, timestamp):
+    node = CloudioRuntimeNode()
+    node.interfaces = list(node_data.get('implements', ()))
+    _restore_objects(node, node.objects, node_data.get('objects', {}), timestamp, {})
+    return node
+
+
+def _restore_objects(parent, objects, objects_data, timestamp, constraints):
+    for object_name, object_data in objects_data.items():
+        obj = CloudioRuntimeObject()
+        internal = obj._internal
+        internal.name = object_name
+        internal.parent = parent
+        internal.conforms = object_data.get('conforms')
+        objects[object_name] = obj
+
+        attributes = internal._attributes
+        for attribute_name, attribute_data in object_data.get('attributes', {}).items():
+            value = attribute_data['value']
+            attribute = CloudioAttribute()
+            attribute._name = attribute_name
+            attribute._parent = obj
+            attribute._type = _TYPES.get(attribute_data['type'], _TYPES['Invalid'])
+            constraint = constraints.get(attribute_data['constraint'])
+            if constraint is None:
+                constraint = constraints[attribute_data['constraint']] = \
+                    CloudioAttributeConstraint.get_instance(attribute_data['constraint'] or 'Invalid')
+            attribute._constraint = constraint
+            attribute._value = value
+            attribute._timestamp = timestamp if value else None  # Initial values are set with the current time
+            attributes[attribute_name] = attribute
+
+        _restore_objects(obj, internal.objects, object_data.get('objects', {}), timestamp, constraints)
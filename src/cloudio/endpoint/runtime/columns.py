@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+
+import math
+from array import array
+
+import cloudio.common.utils.timestamp_helpers as TimeStampProvider
+from cloudio.endpoint.attribute import CloudioAttribute
+
+try:
+    import numpy
+except ImportError:  # Optional dependency. Bulk updates are done in pure python without it
+    numpy = None
+
+
+class AttributeColumns(object):
+    """Stores the values and timestamps of the Number attributes of a columnar CloudioRuntimeObject.
+
+    Values are kept in an array of doubles and timestamps (in milliseconds) in an array of 64 bit
+    integers, one entry per attribute in the order the attributes were added. An unset value is
+    stored as NaN and reads as None.
+    """
+
+    def __init__(self):
+        super(AttributeColumns, self).__init__()
+        self.values = array('d')
+        self.timestamps = array('q')
+        self.attributes = []  # type: list[CloudioColumnAttribute]
+
+    @classmethod
+    def is_numpy_available(cls) -> bool:
+        return numpy is not None
+
+    def add(self, attribute):
+        """Adds a column entry for the given attribute and returns its index."""
+        self.values.append(math.nan)
+        self.timestamps.append(0)
+        self.attributes.append(attribute)
+        return len(self.attributes) - 1
+
+    def update(self, values, timestamp=None, deadband=0.0):
+        """Updates the values of all attributes at once.
+
+        Only the values differing from the current ones by more than the deadband are taken over. Their
+        timestamps are set and their attributes are reported as changed to the parent (and so are sent
+        to the cloud).
+
+        :param values: New values, one per attribute in the order the attributes were added. Can be a NumPy vector
+        :type values: list[float] or numpy.ndarray
+        :param timestamp: Timestamp of the values in milliseconds. Now if not given
+        :param deadband: Minimal absolute change of a value to be taken over. A number or one number per attribute
+        :type deadband: float or list[float] or numpy.ndarray
+        :return: The changed attributes
+        :rtype: list[CloudioColumnAttribute]
+        """
+        if len(values) != len(self.values):
+            raise ValueError('Expected %d values, got %d' % (len(self.values), len(values)))
+        if not timestamp:
+            timestamp = TimeStampProvider.get_time_in_milliseconds()
+
+        if numpy is not None:
+            changed = self._update_vectorized(values, timestamp, deadband)
+        else:
+            changed = self._update_sequential(values, timestamp, deadband)
+
+        changed_attributes = [self.attributes[index] for index in changed]
+        for attribute in changed_attributes:
+            if attribute.get_parent():
+                attribute.get_parent().attribute_has_changed_by_endpoint(attribute)
+        return changed_attributes
+
+    def _update_vectorized(self, values, timestamp, deadband):
+        new_values = numpy.asarray(values, dtype=numpy.float64)
+        current_values = numpy.frombuffer(self.values, dtype=numpy.float64)
+        current_timestamps = numpy.frombuffer(self.timestamps, dtype=numpy.int64)
+
+        current_nan = numpy.isnan(current_values)
+        new_nan = numpy.isnan(new_values)
+        with numpy.errstate(invalid='ignore'):
+            unchanged = (new_values == current_values) | \
+                        (numpy.abs(new_values - current_values) <= numpy.asarray(deadband, dtype=numpy.float64))
+        mask = (current_nan != new_nan) | (~current_nan & ~new_nan & ~unchanged)
+
+        # The views write through to the arrays
+        current_values[mask] = new_values[mask]
+        current_timestamps[mask] = timestamp
+        changed = numpy.flatnonzero(mask).tolist()
+
+        del current_values, current_timestamps  # Release the buffers, so the arrays can grow again
+        return changed
+
+    def _update_sequential(self, values, timestamp, deadband):
+        deadbands = deadband if hasattr(deadband, '__len__') else [deadband] * len(self.values)
+        changed = []
+        for index, (value, current_value, band) in enumerate(zip(values, self.values, deadbands)):
+            value = float(value)
+            if math.isnan(value) or math.isnan(current_value):
+                if math.isnan(value) and math.isnan(current_value):
+                    continue
+            elif value == current_value or abs(value - current_value) <= band:
+                continue
+            self.values[index] = value
+            self.timestamps[index] = timestamp
+            changed.append(index)
+        return changed
+
+    def get_values(self):
+        """Returns the values of all attributes. A NumPy vector if NumPy is installed, an array otherwise.
+
+        :rtype: numpy.ndarray or array.array
+        """
+        if numpy is not None:
+            return numpy.array(self.values, dtype=numpy.float64)
+        return array('d', self.values)
+
+    def __len__(self):
+        return len(self.attributes)
+
+
+class CloudioColumnAttribute(CloudioAttribute):
+    """Number attribute of a columnar CloudioRuntimeObject.
+
+    The attribute holds no value itself, its value and timestamp are read from and written to
+    its entry in the AttributeColumns of the object.
+    """
+
+    __slots__ = ('_columns', '_index')
+
+    def __init__(self, columns):
+        """
+        :param columns: Columns holding the value and timestamp of the attribute
+        :type columns: AttributeColumns
+        """
+        self._columns = columns
+        self._index = columns.add(self)
+        super(CloudioColumnAttribute, self).__init__()
+
+    # The value and timestamp slots of CloudioAttribute are replaced by views into the columns
+    @property
+    def _value(self):
+        value = self._columns.values[self._index]
+        return None if math.isnan(value) else value
+
+    @_value.setter
+    def _value(self, value):
+        self._columns.values[self._index] = math.nan if value is None else value
+
+    @property
+    def _timestamp(self):
+        return self._columns.timestamps[self._index] or None
+
+    @_timestamp.setter
+    def _timestamp(self, timestamp):
+        self._columns.timestamps[self._index] = timestamp or 0
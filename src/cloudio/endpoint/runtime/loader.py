@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+
+import json
+import logging
+import os
+import time
+from xml.etree import ElementTree
+
+from cloudio.endpoint.runtime.node import CloudioRuntimeNode
+from cloudio.endpoint.runtime.object import CloudioRuntimeObject
+
+try:
+    import ijson
+except ImportError:  # Optional dependency. JSON models are loaded at once without it
+    ijson = None
+
+# key: type name used in model files (lower case), value: python type
+_TYPES = {'bool': bool, 'boolean': bool,
+          'short': int, 'long': int, 'int': int, 'integer': int,
+          'float': float, 'double': float, 'number': float,
+          'str': str, 'string': str}
+
+
+def _parse_type(type_name):
+    the_type = _TYPES.get((type_name or '').lower())
+    if the_type is None:
+        raise ValueError('Attribute type unknown or not set: %r' % type_name)
+    return the_type
+
+
+def _parse_value(the_type, value):
+    # Values in XML files are strings
+    if the_type is bool and isinstance(value, str):
+        return value.strip().lower() in ('true', '1', 'yes', 'on')
+    return the_type(value)
+
+
+class ModelLoader(object):
+    """Builds CloudioRuntimeNode trees from XML or JSON model files.
+
+    The files are parsed incrementally and every node is handed over as soon as it is complete, so
+    memory used by the parser stays bounded by the size of a node, not of the whole file.
+
+    XML models (the format of 'tests/config/vacuum-cleaner-model.xml'):
+
+        <configs><config><deviceType typeId="Node" implements="Interface">
+            <object id="Parameters" conforms="Class">
+                <attribute id="power" template="Boolean" constraint="Parameter" value="true"/>
+                <object id="Child">...</object>
+            </object>
+        </deviceType></config></configs>
+
+    JSON models (same structure as the @online message):
+
+        {"nodes": {"Node": {"implements": ["Interface"], "objects": {"Parameters": {"conforms": "Class",
+            "objects": {...},
+            "attributes": {"power": {"type": "Boolean", "constraint": "Parameter", "value": true}}}}}}}
+
+    JSON files are parsed incrementally if the 'ijson' package is installed.
+    """
+
+    log = logging.getLogger(__name__)
+
+    def __init__(self):
+        super(ModelLoader, self).__init__()
+        self.node_count = 0  # Number of nodes of the last loaded model
+        self.attribute_count = 0  # Number of attributes of the last loaded model
+        self.load_time = 0.0  # Time in seconds needed to load the last model
+
+    @classmethod
+    def is_incremental_json_available(cls) -> bool:
+        return ijson is not None
+
+    def load(self, endpoint, model_file, model_format=None):
+        """Adds the nodes of the given model file to the endpoint.
+
+        :param endpoint: Endpoint to add the nodes to
+        :type endpoint: CloudioEndpoint
+        :param model_file: Path of the model file
+        :param model_format: 'xml' or 'json'. Taken from the file extension if not given
+        """
+        for node_name, node in self.iter_nodes(model_file, model_format):
+            endpoint.add_node(node_name, node)
+
+    def iter_nodes(self, model_file, model_format=None):
+        """Yields the (name, CloudioRuntimeNode) tuples of the nodes of the given model file.
+
+        :param model_file: Path of the model file
+        :param model_format: 'xml' or 'json'. Taken from the file extension if not given
+        """
+        if model_format is None:
+            model_format = 'json' if os.path.splitext(model_file)[1].lower() == '.json' else 'xml'
+
+        self.node_count = self.attribute_count = 0
+        start_time = time.perf_counter()
+
+        with open(model_file, 'rb') as source:
+            nodes = self._iter_xml_nodes(source) if model_format == 'xml' else self._iter_json_nodes(source)
+            for node_name, node in nodes:
+                self.node_count += 1
+                yield node_name, node
+
+        self.load_time = time.perf_counter() - start_time
+        self.log.info('Loaded model \'%s\': %d node(s), %d attribute(s) in %.1f ms' %
+                      (model_file, self.node_count, self.attribute_count, self.load_time * 1000))
+
+    def _iter_xml_nodes(self, source):
+        node_name, node = None, None
+        objects = []  # Objects being built, innermost last
+        elements = []  # Open XML elements, innermost last
+
+        for event, element in ElementTree.iterparse(source, events=('start', 'end')):
+            tag = element.tag
+            if event == 'start':
+                elements.append(element)
+                if tag == 'deviceType':
+                    node_name, node = element.get('typeId'), CloudioRuntimeNode()
+                    if not node_name:
+                        raise ValueError('No node name given!')
+                    if element.get('implements'):
+                        node.declare_implemented_interfaces(name.strip() for name in
+                                                            element.get('implements').split(','))
+                elif tag == 'object' and node is not None:
+                    objects.append(self._add_object(objects[-1] if objects else node, element.get('id'),
+                                                    element.get('conforms')))
+                elif tag == 'attribute' and objects:
+                    self._add_attribute(objects[-1], element.get('id'), element.get('template'),
+                                        element.get('constraint'), element.get('value'))
+                continue
+
+            if tag == 'object' and objects:
+                objects.pop()
+            elif tag == 'deviceType':
+                yield node_name, node
+                node_name, node = None, None
+
+            # Drop the parsed element, so the tree does not grow with the file
+            elements.pop()
+            element.clear()
+            if elements:
+                elements[-1].remove(element)
+
+    def _iter_json_nodes(self, source):
+        if ijson is not None:
+            nodes = ijson.kvitems(source, 'nodes', use_float=True)
+        else:
+            nodes = json.load(source).get('nodes', {}).items()
+
+        for node_name, node_data in nodes:
+            node = CloudioRuntimeNode()
+            node.declare_implemented_interfaces(node_data.get('implements', []))
+            self._add_json_objects(node, node_data.get('objects', {}))
+            yield node_name, node
+
+    def _add_json_objects(self, parent, objects_data):
+        for object_name, object_data in objects_data.items():
+            obj = self._add_object(parent, object_name, object_data.get('conforms'))
+            for attribute_name, attribute_data in object_data.get('attributes', {}).items():
+                self._add_attribute(obj, attribute_name, attribute_data.get('type'),
+                                    attribute_data.get('constraint'), attribute_data.get('value'))
+            self._add_json_objects(obj, object_data.get('objects', {}))
+
+    @staticmethod
+    def _add_object(parent, object_name, conforms=None):
+        if not object_name:
+            raise ValueError('No object name given!')
+        obj = CloudioRuntimeObject()
+        if conforms:
+            obj._internal.set_conforms(conforms)
+        parent.add_object(object_name, obj)
+        return obj
+
+    def _add_attribute(self, obj, attribute_name, type_name, constraint, value=None):
+        if not attribute_name:
+            raise ValueError('No attribute name given!')
+        the_type = _parse_type(type_name)
+        obj.add_attribute(attribute_name, the_type, constraint or None,
+                          initial_value=None if value is None else _parse_value(the_type, value))
+        self.attribute_count += 1
@@ -1,7 +1,9 @@
 # -*- coding: utf-8 -*-
 
+import cloudio.common.utils.timestamp_helpers as TimeStampProvider
 from cloudio.endpoint.node import CloudioNode
 from cloudio.endpoint.object import CloudioObject
+from cloudio.endpoint.runtime.object import CloudioRuntimeObjectBuilder
 
 
 class CloudioRuntimeNode(CloudioNode):
@@ -39,6 +41,7 @@ class CloudioRuntimeNode(CloudioNode):
             # Add object to the objects container
             assert name not in self.objects, 'Object with given name already present!'
             self.objects[name] = obj
+            self.structure_has_changed(obj)
             return obj
 
     def declare_implemented_interface(self, interface_name):
@@ -55,6 +58,7 @@ class CloudioRuntimeNode(CloudioNode):
 
         if interface_name not in self.interfaces:
             self.interfaces.append(interface_name)
+            self.structure_has_changed()
 
     def declare_implemented_interfaces(self, interface_names):
         for interfaceName in interface_names:
@@ -78,11 +82,66 @@ class CloudioRuntimeNode(CloudioNode):
     def remove_interface(self, interface:str):
         if interface in self.interfaces:
             self.interfaces.remove(interface)
+            self.structure_has_changed()
             return True
         else:
             return False
 
     def add_interface(self, interface:str):
         self.interfaces.append(interface)
+        self.structure_has_changed()
 
-# TODO Create and implement CloudioRuntimeNodeBuilder class
+
+class CloudioRuntimeNodeBuilder(object):
+    """Builds CloudioRuntimeNodes from a structural spec, checking the whole spec in one pass.
+
+    Spec of a node (same structure as the @online message):
+
+        {'implements': ['NodeInterface'],
+         'objects': {'Parameters': {'attributes': {'power': (bool, 'parameter', True)}}}}
+
+    See CloudioRuntimeObjectBuilder for the spec of the objects. The returned node is complete and
+    can be given to CloudioEndpoint.add_node().
+
+    Example:
+
+        node = CloudioRuntimeNodeBuilder(spec).build()
+        endpoint.add_node('MyNode', node)
+    """
+
+    def __init__(self, spec, columnar=False):
+        """
+        :param spec: Structure of the node
+        :type spec: dict
+        :param columnar: Build columnar objects (see CloudioRuntimeObject)
+        """
+        super(CloudioRuntimeNodeBuilder, self).__init__()
+        self._spec = spec
+        self._object_builder = CloudioRuntimeObjectBuilder(None, columnar=columnar)
+
+    @property
+    def attribute_count(self):
+        """Number of attributes created by the last build."""
+        return self._object_builder.attribute_count
+
+    def build(self):
+        """Returns a new CloudioRuntimeNode with the structure of the spec.
+
+        :raises ValueError: If the spec is not valid. The message contains the path of the invalid element
+        :raises InvalidCloudioAttributeException: If an attribute has an unsupported type
+        :rtype: CloudioRuntimeNode
+        """
+        if not isinstance(self._spec, dict):
+            raise ValueError('Node spec must be a dict, got %s' % type(self._spec).__name__)
+
+        interfaces = self._spec.get('implements', ())
+        if isinstance(interfaces, str) or not all(isinstance(interface, str) and interface
+                                                  for interface in interfaces):
+            raise ValueError('Interfaces must be a sequence of names')
+
+        node = CloudioRuntimeNode()
+        node.interfaces = list(dict.fromkeys(interfaces))  # Without duplicates, in declaration order
+        self._object_builder.attribute_count = 0
+        self._object_builder._build_objects(node, node.objects, self._spec.get('objects', ()), '',
+                                            TimeStampProvider.get_time_in_milliseconds(), {})
+        return node
@@ -1,14 +1,50 @@
 # -*- coding: utf-8 -*-
 
+import cloudio.common.utils.timestamp_helpers as TimeStampProvider
 from cloudio.endpoint.attribute import CloudioAttribute
 from cloudio.endpoint.attribute.constraint import CloudioAttributeConstraint
+from cloudio.endpoint.attribute.type import CloudioAttributeType
 from cloudio.endpoint.exception.cloudio_modification_exception import CloudioModificationException
+from cloudio.endpoint.exception.invalid_cloudio_attribute_exception import InvalidCloudioAttributeException
 from cloudio.endpoint.object import CloudioObject
+from cloudio.endpoint.runtime.columns import AttributeColumns, CloudioColumnAttribute
+
+# key: Python type or cloud.iO type name (lower case), value: (Python type, shared CloudioAttributeType)
+_ATTRIBUTE_TYPES = {
+    bool: (bool, CloudioAttributeType.get_instance(CloudioAttributeType.Boolean)),
+    int: (int, CloudioAttributeType.get_instance(CloudioAttributeType.Integer)),
+    float: (float, CloudioAttributeType.get_instance(CloudioAttributeType.Number)),
+    str: (str, CloudioAttributeType.get_instance(CloudioAttributeType.String)),
+}
+_ATTRIBUTE_TYPES.update({'boolean': _ATTRIBUTE_TYPES[bool], 'integer': _ATTRIBUTE_TYPES[int],
+                         'number': _ATTRIBUTE_TYPES[float], 'string': _ATTRIBUTE_TYPES[str]})
 
 
 class CloudioRuntimeObject(CloudioObject):
-    def __init__(self):
+    def __init__(self, columnar=False):
+        """
+        :param columnar: Store the values and timestamps of the Number attributes in columns (see AttributeColumns).
+                         Meant for objects with many Number attributes updated together, ex. sensor arrays
+        """
         super(CloudioRuntimeObject, self).__init__()
+        self._columns = AttributeColumns() if columnar else None  # type: AttributeColumns or None
+        self._template = None  # type: CloudioObjectTemplate or None # Template the object was created from
+
+    def get_template(self):
+        """Returns the template the object was created from, None if the object was not created from a template.
+
+        :rtype: CloudioObjectTemplate or None
+        """
+        return self._template
+
+    def get_columns(self):
+        """Returns the columns holding the Number attributes of a columnar object, None if the object is not columnar.
+
+        Use AttributeColumns.update() to update all Number attributes at once.
+
+        :rtype: AttributeColumns or None
+        """
+        return self._columns
 
     def get_object(self, name):
         """Returns the object with the given name or null if no object with the given name is part of the object.
@@ -37,6 +73,7 @@ class CloudioRuntimeObject(CloudioObject):
             # Add object to the objects container
             assert name not in self._internal.objects, 'Object with given name already present!'
             self._internal.objects[name] = obj
+            self.structure_has_changed(obj)
 
     def get_attribute(self, name):
         return self._internal.get_attributes()[name]
@@ -47,7 +84,10 @@ class CloudioRuntimeObject(CloudioObject):
                                                ' it is registered within the endpoint!')
 
         # Create cloud.iO attribute
-        attribute = CloudioAttribute()
+        if self._columns is not None and atype is float:
+            attribute = CloudioColumnAttribute(self._columns)
+        else:
+            attribute = CloudioAttribute()
 
         attribute.set_parent(self)
         attribute.set_name(name)
@@ -59,15 +99,16 @@ class CloudioRuntimeObject(CloudioObject):
                 attribute.set_constraint(constraint)
             else:
                 assert isinstance(constraint, str), 'Wrong type'
-                attribute.set_constraint(CloudioAttributeConstraint(constraint))
+                attribute.set_constraint(CloudioAttributeConstraint.get_instance(constraint))
         else:
-            attribute.set_constraint(CloudioAttributeConstraint('Invalid'))
+            attribute.set_constraint(CloudioAttributeConstraint.get_instance('Invalid'))
 
         if initial_value:
             attribute.set_value(initial_value)
 
         assert name not in self._internal._attributes, 'Attribute with given name already present!'
         self._internal._attributes[name] = attribute
+        self.structure_has_changed(attribute)
 
         return attribute
 
@@ -79,4 +120,221 @@ class CloudioRuntimeObject(CloudioObject):
         # internal object
         return encoder.default(self._internal)
 
-# TODO Create and implement CloudioRuntimeObjectBuilder class
+
+class CloudioRuntimeObjectBuilder(object):
+    """Builds CloudioRuntimeObjects from a structural spec, checking the whole spec in one pass.
+
+    Spec of an object:
+
+        {'conforms': 'Class',
+         'attributes': {'power': (bool, 'parameter', True),
+                        'temperature': {'type': 'Number', 'constraint': 'measure', 'value': 21.5}},
+         'objects': {'Child': {...}}}
+
+    All keys are optional. 'attributes' and 'objects' can also be sequences of (name, spec) tuples.
+    An attribute is given as (type[, constraint[, initial value]]) tuple or as dict, its type either
+    as python type (bool, int, float, str) or as cloud.iO type name ('Boolean', 'Integer', ...).
+    A child object can also be given as CloudioObjectTemplate.
+
+    In contrast to add_object() and add_attribute(), the builder does not check the endpoint
+    registration and report a structure change for every element. The elements are allocated
+    directly with the shared type and constraint instances and the initial values get a common
+    timestamp.
+    """
+
+    def __init__(self, spec, columnar=False):
+        """
+        :param spec: Structure of the object
+        :type spec: dict
+        :param columnar: Build columnar objects (see CloudioRuntimeObject)
+        """
+        super(CloudioRuntimeObjectBuilder, self).__init__()
+        self._spec = spec
+        self._columnar = columnar
+        self.attribute_count = 0  # Number of attributes created by the last build
+
+    def build(self):
+        """Returns a new CloudioRuntimeObject with the structure of the spec.
+
+        :raises ValueError: If the spec is not valid. The message contains the path of the invalid element
+        :raises InvalidCloudioAttributeException: If an attribute has an unsupported type
+        :rtype: CloudioRuntimeObject
+        """
+        self.attribute_count = 0
+        return self._build_object(self._spec, '', TimeStampProvider.get_time_in_milliseconds(), {})
+
+    def _build_objects(self, parent, objects, objects_spec, path, timestamp, constraints):
+        for object_name, object_spec in _iter_items(objects_spec, path):
+            object_path = _check_name(object_name, objects, path)
+            obj = self._build_object(object_spec, object_path, timestamp, constraints)
+            obj._internal.parent = parent
+            obj._internal.name = object_name
+            objects[object_name] = obj
+
+    def _build_object(self, spec, path, timestamp, constraints):
+        if isinstance(spec, CloudioObjectTemplate):
+            self.attribute_count += spec.attribute_count
+            return spec._create(timestamp)
+        if not isinstance(spec, dict):
+            raise ValueError('%s: Object spec must be a dict, got %s' % (path or '<object>', type(spec).__name__))
+
+        obj = CloudioRuntimeObject(columnar=self._columnar)
+        internal = obj._internal
+        internal.conforms = spec.get('conforms')
+
+        attributes = internal._attributes
+        for attribute_name, attribute_spec in _iter_items(spec.get('attributes', ()), path):
+            attribute_path = _check_name(attribute_name, attributes, path)
+            attributes[attribute_name] = _create_attribute(obj, attribute_name,
+                                                           *_parse_attribute_spec(attribute_spec, attribute_path,
+                                                                                  constraints),
+                                                           timestamp)
+            self.attribute_count += 1
+
+        self._build_objects(obj, internal.objects, spec.get('objects', ()), path, timestamp, constraints)
+        return obj
+
+
+class CloudioObjectTemplate(object):
+    """Compiled structure of the objects conforming to a cloud.iO class.
+
+    The spec (see CloudioRuntimeObjectBuilder) is checked and compiled once. The objects created
+    from the template share the names, types and constraints of their attributes and the
+    pre-encoded parts of their @update messages, each object only stores the values, timestamps and
+    listeners of its attributes. The @online message announces the objects with the class name of
+    the template ('conforms').
+
+    Example:
+
+        sensor = CloudioObjectTemplate({'conforms': 'Sensor', 'attributes': {'temperature': (float, 'measure')}})
+        for index in range(5000):
+            node.add_object('sensor%d' % index, sensor.create())
+    """
+
+    def __init__(self, spec, path=''):
+        """
+        :param spec: Structure of the objects. Child objects can be specs or templates
+        :type spec: dict
+        :param path: Path of the template in the spec it is part of. Used in error messages
+        :raises ValueError: If the spec is not valid. The message contains the path of the invalid element
+        :raises InvalidCloudioAttributeException: If an attribute has an unsupported type
+        """
+        super(CloudioObjectTemplate, self).__init__()
+        if not isinstance(spec, dict):
+            raise ValueError('%s: Object spec must be a dict, got %s' % (path or '<object>', type(spec).__name__))
+        self.conforms = spec.get('conforms')  # type: str or None # Name of the cloud.iO class
+
+        # Per attribute: name, parsed spec and @update message templates shared by the attributes of all objects
+        self._attributes = []
+        names = {}
+        constraints = {}
+        for attribute_name, attribute_spec in _iter_items(spec.get('attributes', ()), path):
+            attribute_path = _check_name(attribute_name, names, path)
+            names[attribute_name] = None
+            self._attributes.append((attribute_name, _parse_attribute_spec(attribute_spec, attribute_path,
+                                                                           constraints), {}))
+
+        self._objects = []
+        names = {}
+        for object_name, object_spec in _iter_items(spec.get('objects', ()), path):
+            object_path = _check_name(object_name, names, path)
+            names[object_name] = None
+            if not isinstance(object_spec, CloudioObjectTemplate):
+                object_spec = CloudioObjectTemplate(object_spec, object_path)
+            self._objects.append((object_name, object_spec))
+
+        self.attribute_count = len(self._attributes) + \
+            sum(template.attribute_count for _, template in self._objects)  # Attributes per object, with children
+
+    def create(self):
+        """Returns a new CloudioRuntimeObject with the structure of the template.
+
+        :rtype: CloudioRuntimeObject
+        """
+        return self._create(TimeStampProvider.get_time_in_milliseconds())
+
+    def _create(self, timestamp):
+        obj = CloudioRuntimeObject()
+        obj._template = self
+        internal = obj._internal
+        internal.conforms = self.conforms
+
+        attributes = internal._attributes
+        for attribute_name, attribute_spec, update_templates in self._attributes:
+            attribute = _create_attribute(obj, attribute_name, *attribute_spec, timestamp)
+            attribute._update_templates = update_templates
+            attributes[attribute_name] = attribute
+
+        objects = internal.objects
+        for object_name, template in self._objects:
+            child = template._create(timestamp)
+            child._internal.parent = obj
+            child._internal.name = object_name
+            objects[object_name] = child
+        return obj
+
+
+def _parse_attribute_spec(spec, path, constraints):
+    """Returns the python type, shared CloudioAttributeType, constraint and initial value of the attribute spec."""
+    if isinstance(spec, dict):
+        atype, constraint, initial_value = spec.get('type'), spec.get('constraint'), spec.get('value')
+    elif isinstance(spec, tuple) and 1 <= len(spec) <= 3:
+        atype, constraint, initial_value = spec + (None,) * (3 - len(spec))
+    else:
+        raise ValueError('%s: Attribute spec must be a dict or a (type, constraint, value) tuple' % path)
+
+    the_type, attribute_type = _ATTRIBUTE_TYPES.get(atype.lower() if isinstance(atype, str) else atype, (None, None))
+    if the_type is None:
+        raise InvalidCloudioAttributeException(atype)
+
+    if not isinstance(constraint, CloudioAttributeConstraint):
+        key = constraint or 'Invalid'
+        constraint = constraints.get(key)
+        if constraint is None:
+            constraint = constraints[key] = CloudioAttributeConstraint.get_instance(key)
+
+    if initial_value:
+        if the_type is str and not isinstance(initial_value, str):
+            raise ValueError('%s: Initial value must be a str' % path)
+        try:
+            initial_value = the_type(initial_value)
+        except (ValueError, TypeError) as exception:
+            raise ValueError('%s: Invalid initial value %r (%s)' % (path, initial_value, exception))
+    return the_type, attribute_type, constraint, initial_value
+
+
+def _create_attribute(obj, name, the_type, attribute_type, constraint, initial_value, timestamp):
+    """Creates an attribute of the given object, without the checks of CloudioRuntimeObject.add_attribute()."""
+    if obj._columns is not None and the_type is float:
+        attribute = CloudioColumnAttribute(obj._columns)
+    else:
+        attribute = CloudioAttribute()
+    attribute._name = name
+    attribute._parent = obj
+    attribute._type = attribute_type
+    attribute._constraint = constraint
+    if initial_value:
+        attribute._value = initial_value
+        attribute._timestamp = timestamp
+    else:
+        attribute._value = the_type()
+    return attribute
+
+
+def _iter_items(items, path):
+    """Iterates over the (name, spec) pairs given as dict or as sequence of tuples."""
+    if isinstance(items, dict):
+        return items.items()
+    if isinstance(items, (list, tuple)) and all(isinstance(item, tuple) and len(item) == 2 for item in items):
+        return items
+    raise ValueError('%s: Expected a dict or a sequence of (name, spec) tuples' % (path or '<root>'))
+
+
+def _check_name(name, elements, path):
+    """Checks the name of an element to add to the given elements and returns the path of the element."""
+    if not name or not isinstance(name, str) or '/' in name:
+        raise ValueError('%s: Invalid name %r' % (path or '<root>', name))
+    element_path = path + '/' + name if path else name
+    if name in elements:
+        raise ValueError('%s: Name already present' % element_path)
+    return element_path
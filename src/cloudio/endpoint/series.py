@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+import time
+from threading import Lock
+
+
+class SeriesBuffer(object):
+    """Collects the samples of an attribute sent as time series (@series messages).
+
+    The samples are handed over as soon as 'max_samples' are collected or the oldest sample
+    is older than 'interval' seconds.
+    """
+
+    def __init__(self, attribute, interval=1.0, max_samples=1000):
+        """
+        :param attribute: Attribute the samples belong to
+        :type attribute: CloudioAttribute
+        :param interval: Maximum time in seconds a sample stays in the buffer
+        :param max_samples: Maximum number of samples per message
+        """
+        super(SeriesBuffer, self).__init__()
+        self.attribute = attribute
+        self._interval = interval
+        self._max_samples = max_samples
+        self._samples = []  # type: list[(int, float)]
+        self._first_sample_time = 0.0  # time.monotonic() of the oldest sample in the buffer
+        self._lock = Lock()
+
+    def append(self, timestamp, value) -> bool:
+        """Adds a sample. Returns True if the buffer is full and should be sent.
+
+        :param timestamp: Timestamp in milliseconds
+        :param value: Value of the attribute
+        """
+        with self._lock:
+            if not self._samples:
+                self._first_sample_time = time.monotonic()
+            self._samples.append((timestamp, value))
+            return len(self._samples) >= self._max_samples
+
+    def is_due(self) -> bool:
+        """Returns True if the oldest sample reached the send interval."""
+        with self._lock:
+            return bool(self._samples) and time.monotonic() - self._first_sample_time >= self._interval
+
+    def time_until_due(self):
+        """Returns the time in seconds until the oldest sample reaches the send interval or None if empty.
+
+        :rtype: float or None
+        """
+        with self._lock:
+            if not self._samples:
+                return None
+            return max(0.0, self._interval - (time.monotonic() - self._first_sample_time))
+
+    def take(self):
+        """Returns the collected samples and empties the buffer.
+
+        :rtype: list[(int, float)]
+        """
+        with self._lock:
+            samples, self._samples = self._samples, []
+            return samples
+
+    def __len__(self):
+        return len(self._samples)
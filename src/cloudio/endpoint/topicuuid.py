@@ -1,37 +1,60 @@
 # -*- coding: utf-8 -*-
 
+import sys
 import traceback
 
 from .interface import uuid
 
+_element_classes = None  # (CloudioAttribute, CloudioNodeContainer, CloudioObjectContainer), imported on first use
+
+
+def _get_element_classes():
+    global _element_classes
+    if _element_classes is None:
+        from cloudio.endpoint.attribute import CloudioAttribute
+        from cloudio.endpoint.interface.node_container import CloudioNodeContainer
+        from cloudio.endpoint.interface.object_container import CloudioObjectContainer
+        _element_classes = (CloudioAttribute, CloudioNodeContainer, CloudioObjectContainer)
+    return _element_classes
+
 
 class TopicUuid(uuid.CloudioUuid):
     """Topic based CloudioUuid (Universally Unique Identifier)
 
     In the case of topic based MQTT communication the topic is used directly in order to identify objects
+
+    The topic of a parent element is taken from the parent's own TopicUuid. Model elements keep their
+    TopicUuid as soon as it is attached (the element is part of an endpoint), as names and parents can
+    not change anymore from then on.
     """
 
+    __slots__ = ('_topic', '_attached', '_action_topics')
+
     def __init__(self, cloud_io_element=None):
         super(TopicUuid, self).__init__()
         # The topic is the UUID for every object
         self._topic = None  # type: str or None
+        self._attached = False  # True if the topic goes up to the endpoint
+        self._action_topics = None  # type: dict or None # key: action (ex. '@update'), value: '<action>/<topic>'
 
         if cloud_io_element:
-            from cloudio.endpoint.attribute import CloudioAttribute
-            from cloudio.endpoint.interface.node_container import CloudioNodeContainer
-            from cloudio.endpoint.interface.object_container import CloudioObjectContainer
+            attribute_class, node_container_class, object_container_class = _get_element_classes()
 
             try:
-                if isinstance(cloud_io_element, CloudioAttribute):
+                if isinstance(cloud_io_element, attribute_class):
                     self._topic = self._get_attribute_topic(cloud_io_element)
-                elif isinstance(cloud_io_element, CloudioNodeContainer):
+                elif isinstance(cloud_io_element, node_container_class):
                     self._topic = self._get_node_container_topic(cloud_io_element)
-                elif isinstance(cloud_io_element, CloudioObjectContainer):
+                    self._attached = self._topic is not None
+                elif isinstance(cloud_io_element, object_container_class):
                     self._topic = self._get_object_container_topic(cloud_io_element)
             except Exception:
                 traceback.print_exc()
                 raise RuntimeError('Error in TopicUuid')
 
+            if self._topic is not None:
+                self._topic = sys.intern(self._topic)
+
     ######################################################################
     # interface.CloudioUuid implementation
     #
@@ -63,6 +86,23 @@ class TopicUuid(uuid.CloudioUuid):
     def topic(self):
         return self._topic
 
+    def is_attached(self) -> bool:
+        """Returns True if the topic goes up to the endpoint, so it will not change anymore."""
+        return self._attached
+
+    def get_action_topic(self, action):
+        """Returns the topic of the MQTT messages with the given action. Ex: '@update/<topic>'
+
+        :param action: Action of the message. Ex: '@update'
+        :type action: str
+        """
+        if self._action_topics is None:
+            self._action_topics = {}
+        action_topic = self._action_topics.get(action)
+        if action_topic is None:
+            action_topic = self._action_topics[action] = sys.intern(action + '/' + self.topic)
+        return action_topic
+
     # topic.setter should only be used for testing.
     @topic.setter
     def topic(self, value):
@@ -79,19 +119,26 @@ class TopicUuid(uuid.CloudioUuid):
         # TODO Remove check below and put an assert for attributeContainer
         if attribute_container is None or attribute_container.get_name() is None:
             return '<no parent>' + '/' + '<no name>'
-        return self._get_object_container_topic(attribute_container.get_parent_object_container()) + \
-               '/' + attribute_container.get_name()
+        if attribute_container.get_parent_object_container() is None:
+            return self._get_object_container_topic(None) + '/' + attribute_container.get_name()
+        return self._get_parent_topic(attribute_container)
 
     def _get_object_container_topic(self, object_container):
         if not object_container:
             return '<no parent>' + '/' + '<no name>'
         parentObjectContainer = object_container.get_parent_object_container()
         if parentObjectContainer:
-            return self._get_object_container_topic(parentObjectContainer) + '/' + object_container.get_name()
+            return self._get_parent_topic(parentObjectContainer) + '/' + object_container.get_name()
 
         parentNodeContainer = object_container.get_parent_node_container()
         if parentNodeContainer:
-            return self._get_node_container_topic(parentNodeContainer) + '/' + object_container.get_name()
+            return self._get_parent_topic(parentNodeContainer) + '/' + object_container.get_name()
+
+    def _get_parent_topic(self, parent):
+        # Use the (cached) TopicUuid of the parent instead of walking up to the endpoint
+        parent_uuid = parent.get_uuid()
+        self._attached = parent_uuid.is_attached()
+        return parent_uuid.topic
 
     @staticmethod
     def _get_node_container_topic(node_container):
@@ -0,0 +1,424 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Measures the time needed to build the @online payload for endpoints of different sizes
+and the time needed to encode @update messages, and compares the installed codecs and message formats.
+
+Run with: 'python tests/benchmark/benchmark_serialization.py [attribute counts...]'
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import cbor
+
+import paths  # noqa: F401 # Adds 'src' to the python path
+
+from cloudio.endpoint.interface.node_container import CloudioNodeContainer
+from cloudio.endpoint.message_format.cbor_format import CborMessageFormat
+from cloudio.endpoint.message_format.codec import CBOR_CODECS, JSON_CODECS, available_codecs, create_codec
+from cloudio.endpoint.message_format.factory import MessageFormatFactory
+from cloudio.endpoint.message_format.generic_format import GenericMessageFormat, _GenericMessageEncoder
+from cloudio.endpoint.message_format.json_format import JsonMessageFormat
+from cloudio.endpoint.message_format.structure_cache import StructureCache
+from cloudio.endpoint.object import CloudioObject
+from cloudio.endpoint.runtime.cache import ModelCache
+from cloudio.endpoint.runtime import CloudioRuntimeNode, CloudioRuntimeNodeBuilder, CloudioRuntimeObject, ModelLoader
+from cloudio.endpoint.runtime import CloudioObjectTemplate
+from cloudio.endpoint.topicuuid import TopicUuid
+
+ATTRIBUTES_PER_OBJECT = 20
+OBJECTS_PER_NODE = 50
+
+
+class _Endpoint(object):
+    def __init__(self, nodes):
+        self.nodes = nodes
+
+
+class _NodeContainer(CloudioNodeContainer):
+    """Endpoint stand-in the nodes get attached to (topics start with the endpoint name).
+    """
+    def get_name(self):
+        return 'benchmark-endpoint'
+
+    def get_uuid(self):
+        return TopicUuid(self)
+
+    def set_name(self, name):
+        pass
+
+    def attribute_has_changed_by_endpoint(self, attribute):
+        pass
+
+    def attribute_has_changed_by_cloud(self, attribute):
+        pass
+
+
+def create_endpoint(attribute_count):
+    """Creates an endpoint like model with the given number of attributes.
+    """
+    nodes = {}
+    node = None
+    obj = None
+    for index in range(attribute_count):
+        if index % (ATTRIBUTES_PER_OBJECT * OBJECTS_PER_NODE) == 0:
+            node = CloudioRuntimeNode()
+            node.declare_implemented_interface('NodeInterface')
+            node.set_name('node%d' % len(nodes))
+            nodes[node.get_name()] = node
+        if index % ATTRIBUTES_PER_OBJECT == 0:
+            obj = node.add_object('object%d' % len(node.objects), CloudioRuntimeObject)
+        if index % 2:
+            obj.add_attribute('attribute%d' % index, float, 'measure', initial_value=index / 10.0)
+        else:
+            obj.add_attribute('attribute%d' % index, int, 'parameter', initial_value=index)
+    return _Endpoint(nodes)
+
+
+def serialize_endpoint_reflection(endpoint):
+    """Previous implementation: Reflection based encoder followed by a JSON round trip.
+    """
+    data = {'nodes': {node.get_name(): node for node in endpoint.nodes.values()},
+            'version': 'v0.2', 'messageFormatVersion': 2, 'supportedFormats': ['JSON', 'CBOR']}
+    return json.loads(_GenericMessageEncoder().encode(data))
+
+
+def measure_peak_memory(function, argument):
+    """Returns the peak memory in KiB allocated by the given function.
+    """
+    tracemalloc.start()
+    function(argument)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def measure(function, argument, repeat=3):
+    """Returns the best time in milliseconds of the given function.
+    """
+    best = None
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        function(argument)
+        duration = (time.perf_counter() - start_time) * 1000
+        best = duration if best is None else min(best, duration)
+    return best
+
+
+def benchmark_updates(update_count=10000):
+    """Prints the time in microseconds needed to encode one @update message.
+    """
+    generic_format = GenericMessageFormat()
+    cbor_format = CborMessageFormat()
+    json_format = JsonMessageFormat()
+    benchmarks = [
+        ('cbor (dict)', lambda attribute: cbor.dumps(generic_format.serialize_attribute(attribute))),
+        ('cbor (template)', cbor_format.serialize_attribute),
+        ('json (dict)', lambda attribute: json.dumps(generic_format.serialize_attribute(attribute))),
+        ('json (template)', json_format.serialize_attribute),
+    ]
+
+    obj = CloudioRuntimeObject()
+    attribute = obj.add_attribute('temperature', float, 'measure')
+    attribute.set_value(21.5)
+
+    def encode_updates(function):
+        for _ in range(update_count):
+            function(attribute)
+
+    print('@update encoding (us)')
+    print(''.join('%16s' % name for name, _ in benchmarks))
+    print(''.join('%16.2f' % (measure(encode_updates, function) * 1000 / update_count) for _, function in benchmarks))
+
+
+def benchmark_update_sizes():
+    """Prints the size in bytes of the @update message per attribute type, standard and lean profile.
+    """
+    message_formats = [('cbor', CborMessageFormat(), CborMessageFormat(lean=True)),
+                       ('json', JsonMessageFormat(), JsonMessageFormat(lean=True))]
+    attributes = [
+        ('Boolean', bool, True, None),
+        ('Integer', int, 1250, None),
+        ('Number', float, 230.12, None),
+        ('Number (2 dec.)', float, 230.12, {'decimals': 2}),
+        ('Number (float32)', float, 230.12, {'float32': True}),
+        ('String', str, 'running', None),
+    ]
+
+    print('@update size (bytes)')
+    print('%18s' % 'type' + ''.join('%16s%16s' % (name, name + ' (lean)') for name, _, _ in message_formats))
+    for name, attribute_type, value, precision in attributes:
+        attribute = CloudioRuntimeObject().add_attribute('value', attribute_type, 'measure')
+        if precision:
+            attribute.set_precision(**precision)
+        attribute.set_value(value, timestamp=1476111491023)
+        print('%18s' % name + ''.join('%16d%16d' % (len(standard.serialize_attribute(attribute)),
+                                                     len(lean.serialize_attribute(attribute)))
+                                      for _, standard, lean in message_formats))
+
+
+def benchmark_topics(depths=(1, 4, 16, 64), call_count=10000):
+    """Prints the time in microseconds needed to get the topics of the elements of deep models.
+    """
+    print('Topics (us)')
+    print('%12s%16s%16s%16s' % ('depth', 'node', 'object', 'attribute'))
+    for depth in depths:
+        node = CloudioRuntimeNode()
+        node.set_name('node')
+        obj = node.add_object('object0', CloudioRuntimeObject)
+        for index in range(1, depth):
+            child = CloudioRuntimeObject()
+            obj.add_object('object%d' % index, child)
+            obj = child
+        attribute = obj.add_attribute('attribute', float, 'measure')
+        node.set_parent_node_container(_NodeContainer())
+
+        def get_topics(element):
+            for _ in range(call_count):
+                element.get_uuid().to_string()
+
+        print('%12d' % depth + ''.join('%16.2f' % (measure(get_topics, element) * 1000 / call_count)
+                                       for element in (node, obj._internal, attribute)))
+
+
+class _StaticObject(CloudioObject):
+    # Object with static attributes declared in the class
+    manufacturer = 'HEVS'
+    model = 'VC-3000'
+    serial = 123456
+    version = 1.2
+    enabled = True
+
+    def get_description(self):
+        return '%s %s' % (self.manufacturer, self.model)
+
+
+def benchmark_construction(instance_counts=(100, 1000, 10000)):
+    """Prints the time in milliseconds needed to create objects with static attributes and get their attributes.
+    """
+    print('Construction (ms)')
+    print('%12s%16s%16s' % ('instances', 'total', 'per 1000'))
+    for instance_count in instance_counts:
+        def construct(count):
+            for index in range(count):
+                obj = _StaticObject()
+                obj.set_name('object%d' % index)
+                obj.get_attributes()
+
+        duration = measure(construct, instance_count)
+        print('%12d%16.2f%16.2f' % (instance_count, duration, duration * 1000 / instance_count))
+
+
+def create_node_specs(attribute_count):
+    """Returns the node specs of the model returned by create_endpoint() for CloudioRuntimeNodeBuilder."""
+    specs = {}
+    objects = attributes = None
+    for index in range(attribute_count):
+        if index % (ATTRIBUTES_PER_OBJECT * OBJECTS_PER_NODE) == 0:
+            objects = {}
+            specs['node%d' % len(specs)] = {'implements': ['NodeInterface'], 'objects': objects}
+        if index % ATTRIBUTES_PER_OBJECT == 0:
+            attributes = {}
+            objects['object%d' % len(objects)] = {'attributes': attributes}
+        if index % 2:
+            attributes['attribute%d' % index] = (float, 'measure', index / 10.0)
+        else:
+            attributes['attribute%d' % index] = (int, 'parameter', index)
+    return specs
+
+
+def benchmark_builder(attribute_counts=(1000, 10000, 100000)):
+    """Prints the time in milliseconds needed to build models with the incremental API and with the node builder.
+    """
+    def build(specs):
+        return {node_name: CloudioRuntimeNodeBuilder(spec).build() for node_name, spec in specs.items()}
+
+    print('Model construction (ms)')
+    print('%12s%16s%16s' % ('attributes', 'incremental', 'builder'))
+    for attribute_count in attribute_counts:
+        print('%12d%16.1f%16.1f' % (attribute_count, measure(create_endpoint, attribute_count),
+                                    measure(build, create_node_specs(attribute_count))))
+
+
+def benchmark_templates(object_count=5000, attributes_per_object=10):
+    """Prints the time and the memory needed by identical objects built from specs and from a shared template.
+
+    The memory is measured after one @update message was encoded for each attribute.
+    """
+    spec = {'conforms': 'Sensor',
+            'attributes': {'value%d' % index: (float, 'measure', 1.5) for index in range(attributes_per_object)}}
+    template = CloudioObjectTemplate(spec)
+    json_format = JsonMessageFormat()
+
+    def build(object_spec):
+        return CloudioRuntimeNodeBuilder({'objects': {'sensor%d' % index: object_spec
+                                                      for index in range(object_count)}}).build()
+
+    def build_and_update(object_spec):
+        node = build(object_spec)
+        for obj in node.objects.values():
+            for attribute in obj.get_attributes().values():
+                json_format.serialize_attribute(attribute)
+        return node
+
+    def retained_memory(object_spec):
+        tracemalloc.start()
+        node = build_and_update(object_spec)  # noqa: F841 # Kept alive until the memory is measured
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return current / 1024
+
+    print('%d objects with %d attributes' % (object_count, attributes_per_object))
+    print('%12s%16s%16s' % ('objects', 'build (ms)', 'memory (KiB)'))
+    for name, object_spec in (('spec', spec), ('template', template)):
+        print('%12s%16.1f%16.0f' % (name, measure(build, object_spec), retained_memory(object_spec)))
+
+
+def write_model_files(directory, attribute_count):
+    """Writes the model returned by create_endpoint() as XML and JSON model files."""
+    endpoint = create_endpoint(attribute_count)
+    xml_path, json_path = os.path.join(directory, 'model.xml'), os.path.join(directory, 'model.json')
+    with open(xml_path, 'w') as xml_file:
+        xml_file.write('<configs><config>\n')
+        for node_name, node in endpoint.nodes.items():
+            xml_file.write('<deviceType typeId="%s">\n' % node_name)
+            for object_name, obj in node.get_objects().items():
+                xml_file.write('<object id="%s">\n' % object_name)
+                for attribute_name, attribute in obj.get_attributes().items():
+                    xml_file.write('<attribute id="%s" template="%s" constraint="%s"/>\n' %
+                                   (attribute_name, attribute.get_type_as_string(),
+                                    attribute.get_constraint().to_string()))
+                xml_file.write('</object>\n')
+            xml_file.write('</deviceType>\n')
+        xml_file.write('</config></configs>\n')
+    with open(json_path, 'w') as json_file:
+        json.dump(GenericMessageFormat().serialize_endpoint(endpoint), json_file)
+    return xml_path, json_path
+
+
+def benchmark_model_loader(attribute_count=100000):
+    """Prints the time and the peak memory needed to load models from XML and JSON model files.
+
+    The loaded nodes are dropped one by one, so the peak memory is the one of the parser.
+    """
+    from xml.dom import minidom
+
+    def load(path):
+        for _ in ModelLoader().iter_nodes(path):
+            pass
+
+    def parse_minidom(path):
+        minidom.parse(path)
+
+    print('Model loader (%d attributes)' % attribute_count)
+    print('%24s%16s%16s' % ('', 'time (ms)', 'peak (MiB)'))
+    with tempfile.TemporaryDirectory() as directory:
+        xml_path, json_path = write_model_files(directory, attribute_count)
+        json_name = 'ModelLoader JSON' + (' (ijson)' if ModelLoader.is_incremental_json_available() else '')
+        for name, function, path in (('minidom (parse only)', parse_minidom, xml_path),
+                                     ('ModelLoader XML', load, xml_path),
+                                     (json_name, load, json_path)):
+            print('%24s%16.1f%16.1f' % (name, measure(function, path, repeat=1),
+                                        measure_peak_memory(function, path) / 1024))
+
+
+def benchmark_model_cache(attribute_count=100000):
+    """Prints the time in milliseconds from loading a model file to the encoded @online message,
+    without and with the model cache.
+    """
+    def first_publish(load_nodes):
+        nodes = {}
+        for node_name, node in load_nodes():
+            node.set_name(node_name)
+            nodes[node_name] = node
+        StructureCache(CborMessageFormat()).serialize_endpoint(_Endpoint(nodes))
+
+    print('Time to @online (%d attributes, ms)' % attribute_count)
+    with tempfile.TemporaryDirectory() as directory:
+        xml_path, _ = write_model_files(directory, attribute_count)
+        cache = ModelCache()
+        print('%24s%16.1f' % ('ModelLoader XML', measure(first_publish, lambda: ModelLoader().iter_nodes(xml_path),
+                                                         repeat=1)))
+        print('%24s%16.1f' % ('ModelCache (cold)', measure(first_publish, lambda: cache.load_nodes(xml_path),
+                                                           repeat=1)))
+        print('%24s%16.1f' % ('ModelCache (warm)', measure(first_publish, lambda: cache.load_nodes(xml_path))))
+
+
+def benchmark_codecs(attribute_count):
+    """Prints the time in milliseconds needed by the installed codecs to encode and decode the @online message.
+    """
+    data = GenericMessageFormat().serialize_endpoint(create_endpoint(attribute_count))
+
+    print('Codecs, %d attributes (ms)' % attribute_count)
+    print('%12s%16s%16s' % ('codec', 'dumps', 'loads'))
+    for codecs in (CBOR_CODECS, JSON_CODECS):
+        for name in available_codecs(codecs):
+            codec = create_codec(codecs, name)
+            payload = codec.dumps(data)
+            print('%12s%16.1f%16.1f' % (name, measure(codec.dumps, data), measure(codec.loads, payload)))
+    print('Selected: %s, %s' % (create_codec(CBOR_CODECS).name, create_codec(JSON_CODECS).name))
+
+
+def benchmark_formats(attribute_count, update_count=10000):
+    """Prints encode time and payload size of the @online and @update messages per message format.
+    """
+    endpoint = create_endpoint(attribute_count)
+    attribute = next(iter(next(iter(endpoint.nodes.values())).objects.values())).get_attribute('attribute1')
+
+    def encode_updates(message_format):
+        for _ in range(update_count):
+            message_format.serialize_attribute(attribute)
+
+    print('Message formats, %d attributes' % attribute_count)
+    print('%12s%16s%16s%16s%16s' % ('format', '@online (ms)', '@online (B)', '@update (us)', '@update (B)'))
+    for name in MessageFormatFactory.supported_formats():
+        message_format = MessageFormatFactory.messageFormatByName(name)
+        print('%12s%16.1f%16d%16.2f%16d' % (name,
+                                             measure(message_format.serialize_endpoint, endpoint),
+                                             len(message_format.serialize_endpoint(endpoint)),
+                                             measure(encode_updates, message_format) * 1000 / update_count,
+                                             len(message_format.serialize_attribute(attribute))))
+
+
+def main(attribute_counts):
+    generic_format = GenericMessageFormat()
+    cbor_format = CborMessageFormat()
+    benchmarks = [
+        ('reflection', serialize_endpoint_reflection),
+        ('generic', generic_format.serialize_endpoint),
+        ('cbor (dict)', lambda endpoint: cbor.dumps(generic_format.serialize_endpoint(endpoint))),
+        ('cbor (direct)', cbor_format.serialize_endpoint),
+    ]
+    endpoints = [(attribute_count, create_endpoint(attribute_count)) for attribute_count in attribute_counts]
+
+    print('Time (ms)')
+    print('%12s' % 'attributes' + ''.join('%16s' % name for name, _ in benchmarks))
+    for attribute_count, endpoint in endpoints:
+        durations = [measure(function, endpoint) for _, function in benchmarks]
+        print('%12d' % attribute_count + ''.join('%16.1f' % duration for duration in durations))
+
+    print('Peak memory (KiB)')
+    print('%12s' % 'attributes' + ''.join('%16s' % name for name, _ in benchmarks))
+    for attribute_count, endpoint in endpoints:
+        peaks = [measure_peak_memory(function, endpoint) for _, function in benchmarks]
+        print('%12d' % attribute_count + ''.join('%16.0f' % peak for peak in peaks))
+
+    benchmark_updates()
+    benchmark_update_sizes()
+    benchmark_topics()
+    benchmark_construction()
+    benchmark_builder()
+    benchmark_templates()
+    benchmark_model_loader()
+    benchmark_model_cache()
+    benchmark_codecs(attribute_counts[-1])
+    benchmark_formats(attribute_counts[-1])
+
+
+if __name__ == '__main__':
+    main([int(count) for count in sys.argv[1:]] or [100, 1000, 5000, 20000])
@@ -1,13 +1,18 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import gc
 import logging
+import tracemalloc
 import unittest
 from cloudio.common.utils import timestamp_helpers as timestamp_helpers
 from cloudio.endpoint.attribute import CloudioAttribute
+from cloudio.endpoint.attribute.constraint import CloudioAttributeConstraint
+from cloudio.endpoint.attribute.type import CloudioAttributeType
 from cloudio.endpoint.interface.attribute_listener import CloudioAttributeListener
 from cloudio.endpoint.exception.cloudio_modification_exception import CloudioModificationException
 from cloudio.endpoint.exception.invalid_cloudio_attribute_exception import InvalidCloudioAttributeException
+from cloudio.endpoint.runtime import CloudioRuntimeObject
 from tests.cloudio.paths import update_working_directory
 
 update_working_directory()  # Needed when: 'pipenv run python -m unittest tests/cloudio/{this_file}.py'
@@ -20,6 +25,8 @@ class TestAttributeListener(CloudioAttributeListener):
 
 class TestCloudioAttribute(unittest.TestCase):
 
+    log = logging.getLogger(__name__)
+
     def test_objectCreation(self):
         cloudio_attribute = CloudioAttribute()
         cloudio_attribute.set_name('digger')
@@ -83,6 +90,39 @@ class TestCloudioAttribute(unittest.TestCase):
         c_attr.set_constraint('static')
         self.assertRaises(CloudioModificationException, c_attr.set_constraint, 'static')
 
+    def test_sharedTypeAndConstraint(self):
+        obj = CloudioRuntimeObject()
+        first = obj.add_attribute('first', float, 'measure')
+        second = obj.add_attribute('second', float, 'Measure')
+        self.assertIs(first._type, second._type)
+        self.assertIs(first.get_constraint(), second.get_constraint())
+        self.assertIs(CloudioAttributeConstraint.get_instance(CloudioAttributeConstraint.Measure),
+                      CloudioAttributeConstraint.get_instance('MEASURE'))
+        self.assertIs(CloudioAttributeType.get_instance(CloudioAttributeType.Number), first._type)
+        self.assertEqual('Invalid', CloudioAttributeConstraint.get_instance('unknown').to_string())
+
+        # No per instance dictionary
+        for item in (first, first._type, first.get_constraint(), first.get_uuid()):
+            self.assertFalse(hasattr(item, '__dict__'), type(item).__name__)
+
+    def test_memoryFootprint(self):
+        attribute_count = 10000
+        obj = CloudioRuntimeObject()
+        names = ['attribute%d' % index for index in range(attribute_count)]
+
+        gc.collect()
+        tracemalloc.start()
+        try:
+            for name in names:
+                obj.add_attribute(name, float, 'measure', initial_value=1.5)
+            size = sum(statistic.size for statistic in tracemalloc.take_snapshot().statistics('filename'))
+        finally:
+            tracemalloc.stop()
+
+        # Includes the entry in the object's attribute dictionary
+        self.log.info('%d bytes per attribute' % (size / attribute_count))
+        self.assertLess(size / attribute_count, 300)
+
 
 if __name__ == '__main__':
     # Enable logging
@@ -2,7 +2,9 @@
 # -*- coding: utf-8 -*-
 
 import logging
+import threading
 import unittest
+from unittest import mock
 from tests.cloudio.paths import update_working_directory
 
 update_working_directory()  # Needed when: 'pipenv run python -m unittest tests/cloudio/{this_file}.py'
@@ -24,6 +26,110 @@ class TestCloudioEndpoint(unittest.TestCase):
             endpoint._processReceivedMessage(msg)
             self.assertTrue("ERROR:cloudio.endpoint.endpoint:'str' object has no attribute 'payload'" in log.output[0])
 
+    def test_store_messages_while_offline(self):
+        from cloudio.endpoint import CloudioEndpoint
+        from cloudio.endpoint.persistence import payload_from_pending_update
+        from cloudio.endpoint.properties_endpoint_configuration import PropertiesEndpointConfiguration
+
+        configuration = PropertiesEndpointConfiguration({'ch.hevs.cloudio.endpoint.hostUri': '127.0.0.1',
+                                                         'ch.hevs.cloudio.endpoint.persistence': 'memory'})
+        endpoint = CloudioEndpoint('test-endpoint', configuration=configuration)
+
+        with mock.patch.object(endpoint._client, 'publish') as publish:
+            # Not connected: Messages go straight to the persistence
+            endpoint._publish('@update/test-endpoint/node/object/attribute', b'\xa1', 1476163460000)
+            endpoint._process_publish_messages()
+            endpoint._persistence_writer.flush()
+
+            self.assertFalse(publish.called)
+            key = 'PendingUpdate-test-endpoint;node;object;attribute-1476163460000'
+            self.assertEqual(b'\xa1', payload_from_pending_update(endpoint.persistence.get(key)))
+
+            # Connected: Messages get published
+            endpoint._connected = True
+            with mock.patch.object(endpoint._client, 'is_connected', return_value=True):
+                endpoint._publish('@update/test-endpoint/node/object/attribute', b'\xa1', 1476163460001)
+                endpoint._process_publish_messages()
+            self.assertTrue(publish.called)
+
+        endpoint.close()
+
+    def test_reconnect_while_checking_connection(self):
+        from cloudio.endpoint import CloudioEndpoint
+        from cloudio.endpoint.properties_endpoint_configuration import PropertiesEndpointConfiguration
+
+        configuration = PropertiesEndpointConfiguration({'ch.hevs.cloudio.endpoint.hostUri': '127.0.0.1',
+                                                         'ch.hevs.cloudio.endpoint.persistence': 'none'})
+        endpoint = CloudioEndpoint('test-endpoint', configuration=configuration)
+        endpoint._connected = True
+        threads = []
+
+        def reconnect():
+            # The MQTT thread reconnects while the endpoint thread sees the connection lost
+            thread = threading.Thread(target=endpoint._on_connected)
+            threads.append(thread)
+            thread.start()
+            thread.join(0.1)
+            return False
+
+        with mock.patch.object(endpoint, 'announce'), \
+                mock.patch.object(endpoint, 'subscribe_to_set_commands', return_value=True), \
+                mock.patch('cloudio.endpoint.endpoint.time.sleep'), \
+                mock.patch.object(endpoint._client, 'is_connected', side_effect=reconnect):
+            endpoint._process_publish_messages()
+            threads[0].join()
+
+        self.assertTrue(endpoint._connected)
+        endpoint.close()
+
+    def test_message_format_property(self):
+        from cloudio.endpoint import CloudioEndpoint
+        from cloudio.endpoint.exception.invalid_property_exception import InvalidPropertyException
+        from cloudio.endpoint.message_format.json_format import JsonMessageFormat
+        from cloudio.endpoint.properties_endpoint_configuration import PropertiesEndpointConfiguration
+
+        properties = {'ch.hevs.cloudio.endpoint.hostUri': '127.0.0.1',
+                      'ch.hevs.cloudio.endpoint.persistence': 'none',
+                      'ch.hevs.cloudio.endpoint.messageFormat': 'json'}
+        endpoint = CloudioEndpoint('test-endpoint', configuration=PropertiesEndpointConfiguration(properties))
+        self.assertIsInstance(endpoint.message_format, JsonMessageFormat)
+        endpoint.close()
+
+        properties['ch.hevs.cloudio.endpoint.updateProfile'] = 'lean'
+        endpoint = CloudioEndpoint('test-endpoint', configuration=PropertiesEndpointConfiguration(properties))
+        self.assertIsInstance(endpoint.message_format, JsonMessageFormat)
+        self.assertTrue(endpoint.message_format._lean)
+        endpoint.close()
+
+        properties['ch.hevs.cloudio.endpoint.updateProfile'] = 'tiny'
+        with self.assertRaises(InvalidPropertyException):
+            CloudioEndpoint('test-endpoint', configuration=PropertiesEndpointConfiguration(properties))
+
+        properties['ch.hevs.cloudio.endpoint.updateProfile'] = 'standard'
+        properties['ch.hevs.cloudio.endpoint.messageFormat'] = 'yaml'
+        with self.assertRaises(InvalidPropertyException):
+            CloudioEndpoint('test-endpoint', configuration=PropertiesEndpointConfiguration(properties))
+
+    def test_max_message_size_property(self):
+        from cloudio.endpoint import CloudioEndpoint
+        from cloudio.endpoint.properties_endpoint_configuration import PropertiesEndpointConfiguration
+        from tests.cloudio.test_cloudio_message_generic_format import create_runtime_node
+
+        properties = {'ch.hevs.cloudio.endpoint.hostUri': '127.0.0.1',
+                      'ch.hevs.cloudio.endpoint.persistence': 'none',
+                      'ch.hevs.cloudio.endpoint.maxMessageSize': '256'}
+        endpoint = CloudioEndpoint('test-endpoint', configuration=PropertiesEndpointConfiguration(properties))
+        endpoint.add_node('VacuumCleaner', create_runtime_node(name=None))
+        endpoint.add_node('Other', create_runtime_node(name=None))
+
+        with mock.patch.object(endpoint, '_publish') as publish:
+            endpoint.announce()
+        self.assertEqual(['@online/test-endpoint',
+                          '@nodeAdded/test-endpoint/VacuumCleaner', '@nodeAdded/test-endpoint/Other'],
+                         [call[0][0] for call in publish.call_args_list])
+        self.assertEqual({}, endpoint.message_format.loads(publish.call_args_list[0][0][1])['nodes'])
+        endpoint.close()
+
 
 if __name__ == '__main__':
     # Enable logging
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+import unittest
+
+import cbor
+
+from cloudio.endpoint.message_format.cbor_format import CborMessageFormat
+from cloudio.endpoint.message_format.generic_format import GenericMessageFormat
+from cloudio.endpoint.node import CloudioNode
+from cloudio.endpoint.object import CloudioObject
+from cloudio.endpoint.runtime import CloudioRuntimeNode, CloudioRuntimeObject
+from tests.cloudio.paths import update_working_directory
+from tests.cloudio.test_cloudio_message_generic_format import create_runtime_node
+
+update_working_directory()  # Needed when: 'pipenv run python -m unittest tests/cloudio/{this_file}.py'
+
+
+class _Endpoint(object):
+    def __init__(self, nodes):
+        self.nodes = nodes
+
+
+class TestCloudioMessageFormatCbor(unittest.TestCase):
+    """Tests the CBOR encoding of the endpoint model.
+    """
+
+    log = logging.getLogger(__name__)
+
+    def setUp(self):
+        self.message_format = CborMessageFormat()
+        self.generic_format = GenericMessageFormat()
+
+    def test_serializeNode(self):
+        node = create_runtime_node()
+        self.assertEqual(cbor.dumps(self.generic_format.serialize_node(node)),
+                         self.message_format.serialize_node(node))
+
+    def test_serializeValues(self):
+        node = CloudioRuntimeNode()
+        node.set_name('Values')
+        obj = node.add_object('Object', CloudioRuntimeObject)
+        values = [0, 23, 24, 255, 256, 65535, 65536, 2 ** 32, 2 ** 64 - 1, 2 ** 70,
+                  -1, -24, -25, -256, -257, -2 ** 63, -2 ** 70, 0.5, -1e300, True, 'x' * 300, 'éèà']
+        for index, value in enumerate(values):
+            attribute = obj.add_attribute('attribute%d' % index, type(value), 'measure')
+            attribute.set_static_value(value)
+
+        data = self.message_format.serialize_node(node)
+        self.assertEqual(cbor.dumps(self.generic_format.serialize_node(node)), data)
+
+        decoded = cbor.loads(data)['objects']['Object']['attributes']
+        self.assertEqual(values, [decoded['attribute%d' % index]['value'] for index in range(len(values))])
+
+    def test_serializeAttribute(self):
+        obj = CloudioRuntimeObject()
+        for index, (value, constraint) in enumerate([(21.5, 'measure'), (-3, 'parameter'), (True, 'status'),
+                                                     ('Vacuum\u00e9', 'static'), (2 ** 70, 'setpoint')]):
+            attribute = obj.add_attribute('attribute%d' % index, type(value), constraint)
+            self.assertEqual(cbor.dumps(self.generic_format.serialize_attribute(attribute)),
+                             self.message_format.serialize_attribute(attribute))  # Without timestamp
+
+            attribute.set_value(value, timestamp=1476111491023)
+            self.assertEqual(cbor.dumps(self.generic_format.serialize_attribute(attribute)),
+                             self.message_format.serialize_attribute(attribute))
+            attribute.set_value(value, timestamp=1476111491024)
+            self.assertEqual(cbor.dumps(self.generic_format.serialize_attribute(attribute)),
+                             self.message_format.serialize_attribute(attribute))
+
+    def test_attributeTemplateFollowsType(self):
+        attribute = CloudioRuntimeObject().add_attribute('attribute', int, 'measure')
+        self.assertEqual('Integer', cbor.loads(self.message_format.serialize_attribute(attribute))['type'])
+
+        attribute.set_type(float)  # Allowed as long as the value is 0
+        self.assertEqual('Number', cbor.loads(self.message_format.serialize_attribute(attribute))['type'])
+
+    def test_serializeEndpoint(self):
+        static_node = CloudioNode()
+        static_node.set_name('Static')
+        static_node.objects['Object'] = CloudioObject()
+        endpoint = _Endpoint({'VacuumCleaner': create_runtime_node(), 'Static': static_node})
+
+        self.assertEqual(cbor.dumps(self.generic_format.serialize_endpoint(endpoint)),
+                         self.message_format.serialize_endpoint(endpoint))
+
+
+if __name__ == '__main__':
+    # Enable logging
+    logging.basicConfig(format='%(asctime)s.%(msecs)03d - %(name)s - %(levelname)s - %(message)s',
+                        datefmt='%Y-%m-%d %H:%M:%S',
+                        level=logging.INFO)
+
+    unittest.main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import logging
+import unittest
+
+import cbor
+
+from cloudio.endpoint.message_format.cbor_format import CborMessageFormat
+from cloudio.endpoint.message_format.codec import CBOR_CODECS, JSON_CODECS, available_codecs, create_codec
+from cloudio.endpoint.message_format.codec import Cbor2Codec, OrjsonCodec
+from cloudio.endpoint.message_format.json_format import JsonMessageFormat
+from tests.cloudio.paths import update_working_directory
+from tests.cloudio.test_cloudio_message_generic_format import create_runtime_node
+
+update_working_directory()  # Needed when: 'pipenv run python -m unittest tests/cloudio/{this_file}.py'
+
+DATA = {
+    'nodes': {'VacuumCleaner': {'objects': {}, 'implements': ['NodeInterface']}},
+    'values': [0, -1, 23, 24, 65536, 2 ** 40, -2 ** 40, 2 ** 63 - 1, 0.5, -1e300, True, False, None, 'Vacuumé'],
+    'timestamp': 1476111491.023
+}
+
+
+class TestCloudioMessageCodec(unittest.TestCase):
+    """Tests the codecs used by the message formats.
+    """
+
+    log = logging.getLogger(__name__)
+
+    def test_createCodec(self):
+        self.assertIn('cbor', available_codecs(CBOR_CODECS))
+        self.assertIn('json', available_codecs(JSON_CODECS))
+        self.assertEqual('json', create_codec(JSON_CODECS, 'json').name)
+        self.assertIn(create_codec(CBOR_CODECS).name, available_codecs(CBOR_CODECS))
+
+        with self.assertRaises(ValueError):
+            create_codec(JSON_CODECS, 'yaml')
+
+    def test_availableCodecsAreCompatible(self):
+        reference_cbor = cbor.dumps(DATA)
+        for name in available_codecs(CBOR_CODECS):
+            codec = create_codec(CBOR_CODECS, name)
+            self.assertEqual(DATA, cbor.loads(codec.dumps(DATA)), name)
+            self.assertEqual(DATA, codec.loads(reference_cbor), name)
+
+        reference_json = json.dumps(DATA)
+        for name in available_codecs(JSON_CODECS):
+            codec = create_codec(JSON_CODECS, name)
+            self.assertEqual(DATA, json.loads(codec.dumps(DATA)), name)
+            self.assertEqual(DATA, codec.loads(reference_json), name)
+
+    def test_messageFormatsWithCodecs(self):
+        node = create_runtime_node()
+        for name in available_codecs(CBOR_CODECS):
+            message_format = CborMessageFormat(create_codec(CBOR_CODECS, name))
+            self.assertEqual(cbor.loads(CborMessageFormat().serialize_node(node)),
+                             message_format.loads(message_format.serialize_node(node)))
+        for name in available_codecs(JSON_CODECS):
+            message_format = JsonMessageFormat(create_codec(JSON_CODECS, name))
+            self.assertEqual(json.loads(JsonMessageFormat(create_codec(JSON_CODECS, 'json')).serialize_node(node)),
+                             json.loads(message_format.serialize_node(node)))
+
+    def test_nonFiniteFloats(self):
+        # Encoded as null whatever codec is installed
+        data = {'values': [float('nan'), float('inf'), -float('inf'), 0.5], 'objects': {'a': (float('nan'),)}}
+        for name in available_codecs(JSON_CODECS):
+            codec = create_codec(JSON_CODECS, name)
+            self.assertEqual({'values': [None, None, None, 0.5], 'objects': {'a': [None]}},
+                             json.loads(codec.dumps(data)), name)
+            self.assertNotIn('NaN', codec.dumps({'value': float('nan'), 'big': 2 ** 70}), name)
+
+            message_format = JsonMessageFormat(codec)
+            node = create_runtime_node()
+            temperature = node.objects['Parameters'].get_object('Measures').get_attribute('temperature')
+            temperature._value = float('nan')
+            self.assertIsNone(json.loads(message_format.serialize_attribute(temperature))['value'], name)
+            self.assertIsNone(json.loads(message_format.serialize_node(node))['objects']['Parameters']['objects']
+                              ['Measures']['attributes']['temperature']['value'], name)
+
+    @unittest.skipUnless(Cbor2Codec.is_available(), 'cbor2 not installed')
+    def test_cbor2UnsignedIntegers(self):
+        # Encoded as 64 bit unsigned integer instead of bignum, decodes to the same value
+        data = create_codec(CBOR_CODECS, 'cbor2').dumps(2 ** 64 - 1)
+        self.assertEqual(2 ** 64 - 1, cbor.loads(data))
+
+    @unittest.skipUnless(OrjsonCodec.is_available(), 'orjson not installed')
+    def test_orjsonFallback(self):
+        codec = create_codec(JSON_CODECS, 'orjson')
+        self.assertEqual({'value': 2 ** 70}, json.loads(codec.dumps({'value': 2 ** 70})))
+        self.assertEqual(float('inf'), codec.loads('{"value": Infinity}')['value'])
+
+
+if __name__ == '__main__':
+    # Enable logging
+    logging.basicConfig(format='%(asctime)s.%(msecs)03d - %(name)s - %(levelname)s - %(message)s',
+                        datefmt='%Y-%m-%d %H:%M:%S',
+                        level=logging.INFO)
+
+    unittest.main()
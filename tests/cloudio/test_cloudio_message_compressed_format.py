@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import logging
+import unittest
+import zlib
+from unittest import mock
+
+from cloudio.endpoint import CloudioEndpoint
+from cloudio.endpoint.message_format.cbor_format import CborMessageFormat
+from cloudio.endpoint.message_format.compressed_format import CompressedMessageFormat
+from cloudio.endpoint.message_format.factory import MessageFormatFactory
+from cloudio.endpoint.message_format.generic_format import GenericMessageFormat
+from cloudio.endpoint.message_format.json_format import JsonMessageFormat
+from cloudio.endpoint.properties_endpoint_configuration import PropertiesEndpointConfiguration
+from cloudio.endpoint.runtime import CloudioRuntimeObject
+from tests.cloudio.paths import update_working_directory
+from tests.cloudio.test_cloudio_message_generic_format import create_runtime_node
+
+update_working_directory()  # Needed when: 'pipenv run python -m unittest tests/cloudio/{this_file}.py'
+
+
+class TestCloudioMessageFormatCompressed(unittest.TestCase):
+    """Tests the zlib envelope message format.
+    """
+
+    log = logging.getLogger(__name__)
+
+    def setUp(self):
+        self.node = create_runtime_node()
+        self.attribute = CloudioRuntimeObject().add_attribute('temperature', float, 'measure')
+        self.attribute.set_value(21.5, timestamp=1476111491023)
+
+    def test_smallMessagesNotCompressed(self):
+        message_format = CompressedMessageFormat(CborMessageFormat(), threshold=1024)
+        self.assertEqual(CborMessageFormat().serialize_attribute(self.attribute),
+                         message_format.serialize_attribute(self.attribute))
+
+    def test_compressLargeMessages(self):
+        for wrapped_format in (CborMessageFormat(), JsonMessageFormat()):
+            message_format = CompressedMessageFormat(wrapped_format, threshold=64)
+            payload = message_format.serialize_node(self.node)
+            self.assertEqual(CompressedMessageFormat.IDENTIFIER, payload[0])
+            self.assertLess(len(payload), len(wrapped_format.serialize_node(self.node)))
+
+            # Receivers find the envelope using the first byte
+            received_format = MessageFormatFactory.messageFormat(payload[0])
+            self.assertIsInstance(received_format, CompressedMessageFormat)
+            self.assertEqual(GenericMessageFormat().serialize_node(self.node), received_format.loads(payload))
+
+    def test_deserializeCompressedAttribute(self):
+        payload = zlib.compress(json.dumps({'timestamp': 1476111492.0, 'value': 22.5}).encode('utf-8'))
+        MessageFormatFactory.messageFormat(payload[0]).deserialize_attribute(payload, self.attribute)
+        self.assertEqual(22.5, self.attribute.get_value())
+
+    def test_inflateLimit(self):
+        payload = zlib.compress(b'{' + b' ' * 4096 + b'}')
+        with mock.patch.object(CompressedMessageFormat, 'MAX_INFLATED_SIZE', 1024):
+            with self.assertRaises(IOError):
+                CompressedMessageFormat().loads(payload)
+        self.assertEqual({}, CompressedMessageFormat().loads(payload))
+
+    def test_supportedFormats(self):
+        # Compression is opt-in, the cloud side may not be able to decode it
+        self.assertNotIn('ZLIB', MessageFormatFactory.supported_formats())
+
+        properties = {'ch.hevs.cloudio.endpoint.hostUri': '127.0.0.1',
+                      'ch.hevs.cloudio.endpoint.persistence': 'none'}
+        compressed = CloudioEndpoint('compressed', configuration=PropertiesEndpointConfiguration(
+            dict(properties, **{'ch.hevs.cloudio.endpoint.compressionThreshold': '1024'})))
+        plain = CloudioEndpoint('plain', configuration=PropertiesEndpointConfiguration(properties))
+        compressed.close()
+        plain.close()
+
+        # Each endpoint announces the formats it uses, whatever the order the endpoints were created in
+        for endpoint, expected in ((compressed, ['JSON', 'CBOR', 'ZLIB']), (plain, ['JSON', 'CBOR'])):
+            self.assertEqual(expected, endpoint.get_supported_formats())
+            self.assertEqual(expected, GenericMessageFormat().serialize_endpoint(endpoint)['supportedFormats'])
+            payload = endpoint._structure_cache.serialize_endpoint(endpoint)
+            received_format = MessageFormatFactory.messageFormat(payload[0])
+            self.assertEqual(expected, received_format.loads(payload)['supportedFormats'])
+        self.assertEqual(['JSON', 'CBOR'], MessageFormatFactory.supported_formats())
+
+        # Received compressed messages are decoded anyway
+        self.assertIsInstance(MessageFormatFactory.messageFormat(CompressedMessageFormat.IDENTIFIER),
+                              CompressedMessageFormat)
+
+
+if __name__ == '__main__':
+    # Enable logging
+    logging.basicConfig(format='%(asctime)s.%(msecs)03d - %(name)s - %(levelname)s - %(message)s',
+                        datefmt='%Y-%m-%d %H:%M:%S',
+                        level=logging.INFO)
+
+    unittest.main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+import unittest
+
+from cloudio.endpoint import CloudioEndpoint
+from cloudio.endpoint.interface import CloudioMessageFormat
+from cloudio.endpoint.message_format.cbor_format import CborMessageFormat
+from cloudio.endpoint.message_format.factory import MessageFormatFactory
+from cloudio.endpoint.message_format.generic_format import GenericMessageFormat
+from cloudio.endpoint.message_format.json_format import JsonMessageFormat
+from cloudio.endpoint.message_format.msgpack_format import MessagePackMessageFormat
+from cloudio.endpoint.properties_endpoint_configuration import PropertiesEndpointConfiguration
+from cloudio.endpoint.runtime import CloudioRuntimeObject
+from tests.cloudio.paths import update_working_directory
+from tests.cloudio.test_cloudio_message_generic_format import create_runtime_node
+
+update_working_directory()  # Needed when: 'pipenv run python -m unittest tests/cloudio/{this_file}.py'
+
+
+class _Endpoint(object):
+    def __init__(self, nodes):
+        self.nodes = nodes
+
+
+class _TestMessageFormat(CloudioMessageFormat):
+    pass
+
+
+class TestCloudioMessageFormatFactory(unittest.TestCase):
+    """Tests the registry of message formats.
+    """
+
+    log = logging.getLogger(__name__)
+
+    def test_messageFormat(self):
+        self.assertIsInstance(MessageFormatFactory.messageFormat(ord('{')), JsonMessageFormat)
+        self.assertIsInstance(MessageFormatFactory.messageFormat(0xa4), CborMessageFormat)
+        self.assertIs(MessageFormatFactory.messageFormat(0xa4), MessageFormatFactory.messageFormat(0xa3))
+        self.assertIs(MessageFormatFactory.messageFormat(0xa4), MessageFormatFactory.messageFormatByName('cbor'))
+        self.assertIsNone(MessageFormatFactory.messageFormat(0x00))
+        self.assertIsNone(MessageFormatFactory.messageFormatByName('yaml'))
+
+    def test_register(self):
+        with self.assertRaises(ValueError):
+            MessageFormatFactory.register('TEST', _TestMessageFormat, (ord('{'),))
+        self.assertNotIn('TEST', MessageFormatFactory.supported_formats())
+
+    def test_supportedFormats(self):
+        # MessagePack and compression are announced only by the endpoints using them
+        supported_formats = MessageFormatFactory.supported_formats()
+        self.assertEqual(['JSON', 'CBOR'], supported_formats)
+        self.assertEqual(['JSON', 'CBOR'] + (['MSGPACK'] if MessagePackMessageFormat.is_available() else []),
+                         MessageFormatFactory.supported_formats(['MSGPACK']))
+
+        data = GenericMessageFormat().serialize_endpoint(_Endpoint({}))
+        self.assertEqual(supported_formats, data['supportedFormats'])
+        self.assertEqual(supported_formats, CborMessageFormat().loads(
+            CborMessageFormat().serialize_endpoint(_Endpoint({})))['supportedFormats'])
+
+    @unittest.skipUnless(MessagePackMessageFormat.is_available(), 'msgpack not installed')
+    def test_messagePackAnnouncedIfUsed(self):
+        properties = {'ch.hevs.cloudio.endpoint.hostUri': '127.0.0.1',
+                      'ch.hevs.cloudio.endpoint.persistence': 'none'}
+        endpoint = CloudioEndpoint('test-endpoint', configuration=PropertiesEndpointConfiguration(
+            dict(properties, **{'ch.hevs.cloudio.endpoint.messageFormat': 'msgpack'})))
+        endpoint.close()
+        self.assertEqual(['JSON', 'CBOR', 'MSGPACK'], endpoint.get_supported_formats())
+        self.assertEqual(['JSON', 'CBOR'], MessageFormatFactory.supported_formats())
+
+    @unittest.skipUnless(MessagePackMessageFormat.is_available(), 'msgpack not installed')
+    def test_messagePack(self):
+        generic_format = GenericMessageFormat()
+        message_format = MessageFormatFactory.messageFormatByName('msgpack')
+
+        node = create_runtime_node()
+        self.assertEqual(generic_format.serialize_node(node), message_format.loads(message_format.serialize_node(node)))
+
+        attribute = CloudioRuntimeObject().add_attribute('temperature', float, 'measure')
+        attribute.set_value(21.5, timestamp=1476111491023)
+        payload = message_format.serialize_attribute(attribute)
+        self.assertIs(message_format, MessageFormatFactory.messageFormat(payload[0]))
+        self.assertEqual(generic_format.serialize_attribute(attribute), message_format.loads(payload))
+
+        # Update from the cloud
+        message_format.deserialize_attribute(message_format.dumps({'timestamp': 1476111492.0, 'value': 22.5}),
+                                             attribute)
+        self.assertEqual(22.5, attribute.get_value())
+
+
+if __name__ == '__main__':
+    # Enable logging
+    logging.basicConfig(format='%(asctime)s.%(msecs)03d - %(name)s - %(levelname)s - %(message)s',
+                        datefmt='%Y-%m-%d %H:%M:%S',
+                        level=logging.INFO)
+
+    unittest.main()
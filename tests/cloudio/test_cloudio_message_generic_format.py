@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import logging
+import unittest
+
+from cloudio.endpoint.message_format.cbor_format import CborMessageFormat
+from cloudio.endpoint.message_format.generic_format import GenericMessageFormat, _GenericMessageEncoder
+from cloudio.endpoint.node import CloudioNode
+from cloudio.endpoint.object import CloudioObject
+from cloudio.endpoint.runtime import CloudioRuntimeNode, CloudioRuntimeObject
+from tests.cloudio.paths import update_working_directory
+
+update_working_directory()  # Needed when: 'pipenv run python -m unittest tests/cloudio/{this_file}.py'
+
+
+class _Endpoint(object):
+    def __init__(self, nodes):
+        self.nodes = nodes
+
+
+class StaticNode(CloudioNode):
+    """A node using a static model.
+    """
+    def __init__(self):
+        super(StaticNode, self).__init__()
+        self.serial_number = 'SN-1234'
+
+
+class StaticObject(CloudioObject):
+    """An object using static attributes.
+    """
+    enabled = True
+    ratio = 0.5
+
+    def __init__(self):
+        super(StaticObject, self).__init__()
+        self.count = 3
+
+
+# Static model of test_staticModelPayloadUnchanged() as published by version 1.1.1 (CBOR)
+STATIC_MODEL_CBOR = bytes.fromhex(
+    'a46a696e746572666163657380646e616d6566537461746963676f626a65637473a1664f626a656374a4695f696e7465726e'
+    '616ca368636f6e666f726d73f6676f626a65637473a06a61747472696275746573a378223c6e6f20706172656e743e2f3c6e'
+    '6f206e616d653e2f4f626a6563742f636f756e74a3647479706567496e74656765726576616c7565036a636f6e7374726169'
+    '6e746653746174696378243c6e6f20706172656e743e2f3c6e6f206e616d653e2f4f626a6563742f656e61626c6564a36474'
+    '79706567426f6f6c65616e6576616c7565f56a636f6e73747261696e746653746174696378223c6e6f20706172656e743e2f'
+    '3c6e6f206e616d653e2f4f626a6563742f726174696fa36474797065664e756d6265726576616c7565fb3fe0000000000000'
+    '6a636f6e73747261696e746653746174696365636f756e740367656e61626c6564f565726174696ffb3fe00000000000006d'
+    '73657269616c5f6e756d62657267534e2d31323334')
+
+def create_runtime_node(name='VacuumCleaner'):
+    node = CloudioRuntimeNode()
+    node.declare_implemented_interface('NodeInterface')
+    if name:
+        node.set_name(name)
+
+    parameters = node.add_object('Parameters', CloudioRuntimeObject)
+    parameters.add_attribute('power', bool, 'parameter')
+    parameters.add_attribute('throughput', int, 'setpoint', initial_value=4)
+    parameters.add_attribute('name', str, 'static', initial_value='Vacuum')
+    parameters.add_attribute('unset', float)
+
+    measures = CloudioRuntimeObject()
+    measures._internal.set_conforms('Measures')
+    parameters.add_object('Measures', measures)
+    measures.add_attribute('temperature', float, 'measure', initial_value=21.5)
+    return node
+
+
+class TestCloudioMessageFormatGeneric(unittest.TestCase):
+    """Tests the python dict representation of the endpoint model.
+    """
+
+    log = logging.getLogger(__name__)
+
+    def setUp(self):
+        self.message_format = GenericMessageFormat()
+
+    @staticmethod
+    def _reflect(item):
+        # Representation built by the generic (reflection based) encoder
+        return json.loads(_GenericMessageEncoder().encode(item))
+
+    def test_serializeNode(self):
+        node = create_runtime_node()
+        data = self.message_format.serialize_node(node)
+
+        self.assertEqual(self._reflect(node), data)
+        self.assertEqual(['NodeInterface'], data['implements'])
+        measures = data['objects']['Parameters']['objects']['Measures']
+        self.assertEqual('Measures', measures['conforms'])
+        self.assertEqual({'type': 'Number', 'value': 21.5, 'constraint': 'Measure'},
+                         measures['attributes']['temperature'])
+
+    def test_serializeEmptyNode(self):
+        node = CloudioRuntimeNode()
+        node.set_name('Empty')
+        self.assertEqual({'implements': []}, self.message_format.serialize_node(node))
+
+    def test_serializeEndpoint(self):
+        node = create_runtime_node()
+        endpoint = _Endpoint({'VacuumCleaner': node})
+
+        data = self.message_format.serialize_endpoint(endpoint)
+        self.assertEqual(self._reflect(node), data['nodes']['VacuumCleaner'])
+        self.assertEqual(2, data['messageFormatVersion'])
+
+    def test_serializeStaticModel(self):
+        node = StaticNode()
+        node.set_name('Static')
+        node.objects['Object'] = CloudioObject()
+
+        # Classes without explicit serializer are reflected
+        self.assertEqual(self._reflect(node), self.message_format.serialize_node(node))
+
+        runtime_node = CloudioRuntimeNode()
+        runtime_node.set_name('Mixed')
+        runtime_node.add_object('Object', CloudioObject)
+        self.assertEqual(self._reflect(runtime_node), self.message_format.serialize_node(runtime_node))
+
+    def test_staticModelPayloadUnchanged(self):
+        node = StaticNode()
+        node.set_name('Static')
+        static_object = StaticObject()
+        static_object.set_name('Object')
+        node.objects['Object'] = static_object
+        static_object.get_attributes()
+
+        # The bookkeeping of the classes is not published
+        data = self.message_format.serialize_node(node)
+        self.assertEqual(['interfaces', 'name', 'objects', 'serial_number'], sorted(data))
+        self.assertEqual(['_internal', 'count', 'enabled', 'ratio'], sorted(data['objects']['Object']))
+        self.assertEqual(STATIC_MODEL_CBOR, CborMessageFormat().serialize_node(node))
+
+
+if __name__ == '__main__':
+    # Enable logging
+    logging.basicConfig(format='%(asctime)s.%(msecs)03d - %(name)s - %(levelname)s - %(message)s',
+                        datefmt='%Y-%m-%d %H:%M:%S',
+                        level=logging.INFO)
+
+    unittest.main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+import os
+import shutil
+import unittest
+
+from cloudio.common.utils import path_helpers
+from cloudio.endpoint.persistence import MessageJournal
+from tests.cloudio.paths import update_working_directory
+
+update_working_directory()  # Needed when: 'pipenv run python -m unittest tests/cloudio/{this_file}.py'
+
+TEST_JOURNAL_DIRECTORY = path_helpers.prettify('~/mqtt-test-journal')
+
+
+class TestCloudioMessageJournal(unittest.TestCase):
+    """Tests the journal of queued and in-flight messages.
+    """
+
+    log = logging.getLogger(__name__)
+
+    def setUp(self):
+        self.topic = '@update/test-journal/VacuumCleaner/Parameters/set_throughput'
+
+    def tearDown(self):
+        shutil.rmtree(TEST_JOURNAL_DIRECTORY, ignore_errors=True)
+
+    def _open_journal(self):
+        journal = MessageJournal(TEST_JOURNAL_DIRECTORY)
+        recovered = journal.open('journal-client', 'mqtt-test-server')
+        return journal, recovered
+
+    def test_recoverPendingMessages(self):
+        journal, recovered = self._open_journal()
+        self.assertEqual(0, len(recovered))
+
+        first_id = journal.append(self.topic, b'\xa2\x01\x02', 1476111491023, 1, False)
+        second_id = journal.append(self.topic, '{"value": 2}', 1476111491024, 1, False)
+        journal.append('@nodeAdded/test-journal/VacuumCleaner', b'\xa0', 1476111491025, 1, True)
+        journal.discard(second_id)
+        journal.commit()
+
+        # Simulate a crash: Do not close the journal
+        journal, recovered = self._open_journal()
+        self.assertEqual(2, len(recovered))
+
+        (journal_id, topic, payload, timestamp, qos, retain) = recovered[0]
+        self.assertEqual(first_id, journal_id)
+        self.assertEqual(self.topic, topic)
+        self.assertEqual(b'\xa2\x01\x02', payload)
+        self.assertEqual(1476111491023, timestamp)  # Original timestamp is kept
+        self.assertEqual(1, qos)
+        self.assertFalse(retain)
+        self.assertTrue(recovered[1][5])
+
+        # New messages must not reuse journal ids of recovered messages
+        self.assertTrue(journal.append(self.topic, '{"value": 3}', 1476111491026, 1, False) > recovered[1][0])
+        journal.close()
+
+    def test_uncommittedRecordsAreNotRecovered(self):
+        journal, recovered = self._open_journal()
+        journal.append(self.topic, '{"value": 1}', 1476111491023, 1, False)
+
+        journal, recovered = self._open_journal()
+        self.assertEqual(0, len(recovered))
+
+    def test_journalTruncatedWhenEmpty(self):
+        journal, recovered = self._open_journal()
+        journal_ids = [journal.append(self.topic, '{"value": %d}' % index, 1476111491023 + index, 1, False)
+                       for index in range(10)]
+        journal.commit()
+        for journal_id in journal_ids:
+            journal.discard(journal_id)
+        journal.commit()
+
+        self.assertEqual(0, journal.pending_count())
+        self.assertEqual(0, os.path.getsize(journal._file_name))
+        journal.close()
+
+    def test_tornWrite(self):
+        journal, recovered = self._open_journal()
+        journal.append(self.topic, '{"value": 1}', 1476111491023, 1, False)
+        journal.append(self.topic, '{"value": 2}', 1476111491024, 1, False)
+        journal.close()
+
+        # Cut the last record in the middle
+        with open(journal._file_name, mode='r+b') as journal_file:
+            journal_file.truncate(os.path.getsize(journal._file_name) - 3)
+
+        journal, recovered = self._open_journal()
+        self.assertEqual(1, len(recovered))
+        self.assertEqual('{"value": 1}', recovered[0][2])
+        journal.close()
+
+
+if __name__ == '__main__':
+    # Enable logging
+    logging.basicConfig(format='%(asctime)s.%(msecs)03d - %(name)s - %(levelname)s - %(message)s',
+                        datefmt='%Y-%m-%d %H:%M:%S',
+                        level=logging.INFO)
+
+    unittest.main()
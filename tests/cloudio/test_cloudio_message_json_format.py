@@ -42,6 +42,26 @@ class TestCloudioMessageFormatJson(unittest.TestCase):
             # Deserialize to float
             m_format.deserialize_attribute(data, attribute_float)
 
+    def test_serialize_attribute(self):
+        from cloudio.endpoint.message_format.codec import dumps_json
+        from cloudio.endpoint.message_format.generic_format import GenericMessageFormat
+        from cloudio.endpoint.message_format.json_format import JsonMessageFormat
+        from cloudio.endpoint.runtime import CloudioRuntimeObject
+
+        generic_format = GenericMessageFormat()
+        m_format = JsonMessageFormat()
+
+        obj = CloudioRuntimeObject()
+        for index, (value, constraint) in enumerate([(21.5, 'measure'), (float('nan'), 'measure'), (-3, 'parameter'),
+                                                     (False, 'status'), ('"Vacuum\u00e9"\n', 'static')]):
+            attribute = obj.add_attribute('attribute%d' % index, type(value), constraint)
+            self.assertEqual(dumps_json(generic_format.serialize_attribute(attribute)),
+                             m_format.serialize_attribute(attribute))  # Without timestamp
+
+            attribute.set_value(value, timestamp=1476111491023)
+            self.assertEqual(dumps_json(generic_format.serialize_attribute(attribute)),
+                             m_format.serialize_attribute(attribute))
+
 
 if __name__ == '__main__':
     # Enable logging
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+import unittest
+
+from cloudio.endpoint.message_format.cbor_format import CborMessageFormat
+from cloudio.endpoint.message_format.factory import MessageFormatFactory
+from cloudio.endpoint.message_format.json_format import JsonMessageFormat
+from cloudio.endpoint.message_format.msgpack_format import MessagePackMessageFormat
+from cloudio.endpoint.runtime import CloudioRuntimeObject
+from tests.cloudio.paths import update_working_directory
+
+update_working_directory()  # Needed when: 'pipenv run python -m unittest tests/cloudio/{this_file}.py'
+
+
+class TestCloudioMessageLeanUpdate(unittest.TestCase):
+    """Tests the lean @update message profile.
+    """
+
+    log = logging.getLogger(__name__)
+
+    def setUp(self):
+        self.object = CloudioRuntimeObject()
+        self.message_formats = [CborMessageFormat(lean=True), JsonMessageFormat(lean=True)]
+        if MessagePackMessageFormat.is_available():
+            self.message_formats.append(MessagePackMessageFormat(lean=True))
+
+    def _add_attribute(self, name, attribute_type, value):
+        attribute = self.object.add_attribute(name, attribute_type, 'measure')
+        attribute.set_value(value, timestamp=1476111491023)
+        return attribute
+
+    def test_leanMessage(self):
+        attribute = self._add_attribute('temperature', float, 21.5)
+        for message_format in self.message_formats:
+            self.assertEqual({'t': 1476111491023, 'v': 21.5}, message_format.loads(
+                message_format.serialize_attribute(attribute)))
+
+        # Compact CBOR integer for the timestamp instead of a 64 bit float
+        payload = CborMessageFormat(lean=True).serialize_attribute(attribute)
+        self.assertEqual(b'\xa2at\x1b\x00\x00\x01\x57\xaf\x19\xdf\xcfav\xfb', payload[:15])
+        self.assertLess(len(payload) * 2, len(CborMessageFormat().serialize_attribute(attribute)))
+
+    def test_fixedPoint(self):
+        attribute = self._add_attribute('voltage', float, 230.12)
+        attribute.set_precision(decimals=2)
+        for message_format in self.message_formats:
+            payload = message_format.serialize_attribute(attribute)
+            self.assertEqual({'t': 1476111491023, 'v': 23012, 'd': 2}, message_format.loads(payload))
+
+        # Integer attributes are not scaled
+        attribute = self._add_attribute('counter', int, 12)
+        attribute.set_precision(decimals=2)
+        self.assertEqual({'t': 1476111491023, 'v': 12}, CborMessageFormat().loads(
+            CborMessageFormat(lean=True).serialize_attribute(attribute)))
+
+    def test_float32(self):
+        attribute = self._add_attribute('voltage', float, 230.125)
+        attribute.set_precision(float32=True)
+        payload = CborMessageFormat(lean=True).serialize_attribute(attribute)
+        self.assertIn(b'av\xfa', payload)
+        self.assertEqual(230.125, CborMessageFormat().loads(payload)['v'])
+
+        # Out of float32 range
+        attribute.set_value(1e300, timestamp=1476111491024)
+        payload = CborMessageFormat(lean=True).serialize_attribute(attribute)
+        self.assertEqual(1e300, CborMessageFormat().loads(payload)['v'])
+
+    def test_deserialize(self):
+        attribute = self._add_attribute('setpoint', float, 21.5)
+        for message_format in self.message_formats:
+            message_format.deserialize_attribute(message_format.dumps({'t': 1476111492000, 'v': 2250, 'd': 2}),
+                                                 attribute)
+            self.assertEqual(22.5, attribute.get_value())
+            self.assertEqual(1476111492000, attribute.get_timestamp())
+            attribute.set_value(21.5, timestamp=1476111491023)
+
+    def test_newMessageFormat(self):
+        message_format = MessageFormatFactory.newMessageFormat('cbor', lean=True)
+        self.assertIsInstance(message_format, CborMessageFormat)
+        self.assertIsNot(message_format, MessageFormatFactory.messageFormatByName('cbor'))
+        self.assertIsNone(MessageFormatFactory.newMessageFormat('yaml'))
+
+
+if __name__ == '__main__':
+    # Enable logging
+    logging.basicConfig(format='%(asctime)s.%(msecs)03d - %(name)s - %(levelname)s - %(message)s',
+                        datefmt='%Y-%m-%d %H:%M:%S',
+                        level=logging.INFO)
+
+    unittest.main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+import math
+import time
+import unittest
+from unittest import mock
+
+from cloudio.endpoint.message_format.cbor_format import CborMessageFormat
+from cloudio.endpoint.message_format.compressed_format import CompressedMessageFormat
+from cloudio.endpoint.message_format.factory import MessageFormatFactory
+from cloudio.endpoint.message_format.json_format import JsonMessageFormat
+from cloudio.endpoint.message_format.msgpack_format import MessagePackMessageFormat
+from cloudio.endpoint.message_format.series import encode_series, decode_series
+from cloudio.endpoint.runtime import CloudioRuntimeObject
+from tests.cloudio.paths import update_working_directory
+from tests.cloudio.test_cloudio_message_generic_format import create_runtime_node
+
+update_working_directory()  # Needed when: 'pipenv run python -m unittest tests/cloudio/{this_file}.py'
+
+
+def create_samples(count, start=1476111491023):
+    # 1 kHz signal with some jitter on the timestamps
+    return [(start + index + (2 if index % 100 == 99 else 0), round(230.0 + 10.0 * math.sin(index / 20.0), 2))
+            for index in range(count)]
+
+
+class TestCloudioMessageSeries(unittest.TestCase):
+    """Tests the compressed time series (@series) messages.
+    """
+
+    log = logging.getLogger(__name__)
+
+    def setUp(self):
+        self.attribute = CloudioRuntimeObject().add_attribute('voltage', float, 'measure')
+
+    def test_encoding(self):
+        samples = create_samples(1000)
+        self.assertEqual(samples, decode_series(encode_series(samples)))
+        self.assertEqual([], decode_series(encode_series([])))
+
+        # Special values, large and negative timestamp steps
+        samples = [(-5, 0.0), (-4, -0.0), (10 ** 12, float('inf')), (10 ** 12 - 3000, 1e300), (10 ** 12, 5e-324),
+                   (10 ** 12 + 1, 5e-324), (10 ** 12 + 2, -1.5)]
+        self.assertEqual(repr(samples), repr(decode_series(encode_series(samples))))
+
+        with self.assertRaises(IOError):
+            decode_series(encode_series(create_samples(10))[:-4])
+
+    def test_bandwidth(self):
+        samples = create_samples(1000)
+        message_format = CborMessageFormat()
+
+        update_size = 0
+        for timestamp, value in samples:
+            self.attribute.set_value(value, timestamp=timestamp)
+            update_size += len(message_format.serialize_attribute(self.attribute))
+        series_size = len(message_format.serialize_series(self.attribute, samples))
+        self.log.info('@update: %d bytes, @series: %d bytes (without topics)' % (update_size, series_size))
+        self.assertLess(series_size * 5, update_size)
+
+    def test_messageFormats(self):
+        samples = create_samples(100)
+        message_formats = [CborMessageFormat(), JsonMessageFormat(), CompressedMessageFormat(threshold=64)]
+        if MessagePackMessageFormat.is_available():
+            message_formats.append(MessagePackMessageFormat())
+
+        for message_format in message_formats:
+            payload = message_format.serialize_series(self.attribute, samples)
+            received_format = MessageFormatFactory.messageFormat(ord(payload[0]) if isinstance(payload, str)
+                                                                 else payload[0])
+            self.assertEqual(samples, received_format.deserialize_series(payload))
+            self.assertEqual('Number', message_format.loads(payload)['type'])
+
+    def test_endpoint(self):
+        from cloudio.endpoint import CloudioEndpoint
+        from cloudio.endpoint.properties_endpoint_configuration import PropertiesEndpointConfiguration
+
+        properties = {'ch.hevs.cloudio.endpoint.hostUri': '127.0.0.1',
+                      'ch.hevs.cloudio.endpoint.persistence': 'none'}
+        endpoint = CloudioEndpoint('test-endpoint', configuration=PropertiesEndpointConfiguration(properties))
+        endpoint.add_node('VacuumCleaner', create_runtime_node(name=None))
+        measures = endpoint.get_node('VacuumCleaner').objects['Parameters']._internal.objects['Measures']
+        attribute = measures.get_attribute('temperature')
+
+        with self.assertRaises(ValueError):
+            endpoint.enable_series(CloudioRuntimeObject().add_attribute('name', str, 'status'))
+
+        endpoint.enable_series(attribute, interval=3600.0, max_samples=10)
+        with mock.patch.object(endpoint, '_publish') as publish:
+            samples = create_samples(15)
+            for timestamp, value in samples:
+                attribute.set_value(value, timestamp=timestamp)
+            endpoint._process_series()  # Interval not elapsed
+            self.assertEqual(1, publish.call_count)
+
+            endpoint.disable_series(attribute)
+            attribute.set_value(21.0)
+        endpoint.close()
+
+        topics = [call[0][0] for call in publish.call_args_list]
+        self.assertEqual(['@series/test-endpoint/VacuumCleaner/Parameters/Measures/temperature'] * 2 +
+                         ['@update/test-endpoint/VacuumCleaner/Parameters/Measures/temperature'], topics)
+        self.assertEqual(samples, endpoint.message_format.deserialize_series(publish.call_args_list[0][0][1]) +
+                         endpoint.message_format.deserialize_series(publish.call_args_list[1][0][1]))
+
+    def test_endpointShortInterval(self):
+        from cloudio.endpoint import CloudioEndpoint
+        from cloudio.endpoint.properties_endpoint_configuration import PropertiesEndpointConfiguration
+
+        properties = {'ch.hevs.cloudio.endpoint.hostUri': '127.0.0.1',
+                      'ch.hevs.cloudio.endpoint.persistence': 'none'}
+        endpoint = CloudioEndpoint('test-endpoint', configuration=PropertiesEndpointConfiguration(properties))
+        endpoint.add_node('VacuumCleaner', create_runtime_node(name=None))
+        measures = endpoint.get_node('VacuumCleaner').objects['Parameters']._internal.objects['Measures']
+        attribute = measures.get_attribute('temperature')
+
+        # Interval much shorter than the control interval of the endpoint's thread
+        self.assertGreater(endpoint._control_interval_in_seconds, 1.0)
+        endpoint.enable_series(attribute, interval=0.1)
+        self.assertEqual(endpoint._control_interval_in_seconds, endpoint._series_sleep_interval())
+        with mock.patch.object(endpoint, '_publish') as publish:
+            start_time = time.monotonic()
+            attribute.set_value(21.0)
+            self.assertLessEqual(endpoint._series_sleep_interval(), 0.1)
+
+            while not publish.call_count and time.monotonic() - start_time < 2.0:
+                time.sleep(0.01)
+            elapsed = time.monotonic() - start_time
+        endpoint.close()
+
+        self.assertEqual(1, publish.call_count)
+        self.assertEqual('@series/test-endpoint/VacuumCleaner/Parameters/Measures/temperature',
+                         publish.call_args[0][0])
+        self.assertLess(elapsed, 1.0)
+
+
+if __name__ == '__main__':
+    # Enable logging
+    logging.basicConfig(format='%(asctime)s.%(msecs)03d - %(name)s - %(levelname)s - %(message)s',
+                        datefmt='%Y-%m-%d %H:%M:%S',
+                        level=logging.INFO)
+
+    unittest.main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+import unittest
+
+from cloudio.endpoint.message_format.cbor_format import CborMessageFormat
+from cloudio.endpoint.message_format.compressed_format import CompressedMessageFormat
+from cloudio.endpoint.message_format.json_format import JsonMessageFormat
+from cloudio.endpoint.message_format.structure_cache import StructureCache
+from cloudio.endpoint.runtime import CloudioRuntimeObject
+from tests.cloudio.paths import update_working_directory
+from tests.cloudio.test_cloudio_message_generic_format import StaticNode, create_runtime_node
+
+update_working_directory()  # Needed when: 'pipenv run python -m unittest tests/cloudio/{this_file}.py'
+
+
+class _Endpoint(object):
+    def __init__(self, nodes):
+        self.nodes = nodes
+
+
+class TestCloudioMessageStructureCache(unittest.TestCase):
+    """Tests the cache of the encoded @online and @nodeAdded messages.
+    """
+
+    log = logging.getLogger(__name__)
+
+    def setUp(self):
+        self.node = create_runtime_node()
+        self.endpoint = _Endpoint({'VacuumCleaner': self.node})
+        self.formats = (CborMessageFormat(), JsonMessageFormat(),
+                        CompressedMessageFormat(CborMessageFormat(), threshold=64))
+
+    def test_sameAsMessageFormat(self):
+        for message_format in self.formats:
+            cache = StructureCache(message_format)
+            for _ in range(2):
+                self.assertEqual(message_format.serialize_node(self.node), cache.serialize_node(self.node))
+                self.assertEqual(message_format.serialize_endpoint(self.endpoint),
+                                 cache.serialize_endpoint(self.endpoint))
+            self.assertEqual(1, cache.misses)
+            self.assertEqual(3, cache.hits)
+
+    def test_valuesUpdated(self):
+        message_format = CborMessageFormat()
+        cache = StructureCache(message_format)
+        cache.serialize_node(self.node)
+
+        parameters = self.node.objects['Parameters']
+        parameters.get_attribute('throughput').set_value(2 ** 40)
+        parameters.get_attribute('power').set_value(True)
+        self.assertEqual(message_format.serialize_node(self.node), cache.serialize_node(self.node))
+        self.assertEqual(1, cache.hits)
+
+        parameters.get_attribute('unset').set_value(1.5)
+        self.assertEqual(message_format.serialize_node(self.node), cache.serialize_node(self.node))
+        self.assertEqual(2, cache.hits)
+        self.assertEqual(1, cache.misses)
+
+    def test_structureChanged(self):
+        message_format = JsonMessageFormat()
+        cache = StructureCache(message_format)
+        cache.serialize_endpoint(self.endpoint)
+
+        measures = self.node.objects['Parameters']._internal.objects['Measures']
+        measures.add_attribute('humidity', float, 'measure', initial_value=40.0)
+        self.assertEqual(message_format.serialize_node(self.node), cache.serialize_node(self.node))
+
+        self.node.add_object('Status', CloudioRuntimeObject).add_attribute('error', str, 'status')
+        self.node.declare_implemented_interface('StatusInterface')
+        self.assertEqual(message_format.serialize_node(self.node), cache.serialize_node(self.node))
+        self.assertEqual(3, cache.misses)
+
+        # Adding a node changes the @online message
+        other_node = create_runtime_node('Other')
+        self.endpoint.nodes['Other'] = other_node
+        self.assertEqual(message_format.serialize_endpoint(self.endpoint), cache.serialize_endpoint(self.endpoint))
+
+    def test_announcement(self):
+        message_format = CborMessageFormat()
+        cache = StructureCache(message_format)
+        self.endpoint.nodes['Other'] = create_runtime_node('Other')
+        message = message_format.serialize_endpoint(self.endpoint)
+
+        self.assertEqual([(None, message)], list(cache.iter_announcement(self.endpoint)))
+        self.assertEqual([(None, message)], list(cache.iter_announcement(self.endpoint, max_size=len(message))))
+
+        # Too large: endpoint without nodes followed by one message per node
+        messages = list(cache.iter_announcement(self.endpoint, max_size=len(message) - 1))
+        self.assertEqual((None, message_format.serialize_endpoint(_Endpoint({}))), messages[0])
+        self.assertEqual([(node, message_format.serialize_node(node)) for node in self.endpoint.nodes.values()],
+                         messages[1:])
+
+    def test_staticModelNotCached(self):
+        message_format = CborMessageFormat()
+        cache = StructureCache(message_format)
+        node = StaticNode()
+        node.set_name('Static')
+        for _ in range(2):
+            self.assertEqual(message_format.serialize_node(node), cache.serialize_node(node))
+        self.assertEqual(0, cache.hits)
+
+
+if __name__ == '__main__':
+    # Enable logging
+    logging.basicConfig(format='%(asctime)s.%(msecs)03d - %(name)s - %(levelname)s - %(message)s',
+                        datefmt='%Y-%m-%d %H:%M:%S',
+                        level=logging.INFO)
+
+    unittest.main()
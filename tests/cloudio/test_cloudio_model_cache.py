@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from cloudio.endpoint import CloudioEndpoint
+from cloudio.endpoint.message_format.generic_format import GenericMessageFormat
+from cloudio.endpoint.properties_endpoint_configuration import PropertiesEndpointConfiguration
+from cloudio.endpoint.runtime import ModelLoader
+from cloudio.endpoint.runtime.cache import ModelCache
+from tests.cloudio.paths import update_working_directory
+from tests.cloudio.test_cloudio_model_loader import NESTED_MODEL
+
+update_working_directory()  # Needed when: 'pipenv run python -m unittest tests/cloudio/{this_file}.py'
+
+
+class TestCloudioModelCache(unittest.TestCase):
+    """Tests restoring models from the binary model cache.
+    """
+
+    log = logging.getLogger(__name__)
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.model_file = os.path.join(self.directory, 'model.xml')
+        with open(self.model_file, 'w') as model_file:
+            model_file.write(NESTED_MODEL)
+        self.cache = ModelCache()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_cache(self):
+        built = self.cache.load_nodes(self.model_file)
+        self.assertFalse(self.cache.hit)
+        self.assertTrue(os.path.isfile(self.model_file + '.cache'))
+
+        restored = self.cache.load_nodes(self.model_file)
+        self.assertTrue(self.cache.hit)
+
+        message_format = GenericMessageFormat()
+        self.assertEqual([name for name, _ in built], [name for name, _ in restored])
+        for (_, built_node), (_, restored_node) in zip(built, restored):
+            self.assertEqual(message_format.serialize_node(built_node), message_format.serialize_node(restored_node))
+
+        node = dict(restored)['VacuumCleaner']
+        self.assertEqual(['NodeInterface', 'Cleaner'], node.get_interfaces())
+        measures = node.objects['Parameters'].get_object('Measures')
+        temperature = measures.get_attribute('temperature')
+        self.assertEqual('Measures', measures._internal.get_conforms())
+        self.assertEqual(('Number', 'Measure', 21.5), (temperature.get_type_as_string(),
+                                                       temperature.get_constraint().to_string(),
+                                                       temperature.get_value()))
+        self.assertIsNotNone(temperature.get_timestamp())
+        self.assertIs(measures, temperature.get_parent())
+
+    def test_restoredModelIsLive(self):
+        self.cache.load_nodes(self.model_file)
+
+        properties = {'ch.hevs.cloudio.endpoint.hostUri': '127.0.0.1',
+                      'ch.hevs.cloudio.endpoint.persistence': 'none'}
+        endpoint = CloudioEndpoint('test-endpoint', configuration=PropertiesEndpointConfiguration(properties))
+        self.cache.load(endpoint, self.model_file)
+        self.assertTrue(self.cache.hit)
+
+        temperature = endpoint.get_registry().get('VacuumCleaner/Parameters/Measures/temperature')
+        with mock.patch.object(endpoint, '_publish') as publish:
+            temperature.set_value(22.5)
+        endpoint.close()
+        self.assertEqual('@update/test-endpoint/VacuumCleaner/Parameters/Measures/temperature',
+                         publish.call_args[0][0])
+
+    def test_invalidation(self):
+        self.cache.load_nodes(self.model_file)
+
+        # Model changed
+        with open(self.model_file, 'w') as model_file:
+            model_file.write(NESTED_MODEL.replace('Robot', 'Drone'))
+        nodes = self.cache.load_nodes(self.model_file)
+        self.assertFalse(self.cache.hit)
+        self.assertEqual(['VacuumCleaner', 'Drone'], [name for name, _ in nodes])
+
+        # Package version changed
+        with mock.patch('cloudio.endpoint.runtime.cache.__version__', '0.0.0'):
+            self.cache.load_nodes(self.model_file)
+            self.assertFalse(self.cache.hit)
+
+        # Corrupted cache
+        with open(self.model_file + '.cache', 'r+b') as cache_file:
+            cache_file.seek(-8, os.SEEK_END)
+            cache_file.truncate()
+        with mock.patch.object(ModelLoader, 'iter_nodes', wraps=ModelLoader().iter_nodes) as iter_nodes:
+            self.assertEqual(2, len(self.cache.load_nodes(self.model_file)))
+            self.assertFalse(self.cache.hit)
+            self.assertEqual(1, iter_nodes.call_count)
+
+        self.cache.load_nodes(self.model_file)
+        self.assertTrue(self.cache.hit)
+
+
+if __name__ == '__main__':
+    # Enable logging
+    logging.basicConfig(format='%(asctime)s.%(msecs)03d - %(name)s - %(levelname)s - %(message)s',
+                        datefmt='%Y-%m-%d %H:%M:%S',
+                        level=logging.INFO)
+
+    unittest.main()
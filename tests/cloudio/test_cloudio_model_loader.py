@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import logging
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from cloudio.endpoint.message_format.generic_format import GenericMessageFormat
+from cloudio.endpoint.runtime import ModelLoader
+from cloudio.endpoint.runtime import loader
+from tests.cloudio.paths import update_working_directory
+from tests.cloudio.test_cloudio_message_generic_format import create_runtime_node
+
+update_working_directory()  # Needed when: 'pipenv run python -m unittest tests/cloudio/{this_file}.py'
+
+NESTED_MODEL = """<configs>
+    <config deviceId="TheVacuumCleaner">
+        <deviceType typeId="VacuumCleaner" implements="NodeInterface, Cleaner">
+            <object id="Parameters">
+                <attribute id="power" template="Boolean" constraint="Parameter" value="true"/>
+                <attribute id="throughput" template="Integer" constraint="SetPoint" value="4"/>
+                <object id="Measures" conforms="Measures">
+                    <attribute id="temperature" template="Double" constraint="Measure" value="21.5"/>
+                </object>
+            </object>
+        </deviceType>
+        <deviceType typeId="Robot">
+            <object id="Status">
+                <attribute id="name" template="String" constraint="Status"/>
+            </object>
+        </deviceType>
+    </config>
+</configs>
+"""
+
+
+class TestCloudioModelLoader(unittest.TestCase):
+    """Tests loading runtime nodes from model files.
+    """
+
+    log = logging.getLogger(__name__)
+
+    def setUp(self):
+        self.loader = ModelLoader()
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _write(self, file_name, content):
+        path = os.path.join(self.directory.name, file_name)
+        with open(path, 'w') as model_file:
+            model_file.write(content)
+        return path
+
+    def test_vacuumCleanerModel(self):
+        nodes = dict(self.loader.iter_nodes('../config/vacuum-cleaner-model.xml'))
+        self.assertEqual(['VacuumCleanerEndpoint'], list(nodes))
+
+        status = nodes['VacuumCleanerEndpoint'].objects['Status']
+        self.assertEqual(['identification', 'isPoweredOn', 'operatingMode', 'throughput'],
+                         sorted(status.get_attributes()))
+        self.assertEqual('Number', status.get_attribute('throughput').get_type_as_string())
+        self.assertEqual('Measure', status.get_attribute('throughput').get_constraint().to_string())
+        self.assertEqual((1, 8), (self.loader.node_count, self.loader.attribute_count))
+
+    def test_xmlModel(self):
+        nodes = dict(self.loader.iter_nodes(self._write('model.xml', NESTED_MODEL)))
+        self.assertEqual(['VacuumCleaner', 'Robot'], list(nodes))
+        self.assertEqual(['NodeInterface', 'Cleaner'], nodes['VacuumCleaner'].get_interfaces())
+
+        parameters = nodes['VacuumCleaner'].objects['Parameters']
+        self.assertIs(True, parameters.get_attribute('power').get_value())
+        self.assertEqual(4, parameters.get_attribute('throughput').get_value())
+        measures = parameters.get_object('Measures')
+        self.assertEqual('Measures', measures._internal.get_conforms())
+        self.assertEqual(21.5, measures.get_attribute('temperature').get_value())
+        self.assertEqual(4, self.loader.attribute_count)
+        self.assertGreater(self.loader.load_time, 0.0)
+
+        with self.assertRaises(ValueError):
+            list(self.loader.iter_nodes(self._write('bad.xml', NESTED_MODEL.replace('Double', 'Complex'))))
+
+    def _check_json_model(self):
+        message_format = GenericMessageFormat()
+        node = create_runtime_node()
+        model = {'nodes': {'VacuumCleaner': message_format.serialize_node(node)}}
+
+        nodes = dict(self.loader.iter_nodes(self._write('model.json', json.dumps(model))))
+        self.assertEqual(message_format.serialize_node(node), message_format.serialize_node(nodes['VacuumCleaner']))
+        self.assertEqual(5, self.loader.attribute_count)
+
+    def test_jsonModel(self):
+        with mock.patch.object(loader, 'ijson', None):
+            self._check_json_model()
+
+    @unittest.skipUnless(ModelLoader.is_incremental_json_available(), 'Needs ijson')
+    def test_jsonModelIncremental(self):
+        self._check_json_model()
+
+
+if __name__ == '__main__':
+    # Enable logging
+    logging.basicConfig(format='%(asctime)s.%(msecs)03d - %(name)s - %(levelname)s - %(message)s',
+                        datefmt='%Y-%m-%d %H:%M:%S',
+                        level=logging.INFO)
+
+    unittest.main()
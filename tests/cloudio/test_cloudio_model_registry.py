@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+import unittest
+from unittest import mock
+
+from cloudio.endpoint import CloudioEndpoint
+from cloudio.endpoint.attribute import Measure
+from cloudio.endpoint.object import CloudioObject
+from cloudio.endpoint.properties_endpoint_configuration import PropertiesEndpointConfiguration
+from cloudio.endpoint.registry import ModelRegistry
+from cloudio.endpoint.runtime import CloudioRuntimeObject
+from tests.cloudio.paths import update_working_directory
+from tests.cloudio.test_cloudio_message_generic_format import create_runtime_node
+
+update_working_directory()  # Needed when: 'pipenv run python -m unittest tests/cloudio/{this_file}.py'
+
+
+class _Sensor(CloudioObject):
+    location = 'Sion'
+    temperature = Measure(float)
+
+
+class _NodeContainer(object):
+    # Stand-in for the endpoint. Nodes not attached to an endpoint can still be modified
+    def __init__(self, **nodes):
+        self.nodes = nodes
+
+
+class TestCloudioModelRegistry(unittest.TestCase):
+    """Tests the path index of the endpoint model.
+    """
+
+    log = logging.getLogger(__name__)
+
+    def setUp(self):
+        self.container = _NodeContainer(VacuumCleaner=create_runtime_node(), Robot=create_runtime_node('Robot'))
+        self.registry = ModelRegistry(self.container)
+
+    def test_get(self):
+        node = self.container.nodes['VacuumCleaner']
+        self.assertIs(node, self.registry.get('VacuumCleaner'))
+        self.assertIs(node.objects['Parameters'], self.registry.get('VacuumCleaner/Parameters'))
+        self.assertEqual(21.5, self.registry.get('VacuumCleaner/Parameters/Measures/temperature').get_value())
+        self.assertIsNone(self.registry.get('VacuumCleaner/Parameters/missing'))
+        self.assertIsNone(self.registry.get('Missing/Parameters'))
+
+    def test_prefixQueries(self):
+        self.assertEqual(['Robot/Parameters/Measures/temperature',
+                          'Robot/Parameters/name',
+                          'Robot/Parameters/power',
+                          'Robot/Parameters/throughput',
+                          'Robot/Parameters/unset',
+                          'VacuumCleaner/Parameters/Measures/temperature'],
+                         [path for path, _ in self.registry.iter_attributes()][:6])
+        self.assertEqual(['VacuumCleaner/Parameters/Measures', 'VacuumCleaner/Parameters/Measures/temperature'],
+                         [path for path, _ in self.registry.iter_elements('VacuumCleaner/Parameters/Measures/')])
+        self.assertEqual(10, self.registry.count_attributes())
+        self.assertEqual(5, self.registry.count_attributes('Robot'))
+        self.assertEqual(0, self.registry.count_attributes('Robot/Param'))
+
+        self.assertEqual(['VacuumCleaner/Parameters/Measures/temperature'],
+                         [path for path, _ in self.registry.iter_attributes('VacuumCleaner', constraint='measure')])
+        self.assertEqual(2, self.registry.count_attributes(constraint='Static'))
+
+    def test_structureChanges(self):
+        self.assertEqual(5, self.registry.count_attributes('VacuumCleaner'))
+
+        node = self.container.nodes['VacuumCleaner']
+        settings = node.add_object('Settings', CloudioRuntimeObject)
+        settings.add_attribute('speed', int, 'setpoint')
+        self.assertEqual(6, self.registry.count_attributes('VacuumCleaner'))
+        self.assertEqual('speed', self.registry.get('VacuumCleaner/Settings/speed').get_name())
+
+        del self.container.nodes['Robot']
+        self.assertIsNone(self.registry.get('Robot'))
+        self.assertEqual(6, self.registry.count_attributes())
+
+    def test_incrementalUpdates(self):
+        node = self.container.nodes['VacuumCleaner']
+        self.registry.get('VacuumCleaner')
+
+        with mock.patch.object(ModelRegistry, '_build_node_index', wraps=ModelRegistry._build_node_index) as build:
+            settings = node.add_object('Settings', CloudioRuntimeObject)
+            for index in range(100):
+                settings.add_attribute('speed%d' % index, int, 'setpoint')
+                self.assertIsNotNone(self.registry.get('VacuumCleaner/Settings/speed%d' % index))
+
+            # Several additions between two queries, objects added with their content
+            nested = CloudioRuntimeObject()
+            nested.add_attribute('a', float)
+            settings.add_object('Nested', nested)
+            node.objects['Parameters'].add_attribute('added', bool)
+            self.assertIsNotNone(self.registry.get('VacuumCleaner/Settings/Nested/a'))
+            build.assert_not_called()
+
+            # Other changes
+            node.declare_implemented_interface('Cleaner')
+            self.assertEqual(107, self.registry.count_attributes('VacuumCleaner'))
+            self.assertEqual(1, build.call_count)
+
+        # Same as a freshly built index
+        self.assertEqual(list(ModelRegistry(self.container).iter_elements()), list(self.registry.iter_elements()))
+
+    def test_staticObjects(self):
+        node = self.container.nodes['Robot']
+        static_object = node.add_object('Static', _Sensor)
+
+        # Listing the static attributes while indexing changes the structure version
+        with mock.patch.object(ModelRegistry, '_build_node_index', wraps=ModelRegistry._build_node_index) as build:
+            self.assertEqual(7, self.registry.count_attributes('Robot'))
+            self.assertEqual(7, self.registry.count_attributes('Robot'))
+            self.assertEqual(1, build.call_count)
+        self.assertEqual('Sion', self.registry.get('Robot/Static/location').get_value())
+
+    def test_endpoint(self):
+        properties = {'ch.hevs.cloudio.endpoint.hostUri': '127.0.0.1',
+                      'ch.hevs.cloudio.endpoint.persistence': 'none'}
+        endpoint = CloudioEndpoint('test-endpoint', configuration=PropertiesEndpointConfiguration(properties))
+        endpoint.add_node('VacuumCleaner', create_runtime_node(name=None))
+
+        attributes = endpoint.iter_attributes('VacuumCleaner/Parameters', constraint='setpoint')
+        self.assertEqual([('VacuumCleaner/Parameters/throughput', 4)],
+                         [(path, attribute.get_value()) for path, attribute in attributes])
+        # Paths are the topics without the endpoint
+        attribute = endpoint.get_registry().get('VacuumCleaner/Parameters/throughput')
+        self.assertEqual('test-endpoint/VacuumCleaner/Parameters/throughput', attribute.get_uuid().to_string())
+        endpoint.close()
+
+
+if __name__ == '__main__':
+    # Enable logging
+    logging.basicConfig(format='%(asctime)s.%(msecs)03d - %(name)s - %(levelname)s - %(message)s',
+                        datefmt='%Y-%m-%d %H:%M:%S',
+                        level=logging.INFO)
+
+    unittest.main()
@@ -3,8 +3,22 @@
 
 import logging
 import unittest
+from unittest import mock
+
+from cloudio.endpoint import CloudioEndpoint
+from cloudio.endpoint.attribute import Measure, SetPoint, Status
+from cloudio.endpoint.exception.invalid_cloudio_attribute_exception import InvalidCloudioAttributeException
+from cloudio.endpoint.message_format.cbor_format import CborMessageFormat
+from cloudio.endpoint.message_format.compressed_format import CompressedMessageFormat
+from cloudio.endpoint.message_format.generic_format import GenericMessageFormat
+from cloudio.endpoint.message_format.json_format import JsonMessageFormat
+from cloudio.endpoint.message_format.msgpack_format import MessagePackMessageFormat
+from cloudio.endpoint.message_format.structure_cache import StructureCache
 from cloudio.endpoint.object import CloudioObject
+from cloudio.endpoint.properties_endpoint_configuration import PropertiesEndpointConfiguration
+from cloudio.endpoint.runtime import CloudioRuntimeNode
 from tests.cloudio.paths import update_working_directory
+from tests.cloudio.test_cloudio_message_generic_format import StaticNode
 
 update_working_directory()  # Needed when: 'pipenv run python -m unittest tests/cloudio/{this_file}.py'
 
@@ -23,6 +37,16 @@ class CloudObjectSpec(CloudioObject):
         CloudioObject.__init__(self)
 
 
+class Room(CloudioObject):
+    """A class declaring its attributes using descriptors.
+    """
+    location = 'Sion'
+    temperature = Measure(float)
+    set_point = SetPoint(float, initial_value=21.0)
+    occupied = Status(bool)
+    label = Status(str)
+
+
 class TestCloudioObject(unittest.TestCase):
 
     def test_objectCreation(self):
@@ -34,6 +58,103 @@ class TestCloudioObject(unittest.TestCase):
         attributes = co._internal.get_attributes()
         self.assertTrue(len(attributes) > 0)
 
+    def test_staticAttributeSchema(self):
+        # Computed once per class, methods, objects and dunders excluded
+        self.assertEqual(('b', 'f'), CloudObjectSpec._static_attribute_names)
+
+        co = CloudObjectSpec()
+        co.a = 3  # Assigned to the instance
+        co.b = False  # Fields without value are not published
+        co.set_name('spec')
+        with mock.patch('cloudio.endpoint.object.object.dir', create=True) as dir_mock:
+            attributes = co.get_attributes()
+            dir_mock.assert_not_called()
+
+        # Keyed by topic, as published in the @online message
+        self.assertEqual(['<no parent>/<no name>/spec/a', '<no parent>/<no name>/spec/f'], sorted(attributes))
+        f = attributes['<no parent>/<no name>/spec/f']
+        self.assertEqual(('f', 1.1), (f.get_name(), f.get_value()))
+        self.assertEqual('Number', f.get_type_as_string())
+        self.assertEqual('Static', f.get_constraint().to_string())
+
+    def test_attributeDescriptors(self):
+        self.assertEqual(('location',), Room._static_attribute_names)
+        self.assertEqual(['label', 'occupied', 'set_point', 'temperature'],
+                         [descriptor.name for descriptor in Room._attribute_descriptors])
+
+        room = Room()
+        other_room = Room()
+        room.set_name('room')
+        attributes = room.get_attributes()
+        self.assertEqual(['label', 'location', 'occupied', 'set_point', 'temperature'], sorted(attributes))
+        self.assertEqual('Measure', attributes['temperature'].get_constraint().to_string())
+        self.assertEqual('Number', attributes['temperature'].get_type_as_string())
+        self.assertEqual(21.0, room.set_point)
+
+        room.temperature = 22
+        self.assertEqual(22.0, room.temperature)
+        self.assertIsInstance(room.temperature, float)
+        self.assertIsNotNone(attributes['temperature'].get_timestamp())
+        self.assertIs(attributes['temperature'], Room.temperature.get_attribute(room))
+        self.assertEqual(0.0, other_room.temperature)
+
+        room.occupied = 1
+        self.assertIs(True, room.occupied)
+        with self.assertRaises(TypeError):
+            room.label = 12
+
+        # Values changed from the cloud are seen through the field
+        self.assertTrue(attributes['set_point'].set_value_from_cloud(19.5, attributes['set_point'].get_timestamp() + 1))
+        self.assertEqual(19.5, room.set_point)
+
+        with self.assertRaises(InvalidCloudioAttributeException):
+            Measure(dict)
+
+    def test_attributeDescriptorUpdates(self):
+        properties = {'ch.hevs.cloudio.endpoint.hostUri': '127.0.0.1',
+                      'ch.hevs.cloudio.endpoint.persistence': 'none'}
+        endpoint = CloudioEndpoint('test-endpoint', configuration=PropertiesEndpointConfiguration(properties))
+        node = CloudioRuntimeNode()
+        room = node.add_object('Room', Room)
+        endpoint.add_node('Building', node)
+
+        with mock.patch.object(endpoint, '_publish') as publish:
+            room.temperature = 23.5
+        endpoint.close()
+
+        topic, payload = publish.call_args[0][:2]
+        self.assertEqual('@update/test-endpoint/Building/Room/temperature', topic)
+        self.assertEqual(23.5, endpoint.message_format.loads(payload)['value'])
+
+    def test_attributeDescriptorSerialization(self):
+        node = CloudioRuntimeNode()
+        node.set_name('Building')
+        room = node.add_object('Room', Room)
+        room.temperature = 22.5
+        static_node = StaticNode()
+        static_node.set_name('Static')
+        static_node.objects['Room'] = Room()
+
+        # Only conforms, objects and attributes, the fields and descriptors of the class are not published
+        expected = {'conforms': None, 'objects': {},
+                    'attributes': {'label': {'type': 'String', 'value': '', 'constraint': 'Status'},
+                                   'location': {'type': 'String', 'value': 'Sion', 'constraint': 'Static'},
+                                   'occupied': {'type': 'Boolean', 'value': False, 'constraint': 'Status'},
+                                   'set_point': {'type': 'Number', 'value': 21.0, 'constraint': 'SetPoint'},
+                                   'temperature': {'type': 'Number', 'value': 22.5, 'constraint': 'Measure'}}}
+        self.assertEqual(expected, GenericMessageFormat().serialize_node(node)['objects']['Room'])
+        expected['attributes']['temperature']['value'] = 0.0
+        self.assertEqual(expected, GenericMessageFormat().serialize_node(static_node)['objects']['Room'])
+
+        formats = [JsonMessageFormat(), CborMessageFormat(), CompressedMessageFormat(CborMessageFormat(), threshold=64)]
+        if MessagePackMessageFormat.is_available():
+            formats.append(MessagePackMessageFormat())
+        for message_format in formats:
+            for model in (node, static_node):
+                expected = GenericMessageFormat().serialize_node(model)
+                self.assertEqual(expected, message_format.loads(message_format.serialize_node(model)))
+                self.assertEqual(expected, message_format.loads(StructureCache(message_format).serialize_node(model)))
+
 
 if __name__ == '__main__':
 
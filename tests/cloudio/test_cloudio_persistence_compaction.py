@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import logging
+import shutil
+import unittest
+
+import cbor
+from cloudio.common.mqtt import MqttMemoryPersistence, MqttDefaultFilePersistence
+from cloudio.common.utils import path_helpers
+from cloudio.endpoint.persistence import CompactionPolicy, KeepLastPolicy, DownsamplePolicy, AggregatePolicy
+from cloudio.endpoint.persistence import PersistenceCompactor
+from cloudio.endpoint.persistence import pending_update_from_payload, payload_from_pending_update
+from tests.cloudio.paths import update_working_directory
+
+update_working_directory()  # Needed when: 'pipenv run python -m unittest tests/cloudio/{this_file}.py'
+
+UUID = 'test-vacuum-cleaner;VacuumCleaner;Status;throughput'
+START_TIME = 1476163460000
+
+
+class TestCloudioPersistenceCompaction(unittest.TestCase):
+    """Tests the compaction of the pending updates stored in the persistence.
+    """
+
+    log = logging.getLogger(__name__)
+
+    def setUp(self):
+        self.persistence = MqttMemoryPersistence()
+
+    def _put_samples(self, count, period_ms, constraint='Measure', the_type='Number', encode=cbor.dumps):
+        for index in range(count):
+            timestamp = START_TIME + index * period_ms
+            data = {'type': the_type, 'constraint': constraint, 'timestamp': timestamp / 1000.0,
+                    'value': float(index) if the_type == 'Number' else index}
+            self.persistence.put('PendingUpdate-' + UUID + '-' + str(timestamp),
+                                 pending_update_from_payload(encode(data)))
+
+    def _stored_samples(self):
+        samples = []
+        for key in sorted(self.persistence.keys()):
+            samples.append(cbor.loads(payload_from_pending_update(self.persistence.get(key))))
+        return samples
+
+    def test_policyFromString(self):
+        self.assertIsNone(CompactionPolicy.from_string('none'))
+        self.assertTrue(isinstance(CompactionPolicy.from_string('keep-last'), KeepLastPolicy))
+        self.assertTrue(isinstance(CompactionPolicy.from_string('Downsample:10'), DownsamplePolicy))
+        self.assertTrue(isinstance(CompactionPolicy.from_string('aggregate:0.5'), AggregatePolicy))
+        with self.assertRaises(ValueError):
+            CompactionPolicy.from_string('average:10')
+
+    def test_keepLast(self):
+        self._put_samples(100, 100)
+        compactor = PersistenceCompactor(self.persistence, {'measure': KeepLastPolicy()})
+
+        self.assertEqual((100, 1), compactor.compact())
+        self.assertEqual(99.0, self._stored_samples()[0]['value'])
+
+    def test_downsample(self):
+        self._put_samples(100, 100)  # 10 seconds of data
+        compactor = PersistenceCompactor(self.persistence, {'measure': DownsamplePolicy(1)})
+
+        self.assertEqual((100, 10), compactor.compact())
+        # Last sample of every window is kept
+        self.assertEqual([9.0, 19.0, 29.0], [sample['value'] for sample in self._stored_samples()[:3]])
+
+    def test_aggregate(self):
+        self._put_samples(100, 100, the_type='Integer')
+        compactor = PersistenceCompactor(self.persistence, {'measure': AggregatePolicy(5)})
+
+        self.assertEqual((100, 2), compactor.compact())
+        first, second = self._stored_samples()
+        self.assertEqual({'min': 0, 'max': 49, 'mean': 24.5, 'count': 50}, first['aggregate'])
+        self.assertEqual(24, first['value'])
+        self.assertEqual(START_TIME / 1000.0 + 4.9, first['timestamp'])
+        self.assertEqual(50, second['aggregate']['count'])
+
+    def test_policyPerConstraint(self):
+        self._put_samples(10, 100, constraint='Parameter')
+        compactor = PersistenceCompactor(self.persistence, {'measure': KeepLastPolicy()})
+
+        self.assertEqual((10, 10), compactor.compact())
+
+    def test_jsonPayloadsInFilePersistence(self):
+        directory = path_helpers.prettify('~/mqtt-test-persistence')
+        self.persistence = MqttDefaultFilePersistence(directory)
+        self.persistence.open('compaction', 'mqtt-test-server')
+
+        self._put_samples(20, 100, encode=json.dumps)
+        compactor = PersistenceCompactor(self.persistence, {'measure': KeepLastPolicy()})
+        self.assertEqual((20, 1), compactor.compact())
+
+        payload = payload_from_pending_update(self.persistence.get(self.persistence.keys()[0]))
+        self.assertEqual(19.0, json.loads(payload)['value'])
+
+        shutil.rmtree(directory)
+
+    def test_binaryPayloadRoundTrip(self):
+        payload = bytes(range(256))
+        self.assertEqual(payload, payload_from_pending_update(pending_update_from_payload(payload)))
+        self.assertEqual('{"value": 1}', payload_from_pending_update(pending_update_from_payload('{"value": 1}')))
+
+
+if __name__ == '__main__':
+    # Enable logging
+    logging.basicConfig(format='%(asctime)s.%(msecs)03d - %(name)s - %(levelname)s - %(message)s',
+                        datefmt='%Y-%m-%d %H:%M:%S',
+                        level=logging.INFO)
+
+    unittest.main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+import time
+import unittest
+from unittest import mock
+
+from cloudio.common.mqtt import MqttMemoryPersistence, PendingUpdate
+from cloudio.endpoint.persistence import WriteBehindPersistence, PersistenceWriter
+from tests.cloudio.paths import update_working_directory
+
+update_working_directory()  # Needed when: 'pipenv run python -m unittest tests/cloudio/{this_file}.py'
+
+
+class TestCloudioPersistenceWriteBehind(unittest.TestCase):
+    """Tests the memory buffer in front of the durable persistence.
+    """
+
+    log = logging.getLogger(__name__)
+
+    def setUp(self):
+        self.backend = MqttMemoryPersistence()
+        self.backend.open('write-behind-client', 'mqtt-test-server')
+
+    def test_removedBeforeFlushNeverWritten(self):
+        persistence = WriteBehindPersistence(self.backend, flush_delay=60)
+
+        for index in range(10):
+            persistence.put('PendingUpdate-test;attribute-%d' % index, PendingUpdate('{"value": %d}' % index))
+
+        self.assertEqual(0, len(self.backend.keys()))
+        self.assertEqual(10, len(persistence.keys()))
+        self.assertEqual('{"value": 3}', persistence.get('PendingUpdate-test;attribute-3').get_data())
+
+        # Outage over: Pending updates get published and removed
+        for key in persistence.keys():
+            persistence.remove(key)
+
+        self.assertEqual(0, len(persistence.keys()))
+        self.assertEqual(0, persistence.bytes_written)
+        self.assertEqual(10, persistence.entries_avoided)
+        self.assertEqual(10 * len('{"value": 0}'), persistence.bytes_avoided)
+
+    def test_flushExpired(self):
+        persistence = WriteBehindPersistence(self.backend, flush_delay=0.2)
+
+        persistence.put('PendingUpdate-test;attribute-1', PendingUpdate('{"value": 1}'))
+        self.assertEqual(0, persistence.flush_expired())
+
+        time.sleep(0.3)
+        persistence.put('PendingUpdate-test;attribute-2', PendingUpdate('{"value": 2}'))
+        self.assertEqual(1, persistence.flush_expired())
+
+        self.assertEqual(['PendingUpdate-test;attribute-1'], self.backend.keys())
+        self.assertEqual(1, persistence.buffered_count())
+        self.assertEqual(len('{"value": 1}'), persistence.bytes_written)
+        self.assertEqual(2, len(persistence.keys()))
+
+        # Removing a written entry removes it from the backend
+        persistence.remove('PendingUpdate-test;attribute-1')
+        self.assertEqual(0, len(self.backend.keys()))
+
+    def test_flushWhenBufferFull(self):
+        persistence = WriteBehindPersistence(self.backend, flush_delay=60, max_buffer_size=100)
+
+        for index in range(8):
+            persistence.put('PendingUpdate-test;attribute-%d' % index, PendingUpdate('{"value": %d}' % index))
+        self.assertEqual(0, len(self.backend.keys()))
+
+        # Buffer exceeds 100 bytes: All buffered entries get written
+        persistence.put('PendingUpdate-test;attribute-8', PendingUpdate('{"value": 8}'))
+        self.assertEqual(9, len(self.backend.keys()))
+        self.assertEqual(0, persistence.buffered_count())
+        self.assertEqual(9, persistence.entries_written)
+
+    def test_writerFlushesBuffer(self):
+        persistence = WriteBehindPersistence(self.backend, flush_delay=60)
+        writer = PersistenceWriter(persistence)
+
+        writer.put_many([('key-%d' % index, PendingUpdate(str(index)), None) for index in range(10)])
+        writer.close()
+
+        self.assertEqual(10, len(self.backend.keys()))
+        self.assertEqual(0, persistence.buffered_count())
+
+    def test_removeAlsoRemovesBackendCopy(self):
+        persistence = WriteBehindPersistence(self.backend, flush_delay=60)
+        persistence.put('PendingUpdate-test;attribute-1', PendingUpdate('{"value": 1}'))
+        persistence.flush()
+
+        # Same key put again (ex. compaction rewriting an entry): Both copies get removed
+        persistence.put('PendingUpdate-test;attribute-1', PendingUpdate('{"value": 2}'))
+        persistence.remove('PendingUpdate-test;attribute-1')
+        self.assertEqual([], persistence.keys())
+        self.assertEqual([], self.backend.keys())
+
+    def test_writerCallbacksAfterFlush(self):
+        persistence = WriteBehindPersistence(self.backend, flush_delay=60)
+        writer = PersistenceWriter(persistence, durability=PersistenceWriter.DURABILITY_BATCH, sync_interval=0.05)
+        writer.start()
+        stored = []
+
+        writer.put('key-1', PendingUpdate('1'), lambda: stored.append('key-1'))
+        writer.put('key-2', PendingUpdate('2'), lambda: stored.append('key-2'))
+        end_time = time.time() + 3.0
+        while (writer.pending_count() or persistence.buffered_count() < 2) and time.time() < end_time:
+            time.sleep(0.01)
+        time.sleep(0.1)
+
+        # Only buffered in memory: Not durable yet
+        self.assertEqual([], stored)
+
+        # Removed before being written: Does not need to be written anymore
+        persistence.remove('key-2')
+        end_time = time.time() + 3.0
+        while not stored and time.time() < end_time:
+            time.sleep(0.01)
+        self.assertEqual(['key-2'], stored)
+
+        writer.close()
+        self.assertEqual(['key-2', 'key-1'], stored)
+        self.assertEqual(['key-1'], self.backend.keys())
+
+    def test_failedWriteStaysBuffered(self):
+        persistence = WriteBehindPersistence(self.backend, flush_delay=60)
+        writer = PersistenceWriter(persistence, durability=PersistenceWriter.DURABILITY_BATCH)
+        stored = []
+        writer.put('key-1', PendingUpdate('1'), lambda: stored.append('key-1'))
+        writer.put('key-2', PendingUpdate('2'), lambda: stored.append('key-2'))
+
+        with mock.patch.object(self.backend, 'put', side_effect=IOError('Disk full')):
+            writer.flush()
+        self.assertEqual((1, 0, 2), (persistence.write_failures, persistence.entries_written,
+                                     persistence.buffered_count()))
+        self.assertEqual('1', persistence.get('key-1').get_data())
+        self.assertEqual([], stored)
+        self.assertFalse(writer.is_pending('key-1'))
+
+        # Retried by the next flush
+        writer.flush()
+        self.assertEqual(0, persistence.buffered_count())
+        self.assertEqual(['key-1', 'key-2'], sorted(self.backend.keys()))
+        self.assertEqual(['key-1', 'key-2'], stored)
+        self.assertEqual({}, writer._buffered_callbacks)
+
+
+if __name__ == '__main__':
+    # Enable logging
+    logging.basicConfig(format='%(asctime)s.%(msecs)03d - %(name)s - %(levelname)s - %(message)s',
+                        datefmt='%Y-%m-%d %H:%M:%S',
+                        level=logging.INFO)
+
+    unittest.main()
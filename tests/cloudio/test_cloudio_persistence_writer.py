@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from cloudio.common.mqtt import MqttMemoryPersistence, MqttDefaultFilePersistence, PendingUpdate
+from cloudio.common.utils import path_helpers
+from cloudio.endpoint import CloudioEndpoint
+from cloudio.endpoint.persistence import AtomicFilePersistence, PersistenceWriter
+from cloudio.endpoint.properties_endpoint_configuration import PropertiesEndpointConfiguration
+from tests.cloudio.paths import update_working_directory
+
+update_working_directory()  # Needed when: 'pipenv run python -m unittest tests/cloudio/{this_file}.py'
+
+
+class TestCloudioPersistenceWriter(unittest.TestCase):
+    """Tests the thread writing pending updates to the persistence.
+    """
+
+    log = logging.getLogger(__name__)
+
+    def setUp(self):
+        self.stored = []
+
+    def _wait_for(self, condition, timeout=3.0):
+        end_time = time.time() + timeout
+        while not condition() and time.time() < end_time:
+            time.sleep(0.01)
+        return condition()
+
+    def test_writesInBackground(self):
+        persistence = MqttMemoryPersistence()
+        writer = PersistenceWriter(persistence, durability=PersistenceWriter.DURABILITY_BATCH)
+        writer.start()
+
+        for index in range(1000):
+            writer.put('PendingUpdate-test;attribute-%d' % index, PendingUpdate(str(index)),
+                       lambda index=index: self.stored.append(index))
+
+        self.assertTrue(self._wait_for(lambda: len(self.stored) == 1000))
+        self.assertEqual(1000, len(persistence.keys()))
+        self.assertEqual('999', persistence.get('PendingUpdate-test;attribute-999').get_data())
+        writer.close()
+
+    def test_closeWritesQueuedEntries(self):
+        persistence = MqttMemoryPersistence()
+        writer = PersistenceWriter(persistence)
+
+        # Writer thread not started: Entries stay queued until close() is called
+        writer.put_many([('key-%d' % index, PendingUpdate(str(index)), None) for index in range(10)])
+        self.assertEqual(10, writer.pending_count())
+        writer.close()
+
+        self.assertEqual(0, writer.pending_count())
+        self.assertEqual(10, len(persistence.keys()))
+
+    def test_intervalDurability(self):
+        directory = path_helpers.prettify('~/mqtt-test-persistence')
+        persistence = MqttDefaultFilePersistence(directory)
+        persistence.open('writer', 'mqtt-test-server')
+
+        writer = PersistenceWriter(persistence, durability=PersistenceWriter.DURABILITY_INTERVAL, sync_interval=0.2)
+        writer.start()
+        writer.put('key', PendingUpdate('data'), lambda: self.stored.append('key'))
+
+        self.assertTrue(self._wait_for(lambda: persistence.contains_key('key')))
+        # Callback gets called after the next sync
+        self.assertTrue(self._wait_for(lambda: self.stored == ['key']))
+        writer.close()
+
+        shutil.rmtree(directory)
+
+    def test_atomicFilePersistence(self):
+        directory = tempfile.mkdtemp()
+        persistence = AtomicFilePersistence(directory)
+        persistence.open('writer', 'mqtt-test-server')
+
+        persistence.put('key', PendingUpdate('data'))
+        persistence.put('key', 'new data')
+        # Temporary file of an entry being written
+        with open(os.path.join(directory, 'writer-mqtt-test-server', '.other.tmp'), 'w') as temp_file:
+            temp_file.write('partial')
+
+        self.assertEqual(['key'], persistence.keys())
+        self.assertEqual('new data', persistence.get('key').get_data())
+        shutil.rmtree(directory)
+
+    def test_fsyncWrittenFiles(self):
+        directory = tempfile.mkdtemp()
+        for durability, fsync_count in ((PersistenceWriter.DURABILITY_BATCH, 4),
+                                        (PersistenceWriter.DURABILITY_NONE, 0)):
+            persistence = AtomicFilePersistence(directory)
+            persistence.open(durability, 'mqtt-test-server')
+            writer = PersistenceWriter(persistence, durability=durability)
+
+            with mock.patch('os.fsync', wraps=os.fsync) as fsync, mock.patch('os.sync', create=True) as sync:
+                writer.put_many([('key%d' % index, PendingUpdate(str(index)), lambda: self.stored.append(1))
+                                 for index in range(3)])
+                writer.flush()
+
+            # Each file written and the directory once per batch, not the whole file system
+            sync.assert_not_called()
+            self.assertEqual(fsync_count, fsync.call_count)
+            self.assertEqual(3, len(persistence.keys()))
+        self.assertEqual(6, len(self.stored))
+        shutil.rmtree(directory)
+
+    def test_pendingKeys(self):
+        writer = PersistenceWriter(MqttMemoryPersistence())
+        writer.put('key', PendingUpdate('1'))
+        writer.put_many([('key', PendingUpdate('2'), None), ('other', PendingUpdate('3'), None)])
+        self.assertTrue(writer.is_pending('key') and writer.is_pending('other'))
+
+        writer.close()
+        self.assertFalse(writer.is_pending('key') or writer.is_pending('other'))
+
+    def test_purgeSkipsPendingAndUnreadableEntries(self):
+        properties = {'ch.hevs.cloudio.endpoint.hostUri': '127.0.0.1',
+                      'ch.hevs.cloudio.endpoint.persistence': 'memory'}
+        endpoint = CloudioEndpoint('test-endpoint', configuration=PropertiesEndpointConfiguration(properties))
+        endpoint.persistence.put('PendingUpdate-test-endpoint;node;a-1', PendingUpdate('{"value": 1}'))
+        endpoint.persistence.put('PendingUpdate-test-endpoint;node;b-1', PendingUpdate('not base64!'))
+        endpoint.persistence.put('PendingUpdate-test-endpoint;node;c-1', PendingUpdate('{"value": 3}'))
+
+        with mock.patch.object(endpoint._persistence_writer, 'is_pending',
+                               side_effect=lambda key: key.endswith(';c-1')), \
+                mock.patch.object(endpoint, 'is_online', return_value=True), \
+                mock.patch.object(endpoint, '_publish') as publish:
+            endpoint._purgePersistentDataStore()
+        endpoint.close()
+
+        publish.assert_called_once_with('@update/test-endpoint/node/a', '{"value": 1}')
+        self.assertEqual(['PendingUpdate-test-endpoint;node;b-1', 'PendingUpdate-test-endpoint;node;c-1'],
+                         sorted(endpoint.persistence.keys()))
+
+    def test_unknownDurability(self):
+        with self.assertRaises(ValueError):
+            PersistenceWriter(MqttMemoryPersistence(), durability='always')
+
+
+if __name__ == '__main__':
+    # Enable logging
+    logging.basicConfig(format='%(asctime)s.%(msecs)03d - %(name)s - %(levelname)s - %(message)s',
+                        datefmt='%Y-%m-%d %H:%M:%S',
+                        level=logging.INFO)
+
+    unittest.main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+import unittest
+
+from cloudio.endpoint.attribute.constraint import CloudioAttributeConstraint
+from cloudio.endpoint.exception.invalid_cloudio_attribute_exception import InvalidCloudioAttributeException
+from cloudio.endpoint.message_format.generic_format import GenericMessageFormat
+from cloudio.endpoint.message_format.json_format import JsonMessageFormat
+from cloudio.endpoint.runtime import CloudioObjectTemplate, CloudioRuntimeNodeBuilder, CloudioRuntimeObjectBuilder
+from tests.cloudio.paths import update_working_directory
+from tests.cloudio.test_cloudio_message_generic_format import create_runtime_node
+
+update_working_directory()  # Needed when: 'pipenv run python -m unittest tests/cloudio/{this_file}.py'
+
+# Same structure as create_runtime_node()
+NODE_SPEC = {
+    'implements': ['NodeInterface'],
+    'objects': {
+        'Parameters': {
+            'attributes': [('power', (bool, 'parameter')),
+                           ('throughput', (int, 'setpoint', 4)),
+                           ('name', {'type': 'String', 'constraint': 'static', 'value': 'Vacuum'}),
+                           ('unset', (float,))],
+            'objects': {
+                'Measures': {'conforms': 'Measures',
+                             'attributes': {'temperature': (float, CloudioAttributeConstraint.get_instance('measure'),
+                                                            21.5)}}
+            }
+        }
+    }
+}
+
+
+class TestCloudioRuntimeBuilder(unittest.TestCase):
+    """Tests building runtime nodes and objects from structural specs.
+    """
+
+    log = logging.getLogger(__name__)
+
+    def test_nodeBuilder(self):
+        builder = CloudioRuntimeNodeBuilder(NODE_SPEC)
+        node = builder.build()
+        self.assertEqual(5, builder.attribute_count)
+
+        message_format = GenericMessageFormat()
+        self.assertEqual(message_format.serialize_node(create_runtime_node(name=None)),
+                         message_format.serialize_node(node))
+
+        parameters = node.get_objects()['Parameters']
+        self.assertIs(node, parameters._internal.get_parent_object_container())
+        self.assertEqual('Parameters', parameters.get_name())
+        throughput = parameters.get_attribute('throughput')
+        self.assertIs(parameters, throughput.get_parent())
+        self.assertIsNotNone(throughput.get_timestamp())
+        self.assertIsNone(parameters.get_attribute('power').get_timestamp())
+
+        # Every build creates a new node
+        self.assertIsNot(node, builder.build())
+
+    def test_objectBuilder(self):
+        obj = CloudioRuntimeObjectBuilder({'attributes': {'a': ('Number', 'measure', 1.0), 'b': (int,)}},
+                                          columnar=True).build()
+        self.assertEqual([obj.get_attribute('a')], obj.get_columns().attributes)
+        self.assertEqual(1.0, obj.get_attribute('a').get_value())
+        self.assertEqual(0, obj.get_attribute('b').get_value())
+
+    def test_invalidSpecs(self):
+        invalid_specs = [
+            ({'objects': {'Parameters': {'attributes': {'power': (bytes, 'parameter')}}}},
+             InvalidCloudioAttributeException, None),
+            ({'objects': {'Parameters': {'objects': {'Measures': {'attributes': {'a/b': (int,)}}}}}},
+             ValueError, 'Parameters/Measures'),
+            ({'objects': {'Parameters': {'attributes': [('power', (bool,)), ('power', (int,))]}}},
+             ValueError, 'Parameters/power'),
+            ({'objects': {'Parameters': {'attributes': {'power': 'bool'}}}}, ValueError, 'Parameters/power'),
+            ({'objects': {'Parameters': {'attributes': {'name': (str, 'status', 42)}}}}, ValueError, 'Parameters/name'),
+            ({'objects': {'Parameters': {'attributes': {'power': (int, 'status', 'on')}}}},
+             ValueError, 'Parameters/power'),
+            ({'objects': {'Parameters': {'attributes': {'power': (float, 'status', [1])}}}},
+             ValueError, 'Parameters/power'),
+            ({'objects': {'Parameters': []}, 'implements': 'NodeInterface'}, ValueError, 'Interfaces'),
+            ({'objects': {'Parameters': ['power']}}, ValueError, 'Parameters'),
+        ]
+        for spec, exception, message in invalid_specs:
+            with self.assertRaises(exception) as context:
+                CloudioRuntimeNodeBuilder(spec).build()
+            if message:
+                self.assertIn(message, str(context.exception))
+
+    def test_objectTemplate(self):
+        sensor_spec = {'conforms': 'Sensor',
+                       'attributes': {'temperature': (float, 'measure', 21.5), 'name': (str, 'static')},
+                       'objects': {'Limits': {'attributes': {'high': (float, 'parameter', 30.0)}}}}
+        template = CloudioObjectTemplate(sensor_spec)
+        self.assertEqual(('Sensor', 3), (template.conforms, template.attribute_count))
+
+        builder = CloudioRuntimeNodeBuilder({'objects': {'sensor0': template, 'sensor1': template,
+                                                         'reference': sensor_spec}})
+        node = builder.build()
+        self.assertEqual(9, builder.attribute_count)
+
+        sensor0, sensor1, reference = (node.get_objects()[name] for name in ('sensor0', 'sensor1', 'reference'))
+        self.assertIs(template, sensor0.get_template())
+        self.assertIsNone(reference.get_template())
+        self.assertIs(sensor0, sensor0.get_object('Limits')._internal.get_parent_object_container())
+
+        message_format = GenericMessageFormat()
+        self.assertEqual(message_format.serialize_node(node)['objects']['reference'],
+                         message_format.serialize_node(node)['objects']['sensor0'])
+
+        # Values are per object, the encoded parts of the @update messages are shared
+        temperature0, temperature1 = (sensor.get_attribute('temperature') for sensor in (sensor0, sensor1))
+        temperature1._value = 22.5
+        self.assertEqual((21.5, 22.5), (temperature0.get_value(), temperature1.get_value()))
+        json_format = JsonMessageFormat()
+        self.assertEqual(json_format.serialize_attribute(reference.get_attribute('temperature')),
+                         json_format.serialize_attribute(temperature0))
+        json_format.serialize_attribute(temperature1)
+        self.assertIs(temperature0._update_templates, temperature1._update_templates)
+        self.assertIn('json', temperature0._update_templates)
+
+        with self.assertRaises(ValueError) as context:
+            CloudioObjectTemplate({'objects': {'Limits': {'attributes': {'high': 'float'}}}})
+        self.assertIn('Limits/high', str(context.exception))
+
+
+if __name__ == '__main__':
+    # Enable logging
+    logging.basicConfig(format='%(asctime)s.%(msecs)03d - %(name)s - %(levelname)s - %(message)s',
+                        datefmt='%Y-%m-%d %H:%M:%S',
+                        level=logging.INFO)
+
+    unittest.main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+import math
+import unittest
+from unittest import mock
+
+from cloudio.endpoint import CloudioEndpoint
+from cloudio.endpoint.properties_endpoint_configuration import PropertiesEndpointConfiguration
+from cloudio.endpoint.runtime import CloudioRuntimeNode, CloudioRuntimeObject
+from cloudio.endpoint.runtime import columns
+from cloudio.endpoint.runtime.columns import AttributeColumns, CloudioColumnAttribute
+from tests.cloudio.paths import update_working_directory
+
+update_working_directory()  # Needed when: 'pipenv run python -m unittest tests/cloudio/{this_file}.py'
+
+
+def create_sensor_array(sensor_count):
+    sensors = CloudioRuntimeObject(columnar=True)
+    for index in range(sensor_count):
+        sensors.add_attribute('sensor%d' % index, float, 'measure', initial_value=20.0 + index)
+    sensors.add_attribute('unit', str, 'static', initial_value='degC')
+    return sensors
+
+
+class TestCloudioRuntimeColumns(unittest.TestCase):
+    """Tests the columnar storage of runtime objects.
+    """
+
+    log = logging.getLogger(__name__)
+
+    def test_attributes(self):
+        sensors = create_sensor_array(3)
+        attributes = sensors.get_attributes()
+        self.assertIsInstance(attributes['sensor1'], CloudioColumnAttribute)
+        self.assertNotIsInstance(attributes['unit'], CloudioColumnAttribute)
+        self.assertIsNone(CloudioRuntimeObject().get_columns())
+
+        self.assertEqual(3, len(sensors.get_columns()))
+        self.assertEqual([20.0, 21.0, 22.0], list(sensors.get_columns().get_values()))
+        self.assertEqual('Number', attributes['sensor1'].get_type_as_string())
+
+        attributes['sensor1'].set_value(25.5, timestamp=1476111491023)
+        self.assertEqual(25.5, attributes['sensor1'].get_value())
+        self.assertEqual(1476111491023, attributes['sensor1'].get_timestamp())
+        self.assertEqual(25.5, sensors.get_columns().values[1])
+
+        self.assertTrue(attributes['sensor2'].set_value_from_cloud(30, attributes['sensor2'].get_timestamp() + 1))
+        self.assertEqual(30.0, attributes['sensor2'].get_value())
+
+        # Value never set
+        self.assertIsNone(CloudioColumnAttribute(AttributeColumns()).get_value())
+
+    def _check_update(self):
+        sensors = create_sensor_array(4)
+        column = sensors.get_columns()
+        with mock.patch.object(sensors, 'attribute_has_changed_by_endpoint') as changed:
+            updated = column.update([20.0, 21.05, 25.0, math.nan], timestamp=1476111491023, deadband=0.1)
+            self.assertEqual(['sensor2', 'sensor3'], [attribute.get_name() for attribute in updated])
+            self.assertEqual(2, changed.call_count)
+
+            # Per attribute deadband
+            updated = column.update([20.5, 21.5, 25.0, math.nan], timestamp=1476111491024, deadband=[1.0, 0.2, 0, 0])
+            self.assertEqual(['sensor1'], [attribute.get_name() for attribute in updated])
+
+        self.assertEqual([20.0, 21.5, 25.0], list(column.get_values())[:3])
+        self.assertIsNone(sensors.get_attribute('sensor3').get_value())
+        self.assertEqual([1476111491024, 1476111491023, 1476111491023], list(column.timestamps)[1:])
+
+        with self.assertRaises(ValueError):
+            column.update([1.0])
+
+    def test_update(self):
+        with mock.patch.object(columns, 'numpy', None):
+            self._check_update()
+
+    @unittest.skipUnless(AttributeColumns.is_numpy_available(), 'Needs NumPy')
+    def test_updateVectorized(self):
+        self._check_update()
+
+    def test_endpoint(self):
+        properties = {'ch.hevs.cloudio.endpoint.hostUri': '127.0.0.1',
+                      'ch.hevs.cloudio.endpoint.persistence': 'none'}
+        endpoint = CloudioEndpoint('test-endpoint', configuration=PropertiesEndpointConfiguration(properties))
+        node = CloudioRuntimeNode()
+        sensors = create_sensor_array(3)
+        node.add_object('Sensors', sensors)
+        endpoint.add_node('Array', node)
+
+        with mock.patch.object(endpoint, '_publish') as publish:
+            sensors.get_columns().update([20.0, 21.0, 12.5], timestamp=1476111491023)
+        endpoint.close()
+
+        self.assertEqual(1, publish.call_count)
+        topic, payload = publish.call_args[0][:2]
+        self.assertEqual('@update/test-endpoint/Array/Sensors/sensor2', topic)
+        self.assertEqual(12.5, endpoint.message_format.loads(payload)['value'])
+
+
+if __name__ == '__main__':
+    # Enable logging
+    logging.basicConfig(format='%(asctime)s.%(msecs)03d - %(name)s - %(levelname)s - %(message)s',
+                        datefmt='%Y-%m-%d %H:%M:%S',
+                        level=logging.INFO)
+
+    unittest.main()
@@ -2,8 +2,10 @@
 # -*- coding: utf-8 -*-
 
 import logging
+import sys
 import unittest
 from cloudio.endpoint.interface.uuid import CloudioUuid
+from cloudio.endpoint.runtime import CloudioRuntimeNode, CloudioRuntimeObject
 from cloudio.endpoint.topicuuid import TopicUuid
 from tests.cloudio.paths import update_working_directory
 
@@ -51,6 +53,35 @@ class TestTopicUuid(unittest.TestCase):
         self.assertTrue(t1.equals(t2))
         self.assertTrue(t2.equals(t1))
 
+    def test_modelTopics(self):
+        from cloudio.endpoint import CloudioEndpoint
+        from cloudio.endpoint.properties_endpoint_configuration import PropertiesEndpointConfiguration
+
+        node = CloudioRuntimeNode()
+        status = CloudioRuntimeObject()
+        error = status.add_attribute('error', str, 'status')
+        # Topic not final as long as the attribute is not part of an endpoint
+        self.assertFalse(error.get_uuid().is_attached())
+        self.assertTrue(error.get_uuid().to_string().startswith('<no parent>'))
+
+        node.add_object('Status', status)
+        properties = {'ch.hevs.cloudio.endpoint.hostUri': '127.0.0.1',
+                      'ch.hevs.cloudio.endpoint.persistence': 'none'}
+        endpoint = CloudioEndpoint('test-endpoint', configuration=PropertiesEndpointConfiguration(properties))
+        endpoint.add_node('Node', node)
+        endpoint.close()
+
+        self.assertEqual('test-endpoint/Node', node.get_uuid().to_string())
+        self.assertEqual('test-endpoint/Node/Status', status.get_uuid().to_string())
+        self.assertEqual('test-endpoint/Node/Status/error', error.get_uuid().to_string())
+
+        # Computed once and shared
+        self.assertIs(error.get_uuid(), error.get_uuid())
+        self.assertIs(node.get_uuid(), node.get_uuid())
+        self.assertIs(sys.intern('test-endpoint/Node/Status/' + 'error'), error.get_uuid().to_string())
+        self.assertEqual('@update/test-endpoint/Node/Status/error', error.get_uuid().get_action_topic('@update'))
+        self.assertIs(error.get_uuid().get_action_topic('@update'), error.get_uuid().get_action_topic('@update'))
+
 
 if __name__ == '__main__':
 